@@ -1,22 +1,51 @@
 from flask import Flask
+from werkzeug.middleware.proxy_fix import ProxyFix
 from app.config import get_config
-from app.extensions import db, migrate, cors
-from app.admin import init_admin
+from app.extensions import (
+    db, migrate, cors, password_hasher, token_cache, pool_stats, request_timing,
+    metrics, login_limiter)
+from app.repositories.entity_cache import entity_cache
+from app.repositories.token_denylist import token_denylist
 from app.controllers.users import users_bp
 from app.controllers.guilds import guilds_bp
 from app.error_handlers import register_error_handlers
+from app.commands import guilds_cli, tokens_cli
+from app.utils.db_pool import apply_engine_options
+from app.utils.json_provider import init_json
+from app.utils.structured_logging import configure_logging
 
 
 def create_app(env: str | None = None) -> Flask:
     app = Flask(__name__)
     app.config.from_object(get_config(env))
+    configure_logging(app)
+    init_json(app)
 
+    if app.config.get("PROXY_FIX_X_FOR") or app.config.get("PROXY_FIX_X_PROTO"):
+        # Behind a proxy every request comes from the proxy's address
+        app.wsgi_app = ProxyFix(
+            app.wsgi_app,
+            x_for=app.config.get("PROXY_FIX_X_FOR", 0),
+            x_proto=app.config.get("PROXY_FIX_X_PROTO", 0))
+
+    apply_engine_options(app)
     db.init_app(app)
+    pool_stats.init_app(app, db)
+    request_timing.init_app(app, db)
     migrate.init_app(app, db)
     cors.init_app(app)
+    password_hasher.init_app(app)
+    token_cache.init_app(app)
+    entity_cache.init_app(app)
+    token_denylist.init_app(app)
+    login_limiter.init_app(app)
+    metrics.init_app(app)
 
-    if not app.config.get("TESTING"):
-        init_admin(app)  # Only load Flask-Admin outside of tests
+    if app.config.get("ADMIN_ENABLED"):
+        # Imported only here: Flask-Admin and WTForms are slow to import
+        # and API-only workers never need them
+        from app.admin import init_admin
+        init_admin(app)
 
     # Register error handlers
     register_error_handlers(app)
@@ -25,6 +54,10 @@ def create_app(env: str | None = None) -> Flask:
     app.register_blueprint(users_bp, url_prefix="/api/v1")
     app.register_blueprint(guilds_bp, url_prefix="/api/v1")
 
+    # flask CLI commands
+    app.cli.add_command(guilds_cli)
+    app.cli.add_command(tokens_cli)
+
     # health check
     @app.get("/ping")
     def ping():
@@ -1,11 +1,234 @@
-from flask_admin import Admin
+from flask import Response, current_app, flash, request, session
+from flask_admin import Admin, AdminIndexView
+from flask_admin.actions import action
 from flask_admin.contrib.sqla import ModelView
-from app.extensions import db
+from flask_admin.form import SecureForm
+from sqlalchemy import false, func, inspect, or_, select, text
+from app.extensions import db, login_limiter, password_hasher
+from app.models.guild import Guild
 from app.models.user import User
+from app.repositories.entity_cache import entity_cache
+from app.services.guild_service import GuildService
+from app.services.user_service import UserService, normalize_email
+from app.utils.hashing import HashingUnavailable
+
+
+def approximate_count(session, model) -> int:
+    """
+    Estimated row count from the planner's statistics (pg_class.reltuples
+    on PostgreSQL, sqlite_stat1 once ANALYZE has run on SQLite), so a list
+    page never runs COUNT(*) over the whole table. Without statistics it
+    falls back to max(id), a single index lookup.
+    """
+    table = model.__tablename__
+    dialect = session.get_bind().dialect.name
+    estimate = None
+
+    if dialect == "postgresql":
+        # -1 (or 0) until the table's first VACUUM / ANALYZE
+        estimate = session.scalar(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table)"),
+            {"table": table})
+    elif dialect == "sqlite":
+        has_stats = session.scalar(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'"))
+        if has_stats:
+            # Each row's stat starts with the table's row count
+            stat = session.scalar(
+                text("SELECT stat FROM sqlite_stat1 WHERE tbl = :table LIMIT 1"),
+                {"table": table})
+            estimate = int(stat.split()[0]) if stat else None
+
+    if not estimate or estimate < 0:
+        estimate = session.scalar(select(func.max(model.id))) or 0
+    return estimate
+
+
+def is_admin_request() -> bool:
+    """
+    Whether the request comes from an admin: an active user whose email is
+    in ADMIN_EMAILS, signed in with HTTP Basic (account email and
+    password). A sign-in is remembered in the session cookie, so the
+    password KDF runs once per sign-in rather than on every page.
+    """
+    admins = current_app.config.get("ADMIN_EMAILS") or ()
+    user_id = session.get("admin_user_id")
+    if user_id is not None:
+        user = UserService.get_user_by_id(user_id)
+        # Re-checked every request: removing or deactivating an admin
+        # takes effect at once
+        if user and user.is_active and user.email in admins:
+            return True
+        session.pop("admin_user_id", None)
+
+    auth = request.authorization
+    if auth is None or auth.type != "basic" or not auth.username or not auth.password:
+        return False
+    email = normalize_email(auth.username)
+    if email not in admins or login_limiter.hit(ip=request.remote_addr, email=email):
+        return False
+    user = UserService.get_user_by_email(email)
+    try:
+        if not user or not user.is_active or not password_hasher.verify(user.password, auth.password):
+            return False
+    except HashingUnavailable:
+        return False
+    session["admin_user_id"] = user.id
+    return True
+
+
+class AdminAccessMixin:
+    """Restricts a Flask-Admin view to admins (see is_admin_request)."""
+
+    def is_accessible(self):
+        return is_admin_request()
+
+    def inaccessible_callback(self, name, **kwargs):
+        return Response("Admin sign-in required", 401,
+                        {"WWW-Authenticate": 'Basic realm="Admin"'})
+
+
+class AdminHomeView(AdminAccessMixin, AdminIndexView):
+    pass
+
+
+class ScalableModelView(AdminAccessMixin, ModelView):
+    """
+    ModelView for tables too big for Flask-Admin's defaults:
+      - fixed page size
+      - approximate row count instead of COUNT(*); filtered and searched
+        lists aren't counted at all
+      - search only through `search_conditions`, which subclasses build
+        from indexed equality matches (never `ILIKE '%term%'`)
+      - no per-row deletes, which load and delete objects one at a time
+      - admins only, with CSRF tokens on every form (edits and actions)
+    Subclasses list only indexed columns in column_sortable_list and must
+    set:
+      - cache_name: the entity_cache attribute holding the model's snapshots
+      - search_columns: (expression, case-insensitive) pairs matched exactly
+        against a search term, each backed by an index; numeric terms
+        match the id too
+    """
+    page_size = 50
+    can_set_page_size = False
+    can_delete = False
+    column_display_pk = True
+    column_default_sort = ("id", True)
+    simple_list_pager = True  # no COUNT query; get_list supplies the estimate
+    form_base_class = SecureForm
+
+    cache_name = None
+    search_columns = None
+
+    def __init__(self, model, session, **kwargs):
+        # Checked when the view is registered, not when first searched
+        name = type(self).__name__
+        if not hasattr(entity_cache, self.cache_name or ""):
+            raise TypeError(f"{name}.cache_name must name an entity_cache attribute")
+        if self.search_columns is None:
+            raise TypeError(f"{name}.search_columns must be set")
+        super().__init__(model, session, **kwargs)
+
+    def cache(self):
+        """The entity cache holding this model's snapshots."""
+        return getattr(entity_cache, self.cache_name)
+
+    def search_conditions(self, term: str) -> list:
+        """Index-backed conditions any of which makes a row match `term`."""
+        conditions = [column == (term.lower() if fold_case else term)
+                      for column, fold_case in self.search_columns]
+        if term.isdigit():
+            conditions.append(self.model.id == int(term))
+        return conditions
+
+    def get_list(self, page, sort_column, sort_desc, search, filters,
+                 execute=True, page_size=None):
+        count, query = super().get_list(page, sort_column, sort_desc, search, filters,
+                                        execute=execute, page_size=page_size)
+        if not search and not filters:
+            count = approximate_count(self.session, self.model)
+        return count, query
+
+    def _apply_search(self, query, count_query, joins, count_joins, search):
+        conditions = self.search_conditions(search.strip())
+        clause = or_(*conditions) if conditions else false()
+        query = query.filter(clause)
+        if count_query is not None:
+            count_query = count_query.filter(clause)
+        return query, count_query, joins, count_joins
+
+    def after_model_change(self, form, model, is_created):
+        # Admin edits bypass the services, so drop the cached snapshot here
+        self.cache().invalidate(model.id)
+
+
+class UserAdmin(ScalableModelView):
+    column_list = ("id", "username", "email", "role", "is_active", "guild_id", "created_at")
+    # Backed by the primary key, the unique indexes and ix_users_guild_id
+    column_sortable_list = ("id", "username", "email", "guild_id")
+    column_searchable_list = ("username", "email")  # exact match, see search_columns
+    column_filters = ("guild_id",)
+    # Users register through the API, which hashes the password; guild
+    # membership and activation go through the bulk actions, which keep
+    # counts right and revoke tokens. Roles aren't editable: they change
+    # with leadership transfers, which also bump roster_version and revoke
+    # the demoted leader's tokens
+    can_create = False
+    form_columns = ("username", "email")
+    cache_name = "users"
+    # Emails are stored lowercased; ix_users_email and the username index
+    search_columns = ((User.email, True), (User.username, False))
+
+    def on_model_change(self, form, model, is_created):
+        # Stored lowercased like registration does, or login can't find it
+        model.email = normalize_email(model.email)
+        # Member lists show usernames and emails, so their ETags must change
+        state = inspect(model)
+        if model.guild_id is not None and any(
+                state.attrs[name].history.has_changes() for name in ("username", "email")):
+            GuildService.record_member_profile_change(model.guild_id)
+
+    def after_model_change(self, form, model, is_created):
+        super().after_model_change(form, model, is_created)
+        if model.guild_id is not None:
+            entity_cache.guilds.invalidate(model.guild_id)
+
+    @action("deactivate", "Deactivate", "Deactivate the selected users?")
+    def action_deactivate(self, ids):
+        count = UserService.set_users_active(ids, False)
+        flash(f"Deactivated {count} user(s).", "success")
+
+    @action("activate", "Activate", "Activate the selected users?")
+    def action_activate(self, ids):
+        count = UserService.set_users_active(ids, True)
+        flash(f"Activated {count} user(s).", "success")
+
+    @action("kick", "Remove from guild",
+            "Remove the selected users from their guilds? Guild leaders are skipped.")
+    def action_kick(self, ids):
+        count = GuildService.remove_members(ids)
+        flash(f"Removed {count} user(s) from their guilds.", "success")
+
+
+class GuildAdmin(ScalableModelView):
+    column_list = ("id", "name", "member_count", "created_by", "created_at")
+    # Backed by the primary key, the unique name index, ix_guilds_created_at
+    # and ix_guilds_member_count_id
+    column_sortable_list = ("id", "name", "member_count", "created_at")
+    column_searchable_list = ("name",)  # case-insensitive exact match
+    column_filters = ("created_by",)
+    # Guilds are created by their leader through the API
+    can_create = False
+    form_columns = ("name", "description")
+    cache_name = "guilds"
+    search_columns = ((func.lower(Guild.name), True),)  # uq_guilds_name_lower
 
-admin_panel = Admin(name='Admin Panel', template_mode='bootstrap4')
 
 def init_admin(app):
+    # One Admin per app, so create_app can run more than once per process
+    admin_panel = Admin(name='Admin Panel', template_mode='bootstrap4',
+                        index_view=AdminHomeView())
     admin_panel.init_app(app)
-    admin_panel.add_view(ModelView(User, db.session))
-    return admin_panel
\ No newline at end of file
+    admin_panel.add_view(UserAdmin(User, db.session))
+    admin_panel.add_view(GuildAdmin(Guild, db.session))
+    return admin_panel
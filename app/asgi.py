@@ -0,0 +1,32 @@
+from a2wsgi import WSGIMiddleware
+from app import create_app
+from app.controllers.async_views import register_async_views
+from app.extensions import async_db, db
+from app.utils.asgi import AsyncRouter
+
+
+def create_asgi_app(env: str | None = None) -> AsyncRouter:
+    """
+    ASGI entry point. The read-only GET routes of the users and guilds
+    blueprints run natively on the event loop over an AsyncSession
+    (aiosqlite / asyncpg), so thousands of concurrent requests wait on the
+    database without a thread each. Every other route is handed to the
+    Flask app on a thread pool of ASGI_WSGI_WORKERS threads. The async
+    routes skip the Flask request hooks (request timing, metrics).
+
+        uvicorn --factory app.asgi:create_asgi_app
+    """
+    app = create_app(env)
+    async_db.init_app(app, db)
+
+    router = AsyncRouter(
+        fallback=WSGIMiddleware(app, workers=app.config["ASGI_WSGI_WORKERS"]),
+        dumps=app.json.dumps,
+        session_factory=async_db.session,
+        on_shutdown=async_db.dispose,
+        # What flask-cors adds to every Flask response with its defaults
+        headers={"Access-Control-Allow-Origin": "*"}
+    )
+    register_async_views(router)
+    router.flask_app = app
+    return router
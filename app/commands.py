@@ -0,0 +1,27 @@
+import click
+from flask.cli import AppGroup
+from app.repositories.token_revocation_repository import TokenRevocationRepository
+from app.services.guild_service import GuildService
+
+# `flask guilds ...` maintenance commands
+guilds_cli = AppGroup("guilds", help="Guild maintenance commands.")
+tokens_cli = AppGroup("tokens", help="Token maintenance commands.")
+
+
+@guilds_cli.command("reconcile-counts")
+@click.option("--batch-size", default=1000, show_default=True,
+              help="Guilds recounted per transaction.")
+def reconcile_counts(batch_size):
+    """Recompute guilds.member_count from users and report any drift."""
+    drifted = GuildService.reconcile_member_counts(batch_size=batch_size)
+
+    for guild_id, stored, actual in drifted:
+        click.echo(f"guild {guild_id}: member_count {stored} -> {actual}")
+    click.echo(f"{len(drifted)} guild(s) corrected")
+
+
+@tokens_cli.command("prune-revocations")
+def prune_revocations():
+    """Delete revocations whose tokens have all expired."""
+    pruned = TokenRevocationRepository.prune_expired()
+    click.echo(f"{pruned} expired revocation(s) deleted")
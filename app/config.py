@@ -1,7 +1,8 @@
-from os import getenv
-from dotenv import load_dotenv
+from os import getenv, cpu_count
 
-load_dotenv(".env")
+# .env is loaded by the entry points (run.py, wsgi.py, asgi.py,
+# gunicorn.conf.py, reset_db.py; `flask` and `pipenv run` load it too),
+# so importing the app never touches the filesystem for it
 
 class BaseConfig:
     SQLALCHEMY_DATABASE_URI = getenv("DATABASE_URL")
@@ -10,20 +11,158 @@ class BaseConfig:
     APISPEC_TITLE = "Kickstart API"
     APISPEC_VERSION = "1.0.0"
     SECRET_KEY = getenv("SECRET_KEY")
+    JSON_SORT_KEYS = False  # key order doesn't matter to clients; skip the sort
+
+    # Engine / connection pool. pool_size, max_overflow and pool_timeout only
+    # apply to a QueuePool (PostgreSQL or file-backed SQLite).
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        "pool_size": 5,
+        "max_overflow": 10,
+        "pool_timeout": 30,  # seconds to wait for a free connection
+        "pool_recycle": 1800,  # seconds before a connection is replaced
+        "pool_pre_ping": True,
+        "query_cache_size": 500,  # compiled statement cache entries
+    }
+    # Applied on every new SQLite connection (ignored on other databases)
+    SQLITE_PRAGMAS = None
+
+    # Per-request query count/timing (Server-Timing header + slow request log)
+    REQUEST_TIMING_ENABLED = True
+    SLOW_REQUEST_THRESHOLD_MS = 500
+    SLOW_REQUEST_LOG_STATEMENTS = 3
+
+    # Structured logging (JSON lines on stdout via a background queue listener)
+    LOG_LEVEL = "INFO"
+    LOG_FORMAT = "json"  # or "text"
+    LOG_SAMPLE_RATE = 1.0  # fraction of high-volume info events kept
+    LOG_PROPAGATE = False
+
+    # Prometheus /metrics. Set METRICS_MULTIPROC_DIR when running several
+    # worker processes so a scrape on any of them covers all of them; the
+    # gunicorn master empties it on start.
+    METRICS_ENABLED = True
+    METRICS_MULTIPROC_DIR = getenv("METRICS_MULTIPROC_DIR")
+    METRICS_FLUSH_INTERVAL = 5  # seconds between per-process flushes
+
+    # Password hashing process pool (0 = hash inline on the request thread)
+    PASSWORD_HASH_POOL_SIZE = 2
+    PASSWORD_HASH_MAX_PENDING = 16  # queued + running before we reject
+    PASSWORD_HASH_TIMEOUT = 10  # seconds
+
+    # Verified-JWT LRU cache (0 = disabled)
+    TOKEN_CACHE_SIZE = 4096
+
+    # Read-through User/Guild snapshot cache (0 = disabled)
+    ENTITY_CACHE_SIZE = 10000
+    ENTITY_CACHE_TTL = 30  # seconds
+
+    # Revoked tokens (logout, kick, demotion). Each worker keeps them in
+    # memory and re-reads new revocations every REVOCATION_SYNC_INTERVAL
+    # seconds, so other workers honour a revocation within that long.
+    REVOCATION_SYNC_INTERVAL = 5
+    REVOCATION_SYNC_OVERLAP = 30  # seconds re-read for late commits / clock skew
+    REVOCATION_BLOOM_CAPACITY = 10_000  # grows as needed
+    REVOCATION_BLOOM_ERROR_RATE = 0.001
+
+    # Token buckets checked before /login does any lookup or hashing.
+    # Each limit is (burst, attempts refilled per minute).
+    RATE_LIMIT_ENABLED = True
+    RATE_LIMIT_BACKEND = "memory"  # or "sqlite" to share across processes
+    RATE_LIMIT_SQLITE_PATH = getenv("RATE_LIMIT_SQLITE_PATH", "instance/rate_limit.db")
+    RATE_LIMIT_MAX_KEYS = 100_000  # memory backend only
+    LOGIN_RATE_LIMITS = {"ip": (20, 10), "email": (5, 1)}
+    # Reverse proxies in front of the app (0 = none). The client address,
+    # which keys the per-IP bucket, is then read from that many trailing
+    # X-Forwarded-For hops; never count more proxies than you run, or
+    # clients can pick their own address.
+    PROXY_FIX_X_FOR = int(getenv("PROXY_FIX_X_FOR", 0))
+    PROXY_FIX_X_PROTO = int(getenv("PROXY_FIX_X_PROTO", 0))
+
+    # ASGI app (app/asgi.py). The async engine defaults to DATABASE_URL on
+    # its async driver and to SQLALCHEMY_ENGINE_OPTIONS' pool sizing.
+    ASYNC_DATABASE_URI = getenv("ASYNC_DATABASE_URL")
+    ASYNC_SQLALCHEMY_ENGINE_OPTIONS = None
+    ASGI_WSGI_WORKERS = 10  # threads serving the routes that stay on Flask
+
+    # Flask-Admin at /admin. Off unless enabled, so API workers never
+    # import it. Only the accounts listed in ADMIN_EMAILS (comma-separated)
+    # can sign in, with their email and password.
+    ADMIN_ENABLED = getenv("ADMIN_ENABLED", "").lower() in ("1", "true", "yes")
+    ADMIN_EMAILS = frozenset(
+        email.strip().lower() for email in getenv("ADMIN_EMAILS", "").split(",") if email.strip())
+
+    # Production server (gunicorn.conf.py). 0 workers = 2 x CPUs + 1; keep
+    # WEB_THREADS within each worker's pool_size + max_overflow.
+    WEB_WORKERS = int(getenv("WEB_CONCURRENCY", 0))
+    WEB_THREADS = int(getenv("WEB_THREADS", 4))
+    WEB_TIMEOUT = 30  # seconds before a stuck worker is restarted
+    WEB_MAX_REQUESTS = 10_000  # recycle workers (jittered) to cap slow leaks
+    # Before a new worker takes traffic it opens WARMUP_CONNECTIONS pool
+    # connections (default: pool_size) and caches the WARMUP_GUILDS biggest
+    # guilds and their leaders
+    WARMUP_ENABLED = True
+    WARMUP_CONNECTIONS = None
+    WARMUP_GUILDS = 100
 
 class DevelopmentConfig(BaseConfig):
     DEBUG = True
+    ADMIN_ENABLED = getenv("ADMIN_ENABLED", "true").lower() in ("1", "true", "yes")
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        **BaseConfig.SQLALCHEMY_ENGINE_OPTIONS,
+        "pool_size": 2,
+        "max_overflow": 3,
+        "pool_timeout": 10,
+    }
+    SQLITE_PRAGMAS = {"journal_mode": "WAL", "synchronous": "NORMAL"}
+    LOG_LEVEL = "DEBUG"
+    LOG_FORMAT = "text"
 
 class TestConfig(BaseConfig):
     SQLALCHEMY_DATABASE_URI = "sqlite+pysqlite:///:memory:"
     TESTING = True
+    SECRET_KEY = getenv("SECRET_KEY", "test-secret-key")
+    ADMIN_ENABLED = False
+    # In-memory SQLite runs on a StaticPool, so no pool sizing here
+    SQLALCHEMY_ENGINE_OPTIONS = {"query_cache_size": 500}
+    SQLITE_PRAGMAS = {"journal_mode": "WAL", "synchronous": "NORMAL"}
+    PASSWORD_HASH_POOL_SIZE = 0
+    LOG_LEVEL = "WARNING"
+    LOG_PROPAGATE = True  # let pytest's caplog see app records
+    # Every test client shares one IP; keep the limits out of the way
+    LOGIN_RATE_LIMITS = {"ip": (1000, 1000), "email": (1000, 1000)}
 
 class ProductionConfig(BaseConfig):
     DEBUG = False
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        **BaseConfig.SQLALCHEMY_ENGINE_OPTIONS,
+        "pool_size": int(getenv("DB_POOL_SIZE", 10)),
+        "max_overflow": int(getenv("DB_MAX_OVERFLOW", 20)),
+        "pool_timeout": 5,  # fail fast instead of queueing requests behind the pool
+        "query_cache_size": 1200,
+    }
+    SLOW_REQUEST_THRESHOLD_MS = 250
+    LOG_SAMPLE_RATE = 0.1
+    PASSWORD_HASH_POOL_SIZE = int(getenv("PASSWORD_HASH_POOL_SIZE", cpu_count() or 1))
+    PASSWORD_HASH_MAX_PENDING = PASSWORD_HASH_POOL_SIZE * 8
+    TOKEN_CACHE_SIZE = 65536
+    RATE_LIMIT_BACKEND = getenv("RATE_LIMIT_BACKEND", "sqlite")
+
+class BenchmarkConfig(BaseConfig):
+    # File-backed so seeded datasets survive between runs
+    SQLALCHEMY_DATABASE_URI = getenv("BENCHMARK_DATABASE_URL", "sqlite:///benchmark.db")
+    TESTING = True
+    SECRET_KEY = getenv("SECRET_KEY", "benchmark-secret-key")
+    SQLITE_PRAGMAS = {"journal_mode": "WAL", "synchronous": "NORMAL"}
+    PASSWORD_HASH_POOL_SIZE = 0  # measure the KDF itself, not pool hand-off
+    REQUEST_TIMING_ENABLED = False
+    METRICS_ENABLED = False
+    RATE_LIMIT_ENABLED = False  # the login case hammers one account
+    LOG_LEVEL = "WARNING"
 
 def get_config(env):
     return {
         "development": DevelopmentConfig,
         "testing": TestConfig,
         "production": ProductionConfig,
+        "benchmark": BenchmarkConfig,
     }.get(env or getenv("FLASK_ENV", "development"))
\ No newline at end of file
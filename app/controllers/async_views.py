@@ -0,0 +1,144 @@
+"""
+Async versions of the read-only GET routes of the users and guilds
+blueprints, served by the ASGI app (see app/asgi.py). They share
+parameter parsing, services' statements, the snapshot cache, ETags and
+response shapes with the Flask views, so a client can't tell which one
+answered.
+"""
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.controllers.params import parse_limit, parse_members_params, parse_user_ids
+from app.serializers import (
+    serialize_guild, serialize_guild_listings, serialize_user, serialize_users)
+from app.services.guild_service import (
+    AsyncGuildService, MEMBERS_DEFAULT_LIMIT, MEMBERS_MAX_LIMIT, GUILDS_DEFAULT_LIMIT,
+    GUILDS_MAX_LIMIT)
+from app.services.user_service import AsyncUserService
+from app.utils.asgi import AsyncRequest, AsyncResponse, AsyncRouter
+from app.utils.http_cache import make_etag, etag_matches
+
+
+def _not_modified(request: AsyncRequest, etag: str) -> bool:
+    return etag_matches(request.headers.get("if-none-match"), etag)
+
+
+async def get_users(request: AsyncRequest, session: AsyncSession) -> AsyncResponse:
+    try:
+        user_ids = parse_user_ids(request.args)
+        users, missing = await AsyncUserService.get_users_by_ids(session, user_ids)
+    except ValueError as ve:
+        return AsyncResponse(400, {"error": str(ve)})
+
+    return AsyncResponse(200, {"users": serialize_users(users), "missing": missing})
+
+
+async def get_user(request: AsyncRequest, session: AsyncSession,
+                   user_id: int) -> AsyncResponse:
+    user = await AsyncUserService.get_user_by_id(session, user_id)
+    if not user:
+        return AsyncResponse(404, {"error": "User not found"})
+
+    etag = make_etag("user", user.id, user.updated_at.isoformat())
+    if _not_modified(request, etag):
+        return AsyncResponse(304, etag=etag)
+
+    return AsyncResponse(200, serialize_user(user), etag)
+
+
+async def list_guilds(request: AsyncRequest, session: AsyncSession) -> AsyncResponse:
+    try:
+        limit = parse_limit(request.args, GUILDS_DEFAULT_LIMIT, GUILDS_MAX_LIMIT)
+        guilds, next_cursor = await AsyncGuildService.list_guilds(
+            session,
+            sort=request.args.get("sort", "name"),
+            limit=limit,
+            cursor=request.args.get("cursor"),
+            prefix=request.args.get("prefix")
+        )
+    except ValueError as ve:
+        return AsyncResponse(400, {"error": str(ve)})
+
+    return AsyncResponse(200, {
+        "guilds": serialize_guild_listings(guilds),
+        "next_cursor": next_cursor
+    })
+
+
+async def get_guild_details(request: AsyncRequest, session: AsyncSession,
+                            guild_id: int) -> AsyncResponse:
+    guild = await AsyncGuildService.get_guild_by_id(session, guild_id)
+    if not guild:
+        return AsyncResponse(404, {"error": "Guild not found"})
+
+    etag = make_etag("guild", guild.id, guild.updated_at.isoformat())
+    if _not_modified(request, etag):
+        return AsyncResponse(304, etag=etag)
+
+    return AsyncResponse(200, serialize_guild(guild), etag)
+
+
+async def get_guild_members(request: AsyncRequest, session: AsyncSession,
+                            guild_id: int) -> AsyncResponse:
+    try:
+        limit, after, role = parse_members_params(
+            request.args, MEMBERS_DEFAULT_LIMIT, MEMBERS_MAX_LIMIT)
+    except ValueError as ve:
+        return AsyncResponse(400, {"error": str(ve)})
+
+    guild = await AsyncGuildService.get_guild_by_id(session, guild_id)
+    if not guild:
+        return AsyncResponse(404, {"error": "Guild not found"})
+
+    etag = make_etag("members", guild.id, guild.roster_version,
+                     limit, after, role.value if role else None)
+    if _not_modified(request, etag):
+        return AsyncResponse(304, etag=etag)
+
+    page = await AsyncGuildService.get_guild_members(
+        session, guild_id, limit=limit, after=after, role=role)
+    if page is None:
+        return AsyncResponse(404, {"error": "Guild not found"})
+
+    members, next_cursor = page
+    return AsyncResponse(200, {
+        "members": serialize_users(members),
+        "next_cursor": next_cursor
+    }, etag)
+
+
+async def get_guild_overview(request: AsyncRequest, session: AsyncSession,
+                             guild_id: int) -> AsyncResponse:
+    try:
+        limit = parse_limit(request.args, MEMBERS_DEFAULT_LIMIT, MEMBERS_MAX_LIMIT)
+    except ValueError as ve:
+        return AsyncResponse(400, {"error": str(ve)})
+
+    snapshot = await AsyncGuildService.get_guild_by_id(session, guild_id)
+    if not snapshot:
+        return AsyncResponse(404, {"error": "Guild not found"})
+
+    etag = make_etag("overview", snapshot.id, snapshot.updated_at.isoformat(),
+                     snapshot.roster_version, limit)
+    if _not_modified(request, etag):
+        return AsyncResponse(304, etag=etag)
+
+    overview = await AsyncGuildService.get_guild_overview(session, guild_id, limit=limit)
+    if overview is None:
+        return AsyncResponse(404, {"error": "Guild not found"})
+
+    guild, members, next_cursor = overview
+    return AsyncResponse(200, {
+        "guild": serialize_guild(guild),
+        "member_count": guild.member_count,
+        "leader": serialize_user(guild.creator),
+        "members": serialize_users(members),
+        "next_cursor": next_cursor
+    }, etag)
+
+
+def register_async_views(router: AsyncRouter, prefix: str = "/api/v1") -> None:
+    router.add(prefix + r"/users", get_users)
+    router.add(prefix + r"/users/(?P<user_id>\d+)", get_user)
+    router.add(prefix + r"/guilds", list_guilds)
+    router.add(prefix + r"/guilds/(?P<guild_id>\d+)", get_guild_details)
+    router.add(prefix + r"/guilds/(?P<guild_id>\d+)/members", get_guild_members)
+    router.add(prefix + r"/guilds/(?P<guild_id>\d+)/overview", get_guild_overview)
@@ -1,7 +1,15 @@
+import logging
 from flask import Blueprint, request, jsonify
-from app.services.guild_service import GuildService
+from app.controllers.params import parse_limit, parse_members_params
+from app.serializers import (
+    serialize_guild, serialize_guild_listings, serialize_user, serialize_users)
+from app.services.guild_service import (
+    GuildService, MEMBERS_DEFAULT_LIMIT, MEMBERS_MAX_LIMIT, GUILDS_DEFAULT_LIMIT,
+    GUILDS_MAX_LIMIT)
 from app.utils.auth import token_required
-import traceback
+from app.utils.http_cache import make_etag, is_not_modified, not_modified, with_etag
+
+logger = logging.getLogger(__name__)
 
 # This blueprint handles all /api/v1/guilds routes
 guilds_bp = Blueprint("guilds", __name__)
@@ -19,40 +27,62 @@ def create_guild():
 
     try:
         guild = GuildService.create_guild(name, description, request.user_id)
-        return jsonify({
-            "id": guild.id,
-            "name": guild.name,
-            "description": guild.description,
-            "created_by": guild.created_by,
-            "created_at": guild.created_at.isoformat()
-        }), 201
+        return jsonify(serialize_guild(guild)), 201
+
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
 
+
+@guilds_bp.route("/guilds", methods=["GET"])
+@token_required  # Logged-in users can browse the guild directory
+def list_guilds():
+    """
+    Returns one page of the guild directory, each guild with its member
+    count and leader's username.
+    Query params:
+      - limit: page size (default 50, max 100)
+      - cursor: `next_cursor` returned by the previous page
+      - sort: name (default), created_at or member_count; prefix with "-"
+        for descending order
+      - prefix: only return guilds whose name starts with this text
+    """
+    try:
+        limit = parse_limit(request.args, GUILDS_DEFAULT_LIMIT, GUILDS_MAX_LIMIT)
+        guilds, next_cursor = GuildService.list_guilds(
+            sort=request.args.get("sort", "name"),
+            limit=limit,
+            cursor=request.args.get("cursor"),
+            prefix=request.args.get("prefix")
+        )
     except ValueError as ve:
         return jsonify({"error": str(ve)}), 400
 
+    return jsonify({
+        "guilds": serialize_guild_listings(guilds),
+        "next_cursor": next_cursor
+    })
+
 
 @guilds_bp.route("/guilds/<int:guild_id>", methods=["GET"])
 @token_required  # Logged-in users can view guild details
 def get_guild_details(guild_id):
-    print(f"📥 Fetching guild with ID: {guild_id}")
-    print(f"📥 [GET] /guilds/{guild_id} requested by user {request.user_id}")
+    logger.debug("Fetching guild", extra={
+        "sample": True, "guild_id": guild_id, "user_id": request.user_id})
 
     try:
         guild = GuildService.get_guild_by_id(guild_id)
         if not guild:
             return jsonify({"error": "Guild not found"}), 404
 
-        return jsonify({
-            "id": guild.id,
-            "name": guild.name,
-            "description": guild.description,
-            "created_by": guild.created_by,
-            "created_at": guild.created_at.isoformat()
-        })
+        etag = make_etag("guild", guild.id, guild.updated_at.isoformat())
+        if is_not_modified(etag):
+            return not_modified(etag)
+
+        return with_etag(jsonify(serialize_guild(guild)), etag)
 
     except Exception as e:
-        print("❌ Unexpected error in get_guild_details:", e)
-        traceback.print_exc()
+        logger.exception("Unexpected error in get_guild_details",
+                         extra={"guild_id": guild_id})
         return jsonify({"error": "Internal server error", "details": str(e)}), 500
 
 
@@ -60,14 +90,80 @@ def get_guild_details(guild_id):
 @token_required  # Users must be logged in to view guild members
 def get_guild_members(guild_id):
     """
-    Returns a list of users who are members of the specified guild.
+    Returns one page of users who are members of the specified guild.
+    Query params:
+      - limit: page size (default 50, max 200)
+      - after: cursor returned as `next_cursor` by the previous page
+      - role: only return members with this role (e.g. "raider")
+    """
+    try:
+        limit, after, role = parse_members_params(
+            request.args, MEMBERS_DEFAULT_LIMIT, MEMBERS_MAX_LIMIT)
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+
+    guild = GuildService.get_guild_by_id(guild_id)
+    if not guild:
+        return jsonify({"error": "Guild not found"}), 404
+
+    # The roster version changes whenever membership or a member's profile
+    # does, so a matching ETag lets us answer 304 without touching the
+    # member rows at all
+    etag = make_etag("members", guild.id, guild.roster_version,
+                     limit, after, role.value if role else None)
+    if is_not_modified(etag):
+        return not_modified(etag)
+
+    page = GuildService.get_guild_members(guild_id, limit=limit, after=after, role=role)
+
+    if page is None:
+        return jsonify({"error": "Guild not found"}), 404
+
+    members, next_cursor = page
+    return with_etag(jsonify({
+        "members": serialize_users(members),
+        "next_cursor": next_cursor
+    }), etag)
+
+
+@guilds_bp.route("/guilds/<int:guild_id>/overview", methods=["GET"])
+@token_required
+def get_guild_overview(guild_id):
+    """
+    Returns everything a guild page needs in one response: the guild, its
+    member count, its leader and the first page of members.
+    Query params:
+      - limit: members page size (default 50, max 200); continue with
+        /guilds/<id>/members?after=<next_cursor>
     """
-    members = GuildService.get_guild_members(guild_id)
+    try:
+        limit = parse_limit(request.args, MEMBERS_DEFAULT_LIMIT, MEMBERS_MAX_LIMIT)
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+
+    snapshot = GuildService.get_guild_by_id(guild_id)
+    if not snapshot:
+        return jsonify({"error": "Guild not found"}), 404
+
+    # Guild edits bump updated_at; joins, leaves, leadership changes and
+    # member profile edits bump roster_version
+    etag = make_etag("overview", snapshot.id, snapshot.updated_at.isoformat(),
+                     snapshot.roster_version, limit)
+    if is_not_modified(etag):
+        return not_modified(etag)
 
-    if members is None:
+    overview = GuildService.get_guild_overview(guild_id, limit=limit)
+    if overview is None:
         return jsonify({"error": "Guild not found"}), 404
 
-    return jsonify([member.serialize() for member in members])
+    guild, members, next_cursor = overview
+    return with_etag(jsonify({
+        "guild": serialize_guild(guild),
+        "member_count": guild.member_count,
+        "leader": serialize_user(guild.creator),
+        "members": serialize_users(members),
+        "next_cursor": next_cursor
+    }), etag)
 
 
 @guilds_bp.route("/guilds/<int:guild_id>", methods=["PATCH"])
@@ -91,13 +187,7 @@ def update_guild(guild_id):
             name=new_name,
             description=new_description
         )
-        return jsonify({
-            "id": updated_guild.id,
-            "name": updated_guild.name,
-            "description": updated_guild.description,
-            "created_by": updated_guild.created_by,
-            "created_at": updated_guild.created_at.isoformat()
-        }), 200
+        return jsonify(serialize_guild(updated_guild)), 200
 
     except ValueError as ve:
         return jsonify({"error": str(ve)}), 400
@@ -0,0 +1,57 @@
+"""
+Query-string parsing shared by the Flask controllers and the ASGI app.
+Each parser takes the request's query params (any mapping) and raises
+ValueError with the message to answer 400 with.
+"""
+from typing import Mapping, Optional
+from app.models.user import RoleEnum
+
+
+def parse_limit(args: Mapping, default: int, maximum: int) -> int:
+    try:
+        limit = int(args.get("limit", default))
+    except ValueError:
+        raise ValueError("limit must be a valid integer")
+
+    if not 1 <= limit <= maximum:
+        raise ValueError(f"limit must be between 1 and {maximum}")
+    return limit
+
+
+def parse_members_params(args: Mapping, default: int, maximum: int
+                         ) -> tuple[int, Optional[int], Optional[RoleEnum]]:
+    """
+    limit, after and role for a guild member listing.
+    """
+    try:
+        limit = int(args.get("limit", default))
+        after = args.get("after")
+        after = int(after) if after is not None else None
+    except (TypeError, ValueError):
+        raise ValueError("limit and after must be valid integers")
+
+    if not 1 <= limit <= maximum:
+        raise ValueError(f"limit must be between 1 and {maximum}")
+
+    role = args.get("role")
+    if role is not None:
+        try:
+            role = RoleEnum(role)
+        except ValueError:
+            raise ValueError(f"Unknown role: {role}")
+
+    return limit, after, role
+
+
+def parse_user_ids(args: Mapping) -> list[int]:
+    """
+    The comma-separated `ids` of a batch user lookup.
+    """
+    raw_ids = args.get("ids")
+    if not raw_ids:
+        raise ValueError("ids is required")
+
+    try:
+        return [int(user_id) for user_id in raw_ids.split(",")]
+    except ValueError:
+        raise ValueError("ids must be a comma-separated list of integers")
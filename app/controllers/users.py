@@ -1,7 +1,15 @@
+import logging
+import math
 from flask import Blueprint, request, jsonify
+from app.controllers.params import parse_user_ids
+from app.extensions import login_limiter
 from app.utils.auth import requires_roles, token_required
-from app.services.user_service import UserService
-import traceback
+from app.services.user_service import UserService, normalize_email
+from app.serializers import serialize_user, serialize_users
+from app.utils.hashing import HashingUnavailable
+from app.utils.http_cache import make_etag, is_not_modified, not_modified, with_etag
+
+logger = logging.getLogger(__name__)
 
 users_bp = Blueprint("users_bp", __name__)
 
@@ -19,41 +27,64 @@ def register():
 
     if not username or not email or not password:
         return jsonify({"error": "Missing fields"}), 400
+    if not isinstance(email, str):
+        return jsonify({"error": "Email must be a string"}), 400
 
     try:
         user = UserService.register_user(username, email, password)
-        return jsonify(user.serialize()), 201
+        return jsonify(serialize_user(user)), 201
     except ValueError as ve:
         return jsonify({"error": str(ve)}), 400
+    except HashingUnavailable:
+        return _server_busy()
 
 
 @users_bp.route("/debug", methods=["GET"])
 def debug_ping():
-    print("📡 Debug route hit")
+    logger.debug("Debug route hit", extra={"sample": True})
     return jsonify({"status": "backend is reachable"}), 200
 
 
+@users_bp.route("/users", methods=["GET"])
+@token_required
+def get_users():
+    """
+    Fetch several users by ID in one call: /users?ids=3,1,2
+    Returns the users in the order requested, plus the IDs that don't exist.
+    """
+    try:
+        user_ids = parse_user_ids(request.args)
+        users, missing = UserService.get_users_by_ids(user_ids)
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+
+    return jsonify({"users": serialize_users(users), "missing": missing}), 200
+
+
 @users_bp.route("/users/<int:user_id>", methods=["GET"])
 @token_required
 def get_user(user_id):
     """
     Fetch a user by their ID.
-    Returns 404 if not found.
+    Returns 404 if not found, 304 if the client's ETag is still current.
     """
     try:
-        print(f"📥 [GET] /users/{user_id} requested by {request.user_id}")
+        logger.debug("Fetching user", extra={
+            "sample": True, "target_user_id": user_id, "user_id": request.user_id})
         user = UserService.get_user_by_id(user_id)
 
         if not user:
-            print("❌ User not found")
             return jsonify({"error": "User not found"}), 404
 
-        print("✅ User found:", user.username)
-        return user.serialize(), 200
+        etag = make_etag("user", user.id, user.updated_at.isoformat())
+        if is_not_modified(etag):
+            return not_modified(etag)
+
+        return with_etag(jsonify(serialize_user(user)), etag)
 
     except Exception as e:
-        print("❌ Error in get_user route:", e)
-        traceback.print_exc()
+        logger.exception("Unexpected error in get_user",
+                         extra={"target_user_id": user_id})
         return jsonify({"error": "Internal server error", "details": str(e)}), 500
 
 
@@ -69,15 +100,45 @@ def login():
 
     if not email or not password:
         return jsonify({"error": "Missing email or password"}), 400
+    if not isinstance(email, str):
+        return jsonify({"error": "Email must be a string"}), 400
+
+    # Checked before any user lookup or password hashing, so a flood of
+    # bad logins can't turn into CPU exhaustion
+    retry_after = login_limiter.hit(ip=request.remote_addr, email=normalize_email(email))
+    if retry_after:
+        logger.info("Login rate limited", extra={"sample": True, "ip": request.remote_addr})
+        response = jsonify({"error": "Too many login attempts, please try again later"})
+        response.headers["Retry-After"] = str(math.ceil(retry_after))
+        return response, 429
 
     try:
         user, token = UserService.login(email, password)
         return jsonify({
-            "user": user.serialize(),
+            "user": serialize_user(user),
             "token": token
         }), 200
     except ValueError as ve:
         return jsonify({"error": str(ve)}), 401
+    except HashingUnavailable:
+        return _server_busy()
+
+
+@users_bp.route("/logout", methods=["POST"])
+@token_required
+def logout():
+    """
+    Revokes the bearer token the request was made with.
+    """
+    UserService.logout(request.token_claims)
+    return jsonify({"message": "Logged out"}), 200
+
+
+def _server_busy():
+    # The password hashing pool is saturated; ask the client to back off
+    response = jsonify({"error": "Server is busy, please try again shortly"})
+    response.headers["Retry-After"] = "1"
+    return response, 503
 
 
 @users_bp.route("/protected", methods=["GET"])
@@ -1,9 +1,21 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_cors import CORS
-from flask_admin import Admin
+from app.utils.async_db import AsyncDatabase
+from app.utils.db_pool import PoolStats
+from app.utils.hashing import PasswordHasher
+from app.utils.metrics import Metrics
+from app.utils.rate_limit import RateLimiter
+from app.utils.request_timing import RequestTiming
+from app.utils.token_cache import TokenCache
 
 db = SQLAlchemy()
 migrate = Migrate()
 cors = CORS()
-admin = Admin(name="Admin")
\ No newline at end of file
+password_hasher = PasswordHasher()
+token_cache = TokenCache()
+pool_stats = PoolStats()
+request_timing = RequestTiming()
+metrics = Metrics()
+login_limiter = RateLimiter("LOGIN_RATE_LIMITS")
+async_db = AsyncDatabase()  # initialised by the ASGI app only
@@ -1,18 +1,31 @@
 from datetime import datetime, timezone
 from app.extensions import db
-from sqlalchemy import Integer, String, ForeignKey, DateTime
+from sqlalchemy import Integer, String, ForeignKey, DateTime, Index, func
 from sqlalchemy.orm import mapped_column, relationship
 
 
 class Guild(db.Model):
     __tablename__ = "guilds"
+    __table_args__ = (
+        # Directory sorted by size, keyset-paginated on (member_count, id)
+        Index("ix_guilds_member_count_id", "member_count", "id"),
+    )
 
     id = mapped_column(Integer, primary_key=True)
     name = mapped_column(String(100), nullable=False, unique=True)
     description = mapped_column(String(255))
-    created_by = mapped_column(Integer, ForeignKey("users.id", use_alter=True), nullable=False)
+    created_by = mapped_column(Integer, ForeignKey("users.id", use_alter=True), nullable=False, index=True)
     created_at = mapped_column(
-        DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+        DateTime, default=lambda: datetime.now(timezone.utc), nullable=False, index=True)
+    updated_at = mapped_column(
+        DateTime, default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc), nullable=False)
+    # Bumped whenever someone joins, leaves or changes role in the guild
+    roster_version = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    # Denormalized count of users.guild_id == id. Only ever changed with
+    # `member_count + n` in the same transaction as the membership change;
+    # `flask guilds reconcile-counts` repairs any drift.
+    member_count = mapped_column(Integer, default=0, server_default="0", nullable=False)
 
     members = relationship(
         "User",
@@ -22,3 +35,7 @@ class Guild(db.Model):
 
     creator = relationship(
         "User", backref="created_guilds", foreign_keys=[created_by])
+
+
+# Names are unique regardless of case; display case is kept as typed
+Index("uq_guilds_name_lower", func.lower(Guild.name), unique=True)
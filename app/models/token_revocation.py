@@ -0,0 +1,22 @@
+from datetime import datetime, timezone
+from app.extensions import db
+from sqlalchemy import Integer, String, DateTime
+from sqlalchemy.orm import mapped_column
+
+
+class TokenRevocation(db.Model):
+    """
+    One revoked token (`jti` set: a logout) or every token a user was
+    issued up to `revoked_at` (`jti` NULL: kicked, demoted). Workers sync
+    these into their in-memory denylist; rows are only needed until
+    `expires_at`, when the tokens they cover have expired anyway.
+    """
+    __tablename__ = "token_revocations"
+
+    id = mapped_column(Integer, primary_key=True)
+    jti = mapped_column(String(32))
+    user_id = mapped_column(Integer, nullable=False)
+    # Workers read new rows by revoked_at; expired rows are pruned by expires_at
+    revoked_at = mapped_column(
+        DateTime, default=lambda: datetime.now(timezone.utc), nullable=False, index=True)
+    expires_at = mapped_column(DateTime, nullable=False, index=True)
@@ -1,6 +1,6 @@
 from datetime import datetime, timezone
 import enum
-from sqlalchemy import String, Integer, Boolean, DateTime, Enum
+from sqlalchemy import String, Integer, Boolean, DateTime, Enum, Index
 from sqlalchemy.orm import mapped_column
 from app.extensions import db
 from sqlalchemy import ForeignKey
@@ -16,6 +16,10 @@ class RoleEnum(enum.Enum):
 
 class User(db.Model):
     __tablename__ = "users"
+    __table_args__ = (
+        # Roster listings filtered by role
+        Index("ix_users_guild_id_role", "guild_id", "role"),
+    )
 
     id = mapped_column(Integer, primary_key=True)
     username = mapped_column(String(150), nullable=False, unique=True)
@@ -26,8 +30,9 @@ class User(db.Model):
     created_at = mapped_column(
         DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
     updated_at = mapped_column(
-        DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
-    guild_id = mapped_column(Integer, ForeignKey("guilds.id", use_alter=True), nullable=True)
+        DateTime, default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc), nullable=False)
+    guild_id = mapped_column(Integer, ForeignKey("guilds.id", use_alter=True), nullable=True, index=True)
     guild = relationship("Guild", back_populates="members", foreign_keys=[guild_id])
 
 
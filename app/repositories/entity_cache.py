@@ -0,0 +1,221 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Awaitable, Callable, Hashable, Iterable, Optional
+from app.models.guild import Guild
+from app.models.user import User, RoleEnum
+
+
+@dataclass(frozen=True, slots=True)
+class UserSnapshot:
+    """Read-only copy of a User row, safe to share between requests."""
+    id: int
+    username: str
+    email: str
+    role: RoleEnum
+    is_active: bool
+    guild_id: Optional[int]
+    created_at: datetime
+    updated_at: datetime
+
+    # Same JSON shape as the ORM model
+    serialize = User.serialize
+
+    @classmethod
+    def from_model(cls, user: User) -> "UserSnapshot":
+        return cls(
+            id=user.id,
+            username=user.username,
+            email=user.email,
+            role=user.role,
+            is_active=user.is_active,
+            guild_id=user.guild_id,
+            created_at=user.created_at,
+            updated_at=user.updated_at
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class GuildSnapshot:
+    """Read-only copy of a Guild row, safe to share between requests."""
+    id: int
+    name: str
+    description: Optional[str]
+    created_by: int
+    created_at: datetime
+    updated_at: datetime
+    roster_version: int
+
+    @classmethod
+    def from_model(cls, guild: Guild) -> "GuildSnapshot":
+        return cls(
+            id=guild.id,
+            name=guild.name,
+            description=guild.description,
+            created_by=guild.created_by,
+            created_at=guild.created_at,
+            updated_at=guild.updated_at,
+            roster_version=guild.roster_version
+        )
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries also expire after `ttl` seconds.
+    A `maxsize` of 0 disables caching (every lookup is a miss).
+    """
+
+    def __init__(self, maxsize: int = 0, ttl: float = 0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, tuple[float, object]] = OrderedDict()
+        self._invalidations = 0
+        self._lock = threading.Lock()
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Optional[object]]):
+        """
+        Returns the cached value for `key`, or calls `loader` on a miss and
+        caches its result. `None` results (row not found) are not cached.
+        """
+        now = time.monotonic()
+        found, missing, invalidations = self._lookup((key,), now)
+        if not missing:
+            return found[key]
+
+        value = loader()
+
+        if value is not None:
+            self._store({key: value}, now, invalidations)
+
+        return value
+
+    async def aget_or_load(self, key: Hashable,
+                           loader: Callable[[], Awaitable[Optional[object]]]):
+        """get_or_load for the async path: `loader` is awaited."""
+        now = time.monotonic()
+        found, missing, invalidations = self._lookup((key,), now)
+        if not missing:
+            return found[key]
+
+        value = await loader()
+
+        if value is not None:
+            self._store({key: value}, now, invalidations)
+
+        return value
+
+    def get_many_or_load(self, keys: Iterable[Hashable],
+                         loader: Callable[[list], dict]) -> dict:
+        """
+        Batch form of get_or_load. Returns {key: value} for every key that
+        exists, calling `loader` once with the list of missed keys; it must
+        return {key: value} for the ones it found.
+        """
+        now = time.monotonic()
+        found, missing, invalidations = self._lookup(keys, now)
+
+        if missing:
+            loaded = loader(missing)
+            self._store(loaded, now, invalidations)
+            found.update(loaded)
+
+        return found
+
+    async def aget_many_or_load(self, keys: Iterable[Hashable],
+                                loader: Callable[[list], Awaitable[dict]]) -> dict:
+        """get_many_or_load for the async path: `loader` is awaited."""
+        now = time.monotonic()
+        found, missing, invalidations = self._lookup(keys, now)
+
+        if missing:
+            loaded = await loader(missing)
+            self._store(loaded, now, invalidations)
+            found.update(loaded)
+
+        return found
+
+    def _lookup(self, keys: Iterable[Hashable], now: float) -> tuple[dict, list, int]:
+        # Splits `keys` into fresh hits and misses, and notes the
+        # invalidation count the misses' loads will be checked against
+        found = {}
+        missing = []
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    found[key] = entry[1]
+                else:
+                    self.misses += 1
+                    missing.append(key)
+            return found, missing, self._invalidations
+
+    def _store(self, values: dict, now: float, invalidations: int) -> None:
+        if not values or not self.maxsize:
+            return
+        with self._lock:
+            # A write that landed while we were loading may have made these
+            # values stale already, so only cache them if none did.
+            if invalidations != self._invalidations:
+                return
+            for key, value in values.items():
+                self._entries[key] = (now + self.ttl, value)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *keys: Hashable) -> None:
+        with self._lock:
+            self._invalidations += 1
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._invalidations += 1
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+            }
+
+
+class EntityCache:
+    """
+    Read-through cache of User and Guild snapshots, keyed by primary key.
+    Every write path must invalidate the keys it touches after committing.
+    """
+
+    def __init__(self, app=None):
+        self.users = TTLCache()
+        self.guilds = TTLCache()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        maxsize = app.config.get("ENTITY_CACHE_SIZE", 0)
+        ttl = app.config.get("ENTITY_CACHE_TTL", 0)
+        self.users = TTLCache(maxsize, ttl)
+        self.guilds = TTLCache(maxsize, ttl)
+        app.extensions["entity_cache"] = self
+
+    def stats(self) -> dict:
+        return {"users": self.users.stats(), "guilds": self.guilds.stats()}
+
+
+entity_cache = EntityCache()
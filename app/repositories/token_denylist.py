@@ -0,0 +1,228 @@
+import hashlib
+import logging
+import math
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from app.extensions import db
+from app.models.token_revocation import TokenRevocation
+
+logger = logging.getLogger(__name__)
+
+
+def _epoch(value: datetime) -> float:
+    # Naive datetimes (SQLite) are UTC
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def naive_utc(epoch: float) -> datetime:
+    # Naive UTC, as the DateTime columns store it
+    return datetime.fromtimestamp(epoch, timezone.utc).replace(tzinfo=None)
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings: `in` is never wrong about an item
+    that was added, and wrong about one that wasn't with probability
+    `error_rate` while it holds at most `capacity` items. Items can't be
+    removed; build a new filter instead.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(capacity, 1)
+        self.capacity = capacity
+        self.size = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hashes = max(round(self.size / capacity * math.log(2)), 1)
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        # Double hashing: k positions from the two halves of one digest
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[p >> 3] & (1 << (p & 7)) for p in self._positions(item))
+
+
+class TokenDenylist:
+    """
+    This worker's copy of the token_revocations table, so checking a token
+    takes no DB access:
+      - revoked `jti`s in a Bloom filter, which clears almost every token
+        on its own, backed by an exact {jti: exp} map that confirms the
+        filter's positives
+      - per-user cutoffs: tokens for that user issued (`iat`) before it
+        are revoked
+    It re-reads rows revoked since its last sync every
+    REVOCATION_SYNC_INTERVAL seconds (overlapping by REVOCATION_SYNC_OVERLAP
+    for transactions that commit late and for clock skew between hosts), on
+    whichever request comes first, and then drops entries whose tokens
+    have all expired. Revocations made by this worker apply at once;
+    other workers see them within one sync interval.
+    """
+
+    def __init__(self, app=None):
+        self.sync_interval = 5.0
+        self.sync_overlap = 30.0
+        self.capacity = 10_000
+        self.error_rate = 0.001
+        self._app = None
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self.reset()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.sync_interval = app.config.get("REVOCATION_SYNC_INTERVAL", 5.0)
+        self.sync_overlap = app.config.get("REVOCATION_SYNC_OVERLAP", 30.0)
+        self.capacity = app.config.get("REVOCATION_BLOOM_CAPACITY", 10_000)
+        self.error_rate = app.config.get("REVOCATION_BLOOM_ERROR_RATE", 0.001)
+        self._app = app
+        self.reset()
+        app.extensions["token_denylist"] = self
+
+    def reset(self) -> None:
+        """Forgets everything; the next check does a full sync."""
+        with self._lock:
+            self._tokens: dict[str, float] = {}  # jti -> exp
+            self._cutoffs: dict[str, tuple[float, float]] = {}  # sub -> (revoked_at, expires_at)
+            self._bloom = BloomFilter(self.capacity, self.error_rate)
+            self._next_expiry = math.inf
+            self._synced_at: Optional[float] = None
+            self._next_sync = 0.0
+            self.syncs = 0
+            self.rejected = 0
+
+    # -- hot path --
+
+    def sync_due(self) -> bool:
+        """Whether the sync interval has passed."""
+        return time.time() >= self._next_sync
+
+    def is_revoked(self, claims: dict, sync: bool = True) -> bool:
+        """
+        Whether verified `claims` belong to a revoked token. Syncs first if
+        the interval has passed, unless `sync` is false because the caller
+        syncs itself (the ASGI app, off the event loop); otherwise touches
+        only memory.
+        """
+        now = time.time()
+        if sync and now >= self._next_sync:
+            self.sync(now)
+
+        revoked = False
+        jti = claims.get("jti")
+        if self._tokens and jti is not None and jti in self._bloom:
+            revoked = jti in self._tokens
+        if not revoked and self._cutoffs:
+            cutoff = self._cutoffs.get(claims.get("sub"))
+            # Tokens without an `iat` predate revocation support
+            revoked = cutoff is not None and claims.get("iat", 0) <= cutoff[0]
+
+        if revoked:
+            self.rejected += 1
+        return revoked
+
+    # -- updates --
+
+    def add_token(self, jti: str, expires_at: float) -> None:
+        with self._lock:
+            if len(self._tokens) >= self._bloom.capacity:
+                # Past capacity the error rate climbs; rebuild bigger
+                self._rebuild(self._bloom.capacity * 2)
+            self._tokens[jti] = expires_at
+            self._bloom.add(jti)
+            self._next_expiry = min(self._next_expiry, expires_at)
+
+    def add_cutoff(self, user_id: int, revoked_at: float, expires_at: float) -> None:
+        with self._lock:
+            key = str(user_id)
+            current = self._cutoffs.get(key)
+            if current is None or current[0] < revoked_at:
+                self._cutoffs[key] = (revoked_at, expires_at)
+                self._next_expiry = min(self._next_expiry, expires_at)
+
+    def add_rows(self, rows: Iterable[TokenRevocation]) -> None:
+        for row in rows:
+            if row.jti is not None:
+                self.add_token(row.jti, _epoch(row.expires_at))
+            else:
+                self.add_cutoff(row.user_id, _epoch(row.revoked_at), _epoch(row.expires_at))
+
+    def sync(self, now: Optional[float] = None) -> None:
+        """
+        Loads rows revoked since the last sync (all unexpired rows the first
+        time). Only one thread syncs at a time; the others carry on with the
+        current state. A failed sync is logged and retried next interval.
+        """
+        if not self._sync_lock.acquire(blocking=False):
+            return
+        now = time.time() if now is None else now
+        try:
+            self._next_sync = now + self.sync_interval
+            stmt = select(TokenRevocation.jti, TokenRevocation.user_id,
+                          TokenRevocation.revoked_at, TokenRevocation.expires_at
+                          ).where(TokenRevocation.expires_at > naive_utc(now))
+            if self._synced_at is not None:
+                stmt = stmt.where(
+                    TokenRevocation.revoked_at >= naive_utc(self._synced_at - self.sync_overlap))
+
+            # Its own connection, so it never joins the request's transaction
+            with self._app.app_context(), db.engine.connect() as connection:
+                rows = connection.execute(stmt).all()
+            self.add_rows(rows)
+            self._synced_at = now
+            self.syncs += 1
+        except SQLAlchemyError:
+            logger.warning("Token denylist sync failed", exc_info=True)
+        finally:
+            self._sync_lock.release()
+        # Expired tokens fail verification anyway, so their entries only
+        # need dropping once per sync
+        if now >= self._next_expiry:
+            self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        with self._lock:
+            tokens = {jti: exp for jti, exp in self._tokens.items() if exp > now}
+            evicted = len(tokens) < len(self._tokens)
+            self._tokens = tokens
+            self._cutoffs = {sub: c for sub, c in self._cutoffs.items() if c[1] > now}
+            if evicted:
+                self._rebuild(self.capacity)
+            self._next_expiry = min(
+                [*self._tokens.values(), *(c[1] for c in self._cutoffs.values())],
+                default=math.inf)
+
+    def _rebuild(self, capacity: int) -> None:
+        # Caller holds the lock
+        bloom = BloomFilter(max(capacity, len(self._tokens) * 2), self.error_rate)
+        for jti in self._tokens:
+            bloom.add(jti)
+        self._bloom = bloom
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "tokens": len(self._tokens),
+                "users": len(self._cutoffs),
+                "bloom_bytes": len(self._bloom._bits),
+                "syncs": self.syncs,
+                "rejected": self.rejected,
+            }
+
+
+token_denylist = TokenDenylist()
@@ -0,0 +1,47 @@
+import time
+from app.extensions import db
+from app.models.token_revocation import TokenRevocation
+from app.repositories.token_denylist import token_denylist, naive_utc
+from app.utils.security import TOKEN_LIFETIME
+from sqlalchemy import Row, delete, insert
+from typing import Iterable
+
+_COLUMNS = (TokenRevocation.jti, TokenRevocation.user_id,
+            TokenRevocation.revoked_at, TokenRevocation.expires_at)
+
+
+class TokenRevocationRepository:
+    @staticmethod
+    def revoke_token(jti: str, user_id: int, expires_at: float) -> None:
+        """Revoke one token until its `exp` (logout) and commit"""
+        rows = db.session.execute(insert(TokenRevocation).returning(*_COLUMNS), [{
+            "jti": jti, "user_id": user_id, "revoked_at": naive_utc(time.time()),
+            "expires_at": naive_utc(expires_at)
+        }]).all()
+        db.session.commit()
+        token_denylist.add_rows(rows)
+
+    @staticmethod
+    def stage_user_revocations(user_ids: Iterable[int]) -> list[Row]:
+        """
+        Revoke every token issued so far to each user, in the caller's
+        transaction and in one INSERT. Once it commits, pass the result to
+        `token_denylist.add_rows` so this worker applies it at once.
+        """
+        now = time.time()
+        values = [
+            {"user_id": user_id, "revoked_at": naive_utc(now),
+             "expires_at": naive_utc(now + TOKEN_LIFETIME.total_seconds())}
+            for user_id in user_ids
+        ]
+        if not values:
+            return []
+        return db.session.execute(insert(TokenRevocation).returning(*_COLUMNS), values).all()
+
+    @staticmethod
+    def prune_expired() -> int:
+        """Delete rows whose tokens have all expired; returns how many"""
+        result = db.session.execute(
+            delete(TokenRevocation).where(TokenRevocation.expires_at <= naive_utc(time.time())))
+        db.session.commit()
+        return result.rowcount
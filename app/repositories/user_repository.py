@@ -1,7 +1,9 @@
 from app.extensions import db
 from app.models.user import User
-from sqlalchemy import select
-from typing import Optional
+from app.repositories.entity_cache import entity_cache, UserSnapshot
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Iterable, Optional
 
 class UserRepository:
     @staticmethod
@@ -13,15 +15,36 @@ class UserRepository:
             password=password  # (we'll hash it later)
         )
         db.session.add(user)
+        db.session.flush()
+        user_id = user.id  # read before commit expires it
         db.session.commit()
+        entity_cache.users.invalidate(user_id)
         return user
 
     @staticmethod
-    def get_by_id(user_id: int) -> Optional[User]:
-        """Get a user by their ID"""
-        stmt = select(User).where(User.id == user_id)
-        result = db.session.execute(stmt)
-        return result.scalars().first()
+    def get_by_id(user_id: int) -> Optional[UserSnapshot]:
+        """Get a read-only snapshot of a user by their ID (cached)"""
+        def load():
+            stmt = select(User).where(User.id == user_id)
+            user = db.session.execute(stmt).scalars().first()
+            return UserSnapshot.from_model(user) if user else None
+
+        return entity_cache.users.get_or_load(user_id, load)
+
+    @staticmethod
+    def get_many(user_ids: Iterable[int]) -> list[UserSnapshot]:
+        """
+        Get snapshots for many users, in the order the ids were given and
+        skipping unknown ones. Cache misses are fetched in one IN query.
+        """
+        user_ids = list(dict.fromkeys(user_ids))  # de-duplicated, order kept
+
+        def load(missing):
+            users = db.session.scalars(select(User).where(User.id.in_(missing)))
+            return {user.id: UserSnapshot.from_model(user) for user in users}
+
+        found = entity_cache.users.get_many_or_load(user_ids, load)
+        return [found[user_id] for user_id in user_ids if user_id in found]
 
     @staticmethod
     def get_by_email(email: str) -> Optional[User]:
@@ -29,3 +52,45 @@ class UserRepository:
         stmt = select(User).where(User.email == email)
         result = db.session.execute(stmt)
         return result.scalars().first()
+
+    @staticmethod
+    def set_active(user_ids: list[int], active: bool) -> list[int]:
+        """
+        Activate or deactivate many users in one UPDATE, in the caller's
+        transaction; returns the ids of the users that changed
+        """
+        return db.session.scalars(
+            update(User)
+            .where(User.id.in_(user_ids), User.is_active.is_distinct_from(active))
+            .values(is_active=active)
+            .returning(User.id)
+            .execution_options(synchronize_session=False)
+        ).all()
+
+
+class AsyncUserRepository:
+    """
+    UserRepository's reads on an AsyncSession, for the ASGI app. Shares the
+    snapshot cache with the sync repository.
+    """
+
+    @staticmethod
+    async def get_by_id(session: AsyncSession, user_id: int) -> Optional[UserSnapshot]:
+        """Get a read-only snapshot of a user by their ID (cached)"""
+        async def load():
+            user = (await session.scalars(select(User).where(User.id == user_id))).first()
+            return UserSnapshot.from_model(user) if user else None
+
+        return await entity_cache.users.aget_or_load(user_id, load)
+
+    @staticmethod
+    async def get_many(session: AsyncSession, user_ids: Iterable[int]) -> list[UserSnapshot]:
+        """Get snapshots for many users; see UserRepository.get_many"""
+        user_ids = list(dict.fromkeys(user_ids))
+
+        async def load(missing):
+            users = await session.scalars(select(User).where(User.id.in_(missing)))
+            return {user.id: UserSnapshot.from_model(user) for user in users}
+
+        found = await entity_cache.users.aget_many_or_load(user_ids, load)
+        return [found[user_id] for user_id in user_ids if user_id in found]
@@ -1,32 +1,205 @@
 """
-Execute with:  python app/seed_db.py
-Purpose: Adds 10 fake users to the real users table
+Execute with:  python -m app.seed_db [--users 1000000] [--guilds 2000]
+                                     [--members-per-guild 250] [--seed 42]
+Purpose: Bulk-loads deterministic fake users and guilds for development,
+load tests and benchmarks.
+
+Rows are generated in chunks and written with one executemany INSERT per
+chunk (COPY on PostgreSQL), so memory stays bounded no matter how many
+rows are requested. Every user shares a single password hash computed once
+up front. The same --seed always produces the same dataset.
 """
-from faker import Faker
+import argparse
+import csv
+import io
+import random
+from datetime import datetime, timedelta, timezone
+from time import perf_counter
+from typing import Iterator
+from sqlalchemy import func, insert, select, text, update
 from app import create_app
 from app.extensions import db
-from app.models.user import User  # ✅ Using your actual User model
+from app.models.guild import Guild
+from app.models.user import User, RoleEnum
+from app.utils.security import hash_password
+
+DEFAULT_PASSWORD = "password123"
+
+_ADJECTIVES = ("brave", "swift", "shadow", "iron", "storm", "frost", "ember",
+               "silent", "golden", "wild", "arcane", "grim", "lunar", "crimson")
+_NOUNS = ("blade", "hunter", "druid", "paladin", "rogue", "mage", "shaman",
+          "warlock", "priest", "monk", "knight", "ranger", "wolf", "dragon")
+_GUILD_WORDS = ("Order", "Legion", "Circle", "Covenant", "Brotherhood",
+                "Vanguard", "Dominion", "Syndicate", "Council", "Horde")
+_ROLES = (RoleEnum.member, RoleEnum.member, RoleEnum.member,
+          RoleEnum.raider, RoleEnum.raider, RoleEnum.recruiter)
+
+
+def _chunks(rows: Iterator[dict], size: int) -> Iterator[list[dict]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _user_rows(rng: random.Random, first_id: int, count: int, password: str,
+               leader_ids: set[int], now: datetime) -> Iterator[dict]:
+    for user_id in range(first_id, first_id + count):
+        name = f"{rng.choice(_ADJECTIVES)}{rng.choice(_NOUNS)}{user_id}"
+        created_at = now - timedelta(seconds=rng.randrange(365 * 24 * 3600))
+        yield {
+            "id": user_id,
+            "username": name,
+            "email": f"{name}@example.com",
+            "password": password,
+            "is_active": True,
+            "role": RoleEnum.guild_leader if user_id in leader_ids else rng.choice(_ROLES),
+            "created_at": created_at,
+            "updated_at": created_at,
+            "guild_id": None,  # assigned set-based once the guilds exist
+        }
+
+
+def _guild_rows(rng: random.Random, first_id: int, count: int, leader_of,
+                members: int, now: datetime) -> Iterator[dict]:
+    for guild_id in range(first_id, first_id + count):
+        created_at = now - timedelta(seconds=rng.randrange(365 * 24 * 3600))
+        yield {
+            "id": guild_id,
+            "name": f"{rng.choice(_ADJECTIVES).title()} {rng.choice(_GUILD_WORDS)} {guild_id}",
+            "description": "Seeded guild",
+            "created_by": leader_of(guild_id),
+            "created_at": created_at,
+            "updated_at": created_at,
+            "roster_version": 0,
+            "member_count": members,
+        }
+
+
+def _copy_rows(model, chunk: list[dict]) -> None:
+    """
+    PostgreSQL fast path: stream one chunk through COPY ... FROM STDIN.
+    """
+    columns = list(chunk[0])
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in chunk:
+        writer.writerow([
+            "" if value is None
+            else value.name if isinstance(value, RoleEnum)
+            else value.isoformat() if isinstance(value, datetime)
+            else value
+            for value in (row[column] for column in columns)
+        ])
+    buffer.seek(0)
+
+    dbapi_connection = db.session.connection().connection.dbapi_connection
+    with dbapi_connection.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY {model.__tablename__} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+            buffer
+        )
+
+
+def _write(model, rows: Iterator[dict], chunk_size: int) -> int:
+    use_copy = db.engine.dialect.name == "postgresql" and db.engine.driver == "psycopg2"
+    written = 0
+    for chunk in _chunks(rows, chunk_size):
+        if use_copy:
+            _copy_rows(model, chunk)
+        else:
+            db.session.execute(insert(model), chunk)
+        written += len(chunk)
+    return written
 
-fake = Faker()
 
-def run():
-    app = create_app()
+def _reset_sequences() -> None:
+    # Explicit ids don't advance PostgreSQL's serial sequences
+    if db.engine.dialect.name != "postgresql":
+        return
+    for table in (User.__tablename__, Guild.__tablename__):
+        db.session.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+            f"(SELECT COALESCE(MAX(id), 1) FROM {table}))"
+        ))
+
+
+def bulk_seed(users: int, guilds: int = 0, members_per_guild: int = 0, seed: int = 42,
+              password: str = DEFAULT_PASSWORD, chunk_size: int = 10_000) -> dict:
+    """
+    Appends `users` users and `guilds` guilds of `members_per_guild` members
+    each (leader included) after the ids already in the database. Must run
+    inside an app context. Returns the id ranges that were written.
+    """
+    if guilds > 0 and members_per_guild < 1:
+        raise ValueError("Guilds need at least one member (their leader)")
+    if guilds * members_per_guild > users:
+        raise ValueError("Not enough users to fill every guild")
+
+    rng = random.Random(seed)
+    now = datetime(2025, 1, 1, tzinfo=timezone.utc)  # fixed so reruns match
+    user_base = db.session.scalar(select(func.coalesce(func.max(User.id), 0)))
+    guild_base = db.session.scalar(select(func.coalesce(func.max(Guild.id), 0)))
+
+    # Guild g (1-based within this run) owns the next `members_per_guild`
+    # user ids; the first of them leads it.
+    def leader_of(guild_id: int) -> int:
+        return user_base + (guild_id - guild_base - 1) * members_per_guild + 1
+
+    leader_ids = {leader_of(g) for g in range(guild_base + 1, guild_base + guilds + 1)}
+    password_hash = hash_password(password)  # once, reused for every row
+
+    _write(User, _user_rows(rng, user_base + 1, users, password_hash, leader_ids, now),
+           chunk_size)
+    _write(Guild, _guild_rows(rng, guild_base + 1, guilds, leader_of, members_per_guild, now),
+           chunk_size)
+
+    if guilds:
+        # One set-based UPDATE places every member in their guild
+        last_member = user_base + guilds * members_per_guild
+        db.session.execute(
+            update(User)
+            .where(User.id > user_base, User.id <= last_member)
+            .values(guild_id=(User.id - user_base - 1) // members_per_guild + guild_base + 1)
+        )
+
+    _reset_sequences()
+    db.session.commit()
+
+    return {
+        "users": (user_base + 1, user_base + users),
+        "guilds": (guild_base + 1, guild_base + guilds),
+    }
+
+
+def run(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk-load deterministic fake data.")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--guilds", type=int, default=0)
+    parser.add_argument("--members-per-guild", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=42, help="RNG seed for reproducible data")
+    parser.add_argument("--password", default=DEFAULT_PASSWORD,
+                        help="plain-text password shared by every seeded user")
+    parser.add_argument("--chunk-size", type=int, default=10_000,
+                        help="rows generated and written per batch")
+    parser.add_argument("--env", default=None, help="config name (defaults to FLASK_ENV)")
+    args = parser.parse_args(argv)
+
+    app = create_app(args.env)
     with app.app_context():
-        for _ in range(10):
-            email = fake.unique.email()
-            username = fake.user_name()
-
-            # Check if email already exists to avoid duplicates
-            if not db.session.scalar(db.select(User).filter_by(email=email)):
-                user = User(
-                    username=username,
-                    email=email,
-                    password="placeholder123"  # Not hashed; for dev only
-                )
-                db.session.add(user)
-
-        db.session.commit()
-        print("🌱  Successfully seeded 10 fake users")
+        start = perf_counter()
+        written = bulk_seed(args.users, args.guilds, args.members_per_guild,
+                            seed=args.seed, password=args.password,
+                            chunk_size=args.chunk_size)
+        elapsed = perf_counter() - start
+
+    print(f"🌱  Seeded users {written['users'][0]}-{written['users'][1]} and "
+          f"{args.guilds} guilds in {elapsed:.1f}s")
+
 
 if __name__ == "__main__":
     run()
@@ -0,0 +1,34 @@
+"""
+Central place that turns models (or their cached snapshots) into JSON-ready
+dicts. Values such as enums and datetimes are left as-is; the app's JSON
+provider (see app/utils/json_provider.py) writes them natively.
+"""
+from operator import attrgetter
+from typing import Callable, Iterable
+
+USER_FIELDS = ("id", "username", "email", "role", "guild_id", "created_at")
+GUILD_FIELDS = ("id", "name", "description", "created_by", "created_at")
+GUILD_LISTING_FIELDS = GUILD_FIELDS + ("leader_username", "member_count")
+
+
+def _compile(fields: tuple[str, ...]) -> Callable[[object], dict]:
+    # A single attrgetter call fetches every field in C, then zip builds the dict
+    getter = attrgetter(*fields)
+
+    def serialize(obj) -> dict:
+        return dict(zip(fields, getter(obj)))
+
+    return serialize
+
+
+serialize_user = _compile(USER_FIELDS)
+serialize_guild = _compile(GUILD_FIELDS)
+serialize_guild_listing = _compile(GUILD_LISTING_FIELDS)
+
+
+def serialize_users(users: Iterable) -> list[dict]:
+    return list(map(serialize_user, users))
+
+
+def serialize_guild_listings(rows: Iterable) -> list[dict]:
+    return list(map(serialize_guild_listing, rows))
@@ -1,61 +1,222 @@
+from datetime import datetime
 from typing import Optional, List
+from sqlalchemy import Row, case, cast, func, select, tuple_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased, joinedload, raiseload
 from app.models.guild import Guild
 from app.models.user import User, RoleEnum
 from app.extensions import db
+from app.repositories.entity_cache import entity_cache, GuildSnapshot
+from app.repositories.token_denylist import token_denylist
+from app.repositories.token_revocation_repository import TokenRevocationRepository
+from app.utils.db_errors import integrity_error_message
+from app.utils.pagination import encode_cursor, decode_cursor
+
+# Page sizes for the guild member listing
+MEMBERS_DEFAULT_LIMIT = 50
+MEMBERS_MAX_LIMIT = 200
+
+# Page sizes and sort keys for the guild directory. A leading "-" on the
+# sort key (e.g. "-member_count") sorts descending.
+GUILDS_DEFAULT_LIMIT = 50
+GUILDS_MAX_LIMIT = 100
+GUILD_SORTS = ("name", "created_at", "member_count")
+
+# How the case-insensitive guild name index shows up in driver errors
+_GUILD_NAME_CONSTRAINTS = (
+    "guilds.name", "guilds_name_key", "uq_guilds_name_lower")
+_GUILD_CREATOR_CONSTRAINTS = ("fk_guilds_created_by_users", "guilds_created_by_fkey")
 
 
 class GuildService:
     @staticmethod
     def create_guild(name: str, description: str, user_id: int) -> Guild:
-        # Check if a guild with the same name already exists
-        existing_guild = Guild.query.filter_by(name=name).first()
-        if existing_guild:
-            raise ValueError("A guild with that name already exists.")
-
-        # Check if the user is already in a guild
-        user = db.session.get(User, user_id)
-        if user is None:
-            raise ValueError("User not found.")
-        if user.guild_id is not None:
-            raise ValueError("User is already in a guild.")
+        user_id = int(user_id)
 
-        # Create the new guild
+        # Create the new guild straight away; the unique index on lower(name)
+        # rejects duplicates without a lookup first
         new_guild = Guild(
             name=name,
             description=description,
-            created_by=user_id
+            created_by=user_id,
+            member_count=1  # the leader
         )
-
-        # Add the user to the guild as a member
-        user.guild = new_guild
-
-        # Promote the user to guild leader
-        user.role = RoleEnum.guild_leader
+        db.session.add(new_guild)
+        try:
+            db.session.flush()
+        except IntegrityError as error:
+            db.session.rollback()
+            message = integrity_error_message(error, {
+                _GUILD_NAME_CONSTRAINTS: "A guild with that name already exists.",
+                _GUILD_CREATOR_CONSTRAINTS: "User not found.",
+            })
+            if message is None:
+                raise
+            raise ValueError(message) from None
+
+        # Add the user to the guild as its leader, only if they aren't
+        # in a guild already
+        joined = GuildService._update_members(
+            update(User)
+            .where(User.id == user_id, User.guild_id.is_(None))
+            .values(guild_id=new_guild.id, role=RoleEnum.guild_leader)
+        ) == 1
+        if not joined:
+            db.session.rollback()
+            if db.session.get(User, user_id) is None:
+                raise ValueError("User not found.")
+            raise ValueError("User is already in a guild.")
 
         # Save everything to the database
-        db.session.add(new_guild)
+        guild_id = new_guild.id  # read before commit expires it
         db.session.commit()
+        entity_cache.users.invalidate(user_id)
+        entity_cache.guilds.invalidate(guild_id)
 
         return new_guild
 
     @staticmethod
-    def get_guild_by_id(guild_id: int) -> Optional[Guild]:
-        # Fetch the guild by its ID
-        return db.session.get(Guild, guild_id)
+    def get_guild_by_id(guild_id: int) -> Optional[GuildSnapshot]:
+        # Fetch a read-only snapshot of the guild by its ID (cached)
+        def load():
+            guild = db.session.get(Guild, guild_id)
+            return GuildSnapshot.from_model(guild) if guild else None
+
+        return entity_cache.guilds.get_or_load(guild_id, load)
 
     @staticmethod
-    def get_guild_members(guild_id: int) -> Optional[List[User]]:
+    def get_guild_members(guild_id: int, limit: int = MEMBERS_DEFAULT_LIMIT,
+                          after: Optional[int] = None,
+                          role: Optional[RoleEnum] = None
+                          ) -> Optional[tuple[List[User], Optional[int]]]:
         """
-        Returns a list of users who belong to the specified guild.
+        Returns one page of users who belong to the specified guild, ordered
+        by user id, plus the cursor for the next page (None on the last page).
+        Pages are keyset-paginated: `after` is the last user id already seen.
         If the guild doesn't exist, returns None.
         """
-        guild = db.session.get(Guild, guild_id)
+        guild = GuildService.get_guild_by_id(guild_id)
 
         if not guild:
             return None
 
-        # Return all users related to this guild
-        return guild.members
+        return GuildService._members_page(guild_id, limit, after, role)
+
+    @staticmethod
+    def get_guild_overview(guild_id: int, limit: int = MEMBERS_DEFAULT_LIMIT
+                           ) -> Optional[tuple[Guild, List[User], Optional[int]]]:
+        """
+        Returns the guild with its leader loaded, the first page of its
+        members and the cursor for the next page, in two queries however big
+        the guild is. If the guild doesn't exist, returns None.
+        """
+        guild = db.session.scalars(GuildService._overview_stmt(guild_id)).first()
+
+        if not guild:
+            return None
+
+        # The members page is a keyset query rather than a selectinload of
+        # Guild.members, which can't be limited to one page
+        members, next_cursor = GuildService._members_page(guild_id, limit)
+        return guild, members, next_cursor
+
+    @staticmethod
+    def list_guilds(sort: str = "name", limit: int = GUILDS_DEFAULT_LIMIT,
+                    cursor: Optional[str] = None, prefix: Optional[str] = None
+                    ) -> tuple[List[Row], Optional[str]]:
+        """
+        Returns one page of the guild directory plus the cursor for the next
+        page (None on the last page). Each row carries the guild's columns,
+        `leader_username` and `member_count`, all fetched in one statement.
+        Raises ValueError on an unknown sort key or a malformed cursor.
+        """
+        stmt = GuildService._directory_stmt(sort, limit, cursor, prefix)
+        rows = db.session.execute(stmt).all()
+        return GuildService._directory_page(rows, sort, limit)
+
+    @staticmethod
+    def _overview_stmt(guild_id: int):
+        # The leader is joined onto the guild row. Anything else touched on
+        # these objects raises instead of quietly lazy-loading.
+        return (
+            select(Guild)
+            .where(Guild.id == guild_id)
+            .options(joinedload(Guild.creator).raiseload("*"), raiseload("*"))
+        )
+
+    @staticmethod
+    def _directory_stmt(sort: str, limit: int, cursor: Optional[str],
+                        prefix: Optional[str]):
+        key = sort.removeprefix("-")
+        descending = sort.startswith("-")
+        if key not in GUILD_SORTS:
+            raise ValueError(f"Unknown sort: {sort}")
+
+        leader = aliased(User)
+        sort_column = {
+            "name": Guild.name,
+            "created_at": Guild.created_at,
+            "member_count": Guild.member_count,
+        }[key]
+
+        stmt = (
+            select(Guild.id, Guild.name, Guild.description, Guild.created_by,
+                   Guild.created_at, leader.username.label("leader_username"),
+                   Guild.member_count)
+            .join(leader, leader.id == Guild.created_by)
+        )
+        if prefix:
+            stmt = stmt.where(Guild.name.startswith(prefix, autoescape=True))
+
+        # Keyset pagination on (sort value, id); the id breaks ties
+        if cursor is not None:
+            last_value, last_id = GuildService._decode_directory_cursor(cursor, sort)
+            position = tuple_(sort_column, Guild.id)
+            stmt = stmt.where(position < (last_value, last_id) if descending
+                              else position > (last_value, last_id))
+
+        if descending:
+            stmt = stmt.order_by(sort_column.desc(), Guild.id.desc())
+        else:
+            stmt = stmt.order_by(sort_column, Guild.id)
+
+        # One extra row tells us whether another page exists
+        return stmt.limit(limit + 1)
+
+    @staticmethod
+    def _directory_page(rows: List[Row], sort: str, limit: int
+                        ) -> tuple[List[Row], Optional[str]]:
+        if len(rows) <= limit:
+            return rows, None
+
+        rows = rows[:limit]
+        last = rows[-1]
+        value = getattr(last, sort.removeprefix("-"))
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        return rows, encode_cursor(sort, value, last.id)
+
+    @staticmethod
+    def _decode_directory_cursor(cursor: str, sort: str) -> tuple:
+        values = decode_cursor(cursor)
+        # A cursor is only valid for the sort order that produced it
+        if len(values) != 3 or values[0] != sort or not isinstance(values[2], int):
+            raise ValueError("Invalid cursor")
+
+        _, value, last_id = values
+        if sort.endswith("created_at"):
+            try:
+                value = datetime.fromisoformat(value)
+            except (TypeError, ValueError):
+                raise ValueError("Invalid cursor")
+        elif sort.endswith("member_count"):
+            if not isinstance(value, int):
+                raise ValueError("Invalid cursor")
+        elif not isinstance(value, str):
+            raise ValueError("Invalid cursor")
+
+        return value, last_id
 
     @staticmethod
     def update_guild(guild_id: int, user_id: int, name: Optional[str],
@@ -74,19 +235,25 @@ class GuildService:
         if guild.created_by != int(user_id):
             raise ValueError("You do not have permission to update this guild")
 
-        # Step 3: Check for name duplication (if name is changing)
-        if name and name != guild.name:
-            existing = Guild.query.filter_by(name=name).first()
-            if existing:
-                raise ValueError("Another guild with that name already exists")
-            guild.name = name  # update name
+        # Step 3: Update name if provided (duplicates are caught on commit)
+        if name:
+            guild.name = name
 
         # Step 4: Update description if provided
         if description:
             guild.description = description
 
         # Step 5: Persist changes
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError as error:
+            db.session.rollback()
+            message = integrity_error_message(error, {
+                _GUILD_NAME_CONSTRAINTS: "Another guild with that name already exists"})
+            if message is None:
+                raise
+            raise ValueError(message) from None
+        entity_cache.guilds.invalidate(guild_id)
 
         return guild
 
@@ -95,76 +262,343 @@ class GuildService:
         """
         Allows a user to leave a guild, unless they are the guild leader.
         """
-        user = db.session.get(User, user_id)
-        if not user:
-            raise ValueError("User not found")
-
-        if user.guild_id != guild_id:
-            raise ValueError("You are not a member of this guild")
-
-        if user.role == RoleEnum.guild_leader:
-            raise ValueError(
-                "Guild leaders must transfer leadership before leaving.")
+        user_id = int(user_id)
+
+        # Guild row first (see _record_roster_change), then the conditional
+        # membership change; rowcount tells us whether the rules held
+        left = (
+            GuildService._record_roster_change(guild_id, member_delta=-1)
+            and GuildService._update_members(
+                update(User)
+                .where(User.id == user_id, User.guild_id == guild_id,
+                       User.role.is_distinct_from(RoleEnum.guild_leader))
+                .values(guild_id=None)
+            ) == 1
+        )
+        if not left:
+            db.session.rollback()
+            user = db.session.get(User, user_id)
+            if not user:
+                raise ValueError("User not found")
+            if user.guild_id != guild_id:
+                raise ValueError("You are not a member of this guild")
+            raise ValueError("Guild leaders must transfer leadership before leaving.")
 
-        # Remove user from the guild
-        user.guild_id = None
         db.session.commit()
+        entity_cache.users.invalidate(user_id)
+        entity_cache.guilds.invalidate(guild_id)
 
     @staticmethod
     def transfer_leadership(guild_id: int, current_leader_id: int, new_leader_id: int) -> None:
         """
         Transfers leadership of a guild from the current leader to another member.
+        The demoted leader's tokens are revoked.
         """
-        guild = db.session.get(Guild, guild_id)
-        if not guild:
-            raise ValueError("Guild not found")
+        current_leader_id = int(current_leader_id)
+        if new_leader_id == current_leader_id:
+            # Handing leadership to yourself changes nothing, so nothing
+            # is bumped or revoked; it still has to be your guild
+            GuildService._check_transfer_requester(guild_id, current_leader_id)
+            return
+
+        # Only applies while the requester still leads the guild; then swaps
+        # both roles in one statement, which must touch exactly both users
+        transferred = (
+            GuildService._record_roster_change(
+                guild_id, led_by=current_leader_id, created_by=new_leader_id)
+            and GuildService._update_members(
+                update(User)
+                .where(User.id.in_([current_leader_id, new_leader_id]),
+                       User.guild_id == guild_id)
+                # Cast to the column's enum: PostgreSQL won't assign the
+                # text a CASE of plain string literals resolves to
+                .values(role=case(
+                    (User.id == new_leader_id, cast(RoleEnum.guild_leader, User.role.type)),
+                    else_=cast(RoleEnum.member, User.role.type)))
+            ) == 2
+        )
+        if not transferred:
+            db.session.rollback()
+            GuildService._check_transfer_requester(guild_id, current_leader_id)
+            raise ValueError("New leader must be a member of the same guild")
 
-        # Ensure the requester is the current leader
+        # The old leader's tokens still claim guild_leader
+        revocations = TokenRevocationRepository.stage_user_revocations([current_leader_id])
+        db.session.commit()
+        token_denylist.add_rows(revocations)
+        entity_cache.users.invalidate(current_leader_id, new_leader_id)
+        entity_cache.guilds.invalidate(guild_id)
+
+    @staticmethod
+    def _check_transfer_requester(guild_id: int, current_leader_id: int) -> None:
+        # Raises the error for a requester who can't transfer this guild
+        if not db.session.get(Guild, guild_id):
+            raise ValueError("Guild not found")
         current_leader = db.session.get(User, current_leader_id)
         if not current_leader or current_leader.role != RoleEnum.guild_leader:
-            raise ValueError(
-                "Only the current guild leader can transfer leadership")
-
+            raise ValueError("Only the current guild leader can transfer leadership")
         if current_leader.guild_id != guild_id:
             raise ValueError("You are not the leader of this guild")
 
-        # Ensure the new leader exists and is in the same guild
-        new_leader = db.session.get(User, new_leader_id)
-        if not new_leader or new_leader.guild_id != guild_id:
-            raise ValueError("New leader must be a member of the same guild")
+    @staticmethod
+    def kick_member(guild_id: int, leader_id: int, member_id: int) -> None:
+        """
+        Removes a member from the guild if requested by the guild leader.
+        The member's tokens are revoked.
+        """
+        leader_id = int(leader_id)
+
+        # Only applies while the requester leads the guild, which also rules
+        # out the member being the leader unless they're kicking themselves
+        kicked = (
+            member_id != leader_id
+            and GuildService._record_roster_change(
+                guild_id, member_delta=-1, led_by=leader_id)
+            and GuildService._update_members(
+                update(User)
+                .where(User.id == member_id, User.guild_id == guild_id)
+                .values(guild_id=None)
+            ) == 1
+        )
+        if not kicked:
+            db.session.rollback()
+            if not db.session.get(Guild, guild_id):
+                raise ValueError("Guild not found")
+            leader = db.session.get(User, leader_id)
+            if not leader or leader.role != RoleEnum.guild_leader:
+                raise ValueError("Only guild leaders can kick members")
+            if leader.guild_id != guild_id:
+                raise ValueError("You are not the leader of this guild")
+            if member_id == leader_id:
+                raise ValueError("You cannot kick yourself (the guild leader)")
+            raise ValueError("That user is not a member of your guild")
 
-        # Update roles
-        current_leader.role = RoleEnum.member
-        new_leader.role = RoleEnum.guild_leader
+        revocations = TokenRevocationRepository.stage_user_revocations([member_id])
+        db.session.commit()
+        token_denylist.add_rows(revocations)
+        entity_cache.users.invalidate(member_id)
+        entity_cache.guilds.invalidate(guild_id)
+
+    @staticmethod
+    def remove_members(user_ids: List[int]) -> int:
+        """
+        Removes the given users from whatever guilds they're in (admin bulk
+        kick), skipping guild leaders and users in no guild. Returns how
+        many were removed; their tokens are revoked. However many users and
+        guilds are involved this is one UPDATE of the guilds' counters, one
+        of the users and one INSERT of revocations.
+        """
+        user_ids = [int(user_id) for user_id in user_ids]
+        removable = (User.id.in_(user_ids), User.guild_id.is_not(None),
+                     User.role.is_distinct_from(RoleEnum.guild_leader))
+
+        # Guild rows first, as in every membership change; each loses as
+        # many members as are leaving it
+        leaving = (
+            select(func.count()).select_from(User)
+            .where(User.guild_id == Guild.id, *removable)
+            .scalar_subquery()
+        )
+        try:
+            guild_ids = db.session.scalars(
+                update(Guild)
+                .where(Guild.id.in_(select(User.guild_id).where(*removable)))
+                .values(roster_version=Guild.roster_version + 1,
+                        member_count=Guild.member_count - leaving)
+                .returning(Guild.id)
+                .execution_options(synchronize_session=False)
+            ).all()
+            removed = db.session.scalars(
+                update(User).where(*removable).values(guild_id=None)
+                .returning(User.id)
+                .execution_options(synchronize_session=False)
+            ).all()
+            revocations = TokenRevocationRepository.stage_user_revocations(removed)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        token_denylist.add_rows(revocations)
+        entity_cache.users.invalidate(*user_ids)
+        entity_cache.guilds.invalidate(*guild_ids)
+        return len(removed)
 
-        # Update the guild's created_by field to reflect the new leader
-        guild.created_by = new_leader_id
+    @staticmethod
+    def _members_page(guild_id: int, limit: int, after: Optional[int] = None,
+                      role: Optional[RoleEnum] = None
+                      ) -> tuple[List[User], Optional[int]]:
+        stmt = GuildService._members_page_stmt(guild_id, limit, after, role)
+        return GuildService._split_members_page(db.session.scalars(stmt).all(), limit)
 
-        db.session.commit()
+    @staticmethod
+    def _members_page_stmt(guild_id: int, limit: int, after: Optional[int] = None,
+                           role: Optional[RoleEnum] = None):
+        # One range query on (guild_id, id) instead of loading guild.members.
+        # We fetch one extra row to know whether another page exists.
+        stmt = select(User).where(User.guild_id == guild_id).options(raiseload("*"))
+        if after is not None:
+            stmt = stmt.where(User.id > after)
+        if role is not None:
+            stmt = stmt.where(User.role == role)
+        return stmt.order_by(User.id).limit(limit + 1)
 
     @staticmethod
-    def kick_member(guild_id: int, leader_id: int, member_id: int) -> None:
+    def _split_members_page(members: List[User], limit: int
+                            ) -> tuple[List[User], Optional[int]]:
+        if len(members) > limit:
+            members = members[:limit]
+            return members, members[-1].id
+
+        return members, None
+
+    @staticmethod
+    def reconcile_member_counts(batch_size: int = 1000) -> List[tuple[int, int, int]]:
         """
-        Removes a member from the guild if requested by the guild leader.
+        Recomputes every guild's member_count from the users table, one batch
+        of guild ids per transaction, and fixes the ones that drifted.
+        Returns (guild_id, stored, actual) for each guild that was corrected.
         """
-        guild = db.session.get(Guild, guild_id)
-        if not guild:
-            raise ValueError("Guild not found")
+        actual = (
+            select(func.count(User.id))
+            .where(User.guild_id == Guild.id)
+            .correlate(Guild)
+            .scalar_subquery()
+        )
+        drifted = []
+        last_id = 0
+        while True:
+            rows = db.session.execute(
+                select(Guild.id, Guild.member_count, actual)
+                .where(Guild.id > last_id)
+                .order_by(Guild.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+
+            stale = [row for row in rows if row[1] != row[2]]
+            if stale:
+                # Recount in the UPDATE itself so joins/leaves that landed
+                # since the SELECT aren't overwritten with an old number
+                db.session.execute(
+                    update(Guild)
+                    .where(Guild.id.in_([row[0] for row in stale]))
+                    .values(member_count=actual)
+                    .execution_options(synchronize_session=False)
+                )
+                drifted.extend(tuple(row) for row in stale)
+            db.session.commit()
+            if stale:
+                entity_cache.guilds.invalidate(*(row[0] for row in stale))
+
+        return drifted
 
-        leader = db.session.get(User, leader_id)
-        if not leader or leader.role != RoleEnum.guild_leader:
-            raise ValueError("Only guild leaders can kick members")
+    @staticmethod
+    def record_member_profile_change(guild_id: int) -> None:
+        """
+        Marks the guild's member list as changed because a member's profile
+        (username, email: what member lists show) changed, in the caller's
+        transaction. Invalidate the guild's cached snapshot once it commits.
+        """
+        GuildService._record_roster_change(guild_id)
 
-        if leader.guild_id != guild_id:
-            raise ValueError("You are not the leader of this guild")
+    @staticmethod
+    def _record_roster_change(guild_id: int, member_delta: int = 0,
+                              led_by: Optional[int] = None, **values) -> bool:
+        """
+        Marks the guild's member list as changed so cached ETags stop matching,
+        and applies `member_delta` to its member_count, plus any extra column
+        `values`. If `led_by` is given, only applies while that user leads
+        the guild. Returns False if no guild row matched.
+
+        Runs as one atomic `UPDATE ... SET x = x + n` inside the caller's
+        transaction. Every membership change runs this first, so the guild
+        row lock serializes concurrent joins, leaves, kicks and transfers on
+        the same guild, and they always lock guild before users.
+        """
+        stmt = update(Guild).where(Guild.id == guild_id)
+        if led_by is not None:
+            stmt = stmt.where(Guild.created_by == led_by)
+        stmt = stmt.values(roster_version=Guild.roster_version + 1,
+                           member_count=Guild.member_count + member_delta, **values)
+        result = db.session.execute(stmt.execution_options(synchronize_session=False))
+        return result.rowcount == 1
 
-        member = db.session.get(User, member_id)
-        if not member or member.guild_id != guild_id:
-            raise ValueError("That user is not a member of your guild")
+    @staticmethod
+    def _update_members(stmt) -> int:
+        # Conditional UPDATE on users; the caller reads the outcome from the
+        # number of rows it matched
+        result = db.session.execute(stmt.execution_options(synchronize_session=False))
+        return result.rowcount
 
-        if member_id == leader_id:
-            raise ValueError("You cannot kick yourself (the guild leader)")
 
-        # Remove the member from the guild
-        member.guild_id = None
-        db.session.commit()
+class AsyncGuildService:
+    """
+    The read paths of GuildService on an AsyncSession, for the ASGI app.
+    Statements, page handling and the snapshot cache are shared with the
+    sync service, so both paths answer identically.
+    """
+
+    @staticmethod
+    async def get_guild_by_id(session: AsyncSession, guild_id: int) -> Optional[GuildSnapshot]:
+        # Fetch a read-only snapshot of the guild by its ID (cached)
+        async def load():
+            guild = await session.get(Guild, guild_id)
+            return GuildSnapshot.from_model(guild) if guild else None
+
+        return await entity_cache.guilds.aget_or_load(guild_id, load)
+
+    @staticmethod
+    async def get_guild_members(session: AsyncSession, guild_id: int,
+                                limit: int = MEMBERS_DEFAULT_LIMIT,
+                                after: Optional[int] = None,
+                                role: Optional[RoleEnum] = None
+                                ) -> Optional[tuple[List[User], Optional[int]]]:
+        """
+        One page of the guild's members and the next cursor, or None if
+        the guild doesn't exist. See GuildService.get_guild_members.
+        """
+        if not await AsyncGuildService.get_guild_by_id(session, guild_id):
+            return None
+
+        return await AsyncGuildService._members_page(session, guild_id, limit, after, role)
+
+    @staticmethod
+    async def get_guild_overview(session: AsyncSession, guild_id: int,
+                                 limit: int = MEMBERS_DEFAULT_LIMIT
+                                 ) -> Optional[tuple[Guild, List[User], Optional[int]]]:
+        """
+        The guild with its leader, its first page of members and the next
+        cursor, or None if the guild doesn't exist. See
+        GuildService.get_guild_overview.
+        """
+        guild = (await session.scalars(GuildService._overview_stmt(guild_id))).first()
+        if not guild:
+            return None
+
+        members, next_cursor = await AsyncGuildService._members_page(session, guild_id, limit)
+        return guild, members, next_cursor
+
+    @staticmethod
+    async def list_guilds(session: AsyncSession, sort: str = "name",
+                          limit: int = GUILDS_DEFAULT_LIMIT,
+                          cursor: Optional[str] = None, prefix: Optional[str] = None
+                          ) -> tuple[List[Row], Optional[str]]:
+        """
+        One page of the guild directory and the next cursor. Raises
+        ValueError on an unknown sort key or a malformed cursor. See
+        GuildService.list_guilds.
+        """
+        stmt = GuildService._directory_stmt(sort, limit, cursor, prefix)
+        rows = (await session.execute(stmt)).all()
+        return GuildService._directory_page(rows, sort, limit)
+
+    @staticmethod
+    async def _members_page(session: AsyncSession, guild_id: int, limit: int,
+                            after: Optional[int] = None, role: Optional[RoleEnum] = None
+                            ) -> tuple[List[User], Optional[int]]:
+        stmt = GuildService._members_page_stmt(guild_id, limit, after, role)
+        members = (await session.scalars(stmt)).all()
+        return GuildService._split_members_page(members, limit)
@@ -1,48 +1,162 @@
 from typing import Optional
-from app.repositories.user_repository import UserRepository
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.repositories.user_repository import AsyncUserRepository, UserRepository
+from app.repositories.entity_cache import entity_cache, UserSnapshot
+from app.repositories.token_denylist import token_denylist
+from app.repositories.token_revocation_repository import TokenRevocationRepository
 from app.models.user import User
-from app.utils.security import hash_password, verify_password, generate_token
+from app.extensions import db, password_hasher
+from app.utils.db_errors import integrity_error_message
+from app.utils.security import generate_token
+
+# Most users a single batch lookup may ask for
+USERS_BATCH_MAX = 100
+
+# Unique constraints a registration can trip over, as the drivers report them
+_REGISTRATION_CONFLICTS = {
+    ("users.email", "ix_users_email"): "Email is already registered.",
+    ("users.username", "users_username_key"): "Username is already taken.",
+}
+
+
+def normalize_email(email: str) -> str:
+    # Emails are matched case-insensitively and stored lowercased, so the
+    # plain unique index on users.email enforces that and serves lookups
+    return email.strip().lower()
 
 
 class UserService:
     @staticmethod
     def register_user(username: str, email: str, password: str) -> User:
         """
-        Registers a new user if the email is not already taken.
-        Raises a ValueError if email is already in use.
+        Registers a new user if the email and username are not already taken.
+        Raises a ValueError if either is in use, and
+        HashingUnavailable if the hashing pool is saturated.
         """
-        existing_user = UserRepository.get_by_email(email)
-        if existing_user:
-            raise ValueError("Email is already registered.")
+        hashed_password = password_hasher.hash(password)
 
-        hashed_password = hash_password(password)
-        return UserRepository.create_user(username, email, hashed_password)
+        # Insert straight away and let the unique indexes catch duplicates;
+        # a lookup first would cost a round trip and still race
+        try:
+            return UserRepository.create_user(username, normalize_email(email), hashed_password)
+        except IntegrityError as error:
+            db.session.rollback()
+            message = integrity_error_message(error, _REGISTRATION_CONFLICTS)
+            if message is None:
+                raise
+            raise ValueError(message) from None
 
     @staticmethod
     def login(email: str, password: str) -> tuple[User, str]:
         """
         Authenticates a user and returns the user and JWT token.
-        Raises ValueError if credentials are invalid.
+        Raises ValueError if credentials are invalid, and
+        HashingUnavailable if the hashing pool is saturated.
         """
-        user = UserRepository.get_by_email(email)
-        if not user or not verify_password(user.password, password):
+        user = UserRepository.get_by_email(normalize_email(email))
+        if not user or not password_hasher.verify(user.password, password):
             raise ValueError("Invalid email or password")
+        if not user.is_active:
+            raise ValueError("Account is deactivated")
 
         token = generate_token(user.id, user.role.value)
         return user, token
 
     @staticmethod
-    def get_user_by_id(user_id: int) -> Optional[User]:
+    def logout(claims: dict) -> None:
+        """
+        Revokes the token the claims were verified from, until it expires.
+        Tokens issued before tokens carried a `jti` can't be told apart, so
+        for those every token of the user is revoked.
+        """
+        if claims.get("jti"):
+            TokenRevocationRepository.revoke_token(
+                claims["jti"], int(claims["sub"]), claims["exp"])
+        else:
+            revocations = TokenRevocationRepository.stage_user_revocations([int(claims["sub"])])
+            db.session.commit()
+            token_denylist.add_rows(revocations)
+
+    @staticmethod
+    def get_user_by_id(user_id: int) -> Optional[UserSnapshot]:
         """
-        Fetch a user by their unique ID.
+        Fetch a read-only snapshot of a user by their unique ID.
         Returns None if not found.
         """
         return UserRepository.get_by_id(user_id)
 
+    @staticmethod
+    def get_users_by_ids(user_ids: list[int]) -> tuple[list[UserSnapshot], list[int]]:
+        """
+        Fetch read-only snapshots of several users at once.
+        Returns the users found, in request order, and the ids that weren't.
+        Raises ValueError if more than USERS_BATCH_MAX ids are requested.
+        """
+        UserService._check_batch_size(user_ids)
+        users = UserRepository.get_many(user_ids)
+        return users, UserService._missing_ids(user_ids, users)
+
     @staticmethod
     def get_user_by_email(email: str) -> Optional[User]:
         """
         Fetch a user by their email.
         Returns None if not found.
         """
-        return UserRepository.get_by_email(email)
+        return UserRepository.get_by_email(normalize_email(email))
+
+    @staticmethod
+    def set_users_active(user_ids: list[int], active: bool) -> int:
+        """
+        Activates or deactivates the given users (admin bulk action).
+        Deactivated users' tokens are revoked in the same transaction.
+        Returns how many actually changed.
+        """
+        user_ids = [int(user_id) for user_id in user_ids]
+        try:
+            changed = UserRepository.set_active(user_ids, active)
+            revocations = (
+                [] if active else TokenRevocationRepository.stage_user_revocations(changed))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        token_denylist.add_rows(revocations)
+        entity_cache.users.invalidate(*user_ids)
+        return len(changed)
+
+    @staticmethod
+    def _check_batch_size(user_ids: list[int]) -> None:
+        if len(user_ids) > USERS_BATCH_MAX:
+            raise ValueError(f"At most {USERS_BATCH_MAX} ids may be requested at once")
+
+    @staticmethod
+    def _missing_ids(user_ids: list[int], users: list[UserSnapshot]) -> list[int]:
+        found = {user.id for user in users}
+        return [user_id for user_id in dict.fromkeys(user_ids) if user_id not in found]
+
+
+class AsyncUserService:
+    """
+    The read paths of UserService on an AsyncSession, for the ASGI app.
+    """
+
+    @staticmethod
+    async def get_user_by_id(session: AsyncSession, user_id: int) -> Optional[UserSnapshot]:
+        """
+        Fetch a read-only snapshot of a user by their unique ID.
+        Returns None if not found.
+        """
+        return await AsyncUserRepository.get_by_id(session, user_id)
+
+    @staticmethod
+    async def get_users_by_ids(session: AsyncSession, user_ids: list[int]
+                               ) -> tuple[list[UserSnapshot], list[int]]:
+        """
+        Fetch read-only snapshots of several users at once; see
+        UserService.get_users_by_ids.
+        """
+        UserService._check_batch_size(user_ids)
+        users = await AsyncUserRepository.get_many(session, user_ids)
+        return users, UserService._missing_ids(user_ids, users)
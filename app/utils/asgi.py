@@ -0,0 +1,132 @@
+import asyncio
+import logging
+import re
+from typing import Awaitable, Callable, NamedTuple, Optional
+from urllib.parse import parse_qsl
+from app.repositories.token_denylist import token_denylist
+from app.utils.auth import AuthError, verify_bearer
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncRequest:
+    """
+    What an async view gets to see of a request: path params, query args,
+    (lowercased) headers and, once authenticated, the caller's id and role.
+    """
+    __slots__ = ("params", "args", "headers", "user_id", "user_role")
+
+    def __init__(self, scope: dict, params: dict):
+        self.params = params
+        self.args = {}
+        # Like request.args.get: the first value of a repeated key wins
+        query = scope["query_string"].decode("utf-8", "replace")
+        for key, value in parse_qsl(query, keep_blank_values=True):
+            self.args.setdefault(key, value)
+        self.headers = {
+            name.decode("latin-1").lower(): value.decode("latin-1")
+            for name, value in scope["headers"]
+        }
+        self.user_id = None
+        self.user_role = None
+
+
+class AsyncResponse(NamedTuple):
+    status: int
+    body: object = None  # anything the app's JSON provider can encode
+    etag: Optional[str] = None
+
+
+AsyncView = Callable[..., Awaitable[AsyncResponse]]
+
+
+class AsyncRouter:
+    """
+    Minimal ASGI app for a fixed set of authenticated GET views. Anything
+    it has no route for is passed to `fallback` (the Flask app, wrapped).
+
+        router = AsyncRouter(fallback, dumps, session_factory)
+        router.add(r"/users/(?P<user_id>\\d+)", get_user)
+
+    Each view is called as `view(request, session, **params)` with a fresh
+    session from `session_factory`, and returns an AsyncResponse.
+    """
+
+    def __init__(self, fallback, dumps: Callable[[object], str],
+                 session_factory, on_shutdown: Optional[Callable[[], Awaitable]] = None,
+                 headers: Optional[dict[str, str]] = None):
+        self.fallback = fallback
+        self.dumps = dumps
+        self.session_factory = session_factory
+        self.on_shutdown = on_shutdown
+        # Sent on every response from a view (e.g. CORS)
+        self.headers = [(name.lower().encode("latin-1"), value.encode("latin-1"))
+                        for name, value in (headers or {}).items()]
+        self.routes: list[tuple[re.Pattern, AsyncView]] = []
+        self.flask_app = None  # set by create_asgi_app, for tests and tooling
+
+    def add(self, pattern: str, view: AsyncView) -> None:
+        self.routes.append((re.compile(pattern + "$"), view))
+
+    def match(self, path: str) -> Optional[tuple[AsyncView, dict]]:
+        for pattern, view in self.routes:
+            found = pattern.match(path)
+            if found:
+                # Path params are all integer ids, as with Flask's <int:...>
+                return view, {name: int(value) for name, value in found.groupdict().items()}
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+
+        route = self.match(scope["path"]) if scope["type"] == "http" and scope["method"] == "GET" else None
+        if route is None:
+            await self.fallback(scope, receive, send)
+            return
+
+        view, params = route
+        request = AsyncRequest(scope, params)
+        try:
+            if token_denylist.sync_due():
+                # The sync queries the database, so it runs on a thread
+                # instead of stalling every request on the event loop
+                await asyncio.to_thread(token_denylist.sync)
+            claims = verify_bearer(request.headers.get("authorization"), sync_denylist=False)
+            request.user_id = claims["sub"]
+            request.user_role = claims.get("role")
+            async with self.session_factory() as session:
+                response = await view(request, session, **params)
+        except AuthError as error:
+            response = AsyncResponse(error.status, {"error": error.message})
+        except Exception:
+            logger.exception("Unexpected error in async view", extra={"path": scope["path"]})
+            response = AsyncResponse(500, {"error": "Internal server error"})
+
+        await self._send(send, response)
+
+    async def _send(self, send, response: AsyncResponse) -> None:
+        headers = list(self.headers)
+        body = b""
+        if response.body is not None:
+            body = self.dumps(response.body).encode("utf-8") + b"\n"
+            headers.append((b"content-type", b"application/json"))
+        if response.etag is not None:
+            headers.append((b"etag", f'"{response.etag}"'.encode("latin-1")))
+        headers.append((b"content-length", str(len(body)).encode("latin-1")))
+
+        await send({"type": "http.response.start", "status": response.status,
+                    "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+    async def _lifespan(self, receive, send) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                if self.on_shutdown is not None:
+                    await self.on_shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
@@ -0,0 +1,82 @@
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from app.utils.db_pool import _set_sqlite_pragmas
+
+# Sync driver -> async driver for the same database
+_ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+}
+
+
+def async_database_uri(uri: str | URL) -> str:
+    """
+    The async-driver form of a sync database URL, e.g.
+    postgresql://... -> postgresql+asyncpg://...
+    """
+    url = make_url(uri)
+    if url.drivername in _ASYNC_DRIVERS.values():
+        return url.render_as_string(hide_password=False)
+    try:
+        drivername = _ASYNC_DRIVERS[url.drivername]
+    except KeyError:
+        raise ValueError(f"No async driver known for {url.drivername}")
+    return url.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+class AsyncDatabase:
+    """
+    AsyncSession factory over the same database and models as `db`, for
+    the ASGI app. The URL is the sync engine's on its async driver
+    (aiosqlite or asyncpg) unless ASYNC_DATABASE_URI is set.
+
+        async with async_db.session() as session:
+            user = await session.get(User, user_id)
+
+    An in-memory SQLite database can't be shared with the sync engine, so
+    use a file (or a real server) when serving both.
+    """
+
+    def __init__(self, app=None, db=None):
+        self.engine = None
+        self.sessionmaker: Optional[async_sessionmaker[AsyncSession]] = None
+
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        uri = app.config.get("ASYNC_DATABASE_URI")
+        if not uri:
+            # The engine's URL rather than the config's: Flask-SQLAlchemy
+            # resolves relative SQLite paths against the instance folder
+            with app.app_context():
+                uri = async_database_uri(db.engine.url)
+
+        # Same pool sizing as the sync engine unless configured separately.
+        # The instrumented pool class is sync-only.
+        options = app.config.get("ASYNC_SQLALCHEMY_ENGINE_OPTIONS")
+        if options is None:
+            options = dict(app.config.get("SQLALCHEMY_ENGINE_OPTIONS") or {})
+            options.pop("poolclass", None)
+
+        self.engine = create_async_engine(uri, **options)
+
+        pragmas = app.config.get("SQLITE_PRAGMAS")
+        if pragmas and self.engine.dialect.name == "sqlite":
+            event.listen(self.engine.sync_engine, "connect", _set_sqlite_pragmas(pragmas))
+
+        # Sessions hand their rows straight to the caller, so nothing
+        # should expire (and need an implicit reload) on commit
+        self.sessionmaker = async_sessionmaker(self.engine, expire_on_commit=False)
+        app.extensions["async_db"] = self
+
+    def session(self) -> AsyncSession:
+        return self.sessionmaker()
+
+    async def dispose(self) -> None:
+        if self.engine is not None:
+            await self.engine.dispose()
@@ -1,34 +1,64 @@
 from functools import wraps
+from typing import Optional
 from flask import request, jsonify
 import jwt
-from os import getenv
+from app.extensions import token_cache
+from app.repositories.token_denylist import token_denylist
 
-def token_required(f):
-    @wraps(f)
-    def decorated(*args, **kwargs):
-        token = None
-        auth_header = request.headers.get("Authorization")
+class AuthError(Exception):
+    """A request that failed bearer-token authentication."""
+
+    def __init__(self, message: str, status: int = 401):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def verify_bearer(auth_header: Optional[str], sync_denylist: bool = True) -> dict:
+    """
+    Returns the verified claims for an `Authorization: Bearer <token>`
+    header (from the token cache when possible) unless the token has been
+    revoked. Raises AuthError with the error message and status to respond
+    with otherwise. Shared by
+    token_required and the ASGI app, which passes sync_denylist=False and
+    syncs the denylist itself.
+    """
+    token = None
+    if auth_header and auth_header.startswith("Bearer "):
+        token = auth_header.split(" ")[1]
 
-        if auth_header and auth_header.startswith("Bearer "):
-            token = auth_header.split(" ")[1]
+    if not token:
+        raise AuthError("Token is missing!")
 
-        if not token:
-            return jsonify({"error": "Token is missing!"}), 401
+    if not token_cache.secret:
+        raise AuthError("Server configuration issue", 500)
 
+    try:
+        claims = token_cache.decode(token)
+    except jwt.ExpiredSignatureError:
+        raise AuthError("Token expired")
+    except jwt.InvalidTokenError:
+        raise AuthError("Invalid token")
+
+    # Checked on cache hits too: a cached token may have been revoked since
+    if token_denylist.is_revoked(claims, sync=sync_denylist):
+        raise AuthError("Token has been revoked")
+    return claims
+
+
+def token_required(f):
+    @wraps(f)
+    def decorated(*args, **kwargs):
         try:
-            secret = getenv("SECRET_KEY")
-            if not secret:
-                return jsonify({"error": "Server configuration issue"}), 500
-
-            # Decode token and attach user_id and role to the request context
-            decoded = jwt.decode(token, secret, algorithms=["HS256"])
-            request.user_id = decoded["sub"]
-            request.user_role = decoded.get("role")
-        except jwt.ExpiredSignatureError:
-            return jsonify({"error": "Token expired"}), 401
-        except jwt.InvalidTokenError:
-            return jsonify({"error": "Invalid token"}), 401
+            # Verify token (or reuse a cached verification) and attach
+            # user_id and role to the request context
+            decoded = verify_bearer(request.headers.get("Authorization"))
+        except AuthError as error:
+            return jsonify({"error": error.message}), error.status
 
+        request.user_id = decoded["sub"]
+        request.user_role = decoded.get("role")
+        request.token_claims = decoded
         return f(*args, **kwargs)
     return decorated
 
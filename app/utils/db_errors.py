@@ -0,0 +1,21 @@
+from typing import Optional
+from sqlalchemy.exc import IntegrityError
+
+
+def integrity_error_message(error: IntegrityError, messages: dict[tuple[str, ...], str]
+                            ) -> Optional[str]:
+    """
+    Maps a constraint violation to a user-facing message. `messages` keys
+    are the ways a constraint can show up in the driver's error: its name
+    (PostgreSQL reports it in diag.constraint_name) or, on SQLite, the
+    "table.column" / "index '<name>'" text of the error.
+    Returns None if none of them match.
+    """
+    constraint = getattr(getattr(error.orig, "diag", None), "constraint_name", None)
+    text = str(error.orig)
+
+    for identifiers, message in messages.items():
+        for identifier in identifiers:
+            if identifier == constraint or identifier in text:
+                return message
+    return None
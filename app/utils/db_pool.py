@@ -0,0 +1,130 @@
+import threading
+from time import perf_counter
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool that reports how long each checkout waited for a connection.
+    Pool events only fire once a connection has been handed out, so the
+    wait itself has to be timed around `_do_get`.
+    """
+    stats = None  # PoolStats, set by PoolStats.init_app
+
+    def _do_get(self):
+        start = perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            if self.stats is not None:
+                self.stats.record_wait(perf_counter() - start)
+
+    def recreate(self):
+        # engine.dispose() builds a fresh pool; keep reporting into the same stats
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+def apply_engine_options(app) -> None:
+    """
+    Swaps in the instrumented pool whenever the config sizes a QueuePool.
+    Must run before db.init_app reads SQLALCHEMY_ENGINE_OPTIONS.
+    """
+    options = dict(app.config.get("SQLALCHEMY_ENGINE_OPTIONS") or {})
+    if "pool_size" in options:
+        options.setdefault("poolclass", InstrumentedQueuePool)
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = options
+
+
+def _set_sqlite_pragmas(pragmas: dict):
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+    return on_connect
+
+
+class PoolStats:
+    """
+    Connection-pool statistics fed from SQLAlchemy pool events: how many
+    connections are checked out, overflow in use, and time spent waiting.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._engine = None
+        self.reset()
+
+    def init_app(self, app, db):
+        self.reset()
+        with app.app_context():
+            engine = db.engine
+
+        pragmas = app.config.get("SQLITE_PRAGMAS")
+        if pragmas and engine.dialect.name == "sqlite":
+            event.listen(engine, "connect", _set_sqlite_pragmas(pragmas))
+
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+        event.listen(engine, "invalidate", self._on_invalidate)
+
+        if isinstance(engine.pool, InstrumentedQueuePool):
+            engine.pool.stats = self
+
+        self._engine = engine
+        app.extensions["pool_stats"] = self
+
+    def reset(self) -> None:
+        with self._lock:
+            self.checked_out = 0
+            self.checkouts = 0
+            self.connects = 0
+            self.invalidations = 0
+            self.wait_count = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.wait_count += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    def snapshot(self) -> dict:
+        pool = self._engine.pool if self._engine is not None else None
+        with self._lock:
+            return {
+                "pool": type(pool).__name__ if pool is not None else None,
+                "size": pool.size() if isinstance(pool, QueuePool) else None,
+                "overflow": max(pool.overflow(), 0) if isinstance(pool, QueuePool) else 0,
+                "checked_out": self.checked_out,
+                "checkouts": self.checkouts,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "wait_count": self.wait_count,
+                "wait_total_ms": round(self.wait_total * 1000, 3),
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+            }
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self._lock:
+            self.checked_out += 1
+            self.checkouts += 1
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.checked_out = max(self.checked_out - 1, 0)
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self.invalidations += 1
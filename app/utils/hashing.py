@@ -0,0 +1,91 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Optional
+from app.utils.security import hash_password, verify_password
+
+
+class HashingUnavailable(RuntimeError):
+    """
+    Raised when a password operation can't be accepted right now,
+    either because too many are already queued or because it timed out.
+    """
+
+
+class PasswordHasher:
+    """
+    Runs the CPU-bound password KDF on a process pool so hashing on
+    /register and /login scales across cores without pinning web workers.
+
+    The number of queued + running operations is bounded; once the bound is
+    reached new operations are rejected immediately instead of piling up.
+    A pool size of 0 runs the KDF inline (used by the test config).
+    """
+
+    def __init__(self, app=None):
+        self.pool_size = 0
+        self.timeout: Optional[float] = None
+        self._slots = threading.BoundedSemaphore(1)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.shutdown()
+        self.pool_size = app.config.get("PASSWORD_HASH_POOL_SIZE", 0)
+        self.timeout = app.config.get("PASSWORD_HASH_TIMEOUT")
+        max_pending = app.config.get("PASSWORD_HASH_MAX_PENDING", 32)
+        self._slots = threading.BoundedSemaphore(max_pending)
+        app.extensions["password_hasher"] = self
+
+    def hash(self, password: str) -> str:
+        return self._run(hash_password, password)
+
+    def verify(self, stored_hash: str, plain_password: str) -> bool:
+        return self._run(verify_password, stored_hash, plain_password)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def _run(self, fn, *args):
+        # Fail fast when the queue is full rather than blocking the worker
+        slots = self._slots
+        if not slots.acquire(blocking=False):
+            raise HashingUnavailable("Too many password operations in progress")
+
+        if not self.pool_size:
+            try:
+                return fn(*args)
+            finally:
+                slots.release()
+
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            slots.release()
+            raise
+        # The slot is held until the pool is really done with the task: a
+        # timed-out task that already started keeps running (cancel() can't
+        # stop it) and must still count against PASSWORD_HASH_MAX_PENDING
+        future.add_done_callback(lambda _: slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise HashingUnavailable("Password operation timed out")
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # Created lazily so forking servers don't inherit a live pool
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.pool_size,
+                        mp_context=multiprocessing.get_context("spawn")
+                    )
+        return self._executor
@@ -0,0 +1,50 @@
+import hashlib
+from typing import Optional
+from flask import request, make_response
+from werkzeug.http import parse_etags
+
+
+def make_etag(*parts) -> str:
+    """
+    Builds a strong ETag value from the parts that determine a representation
+    (e.g. resource id + row version + query params).
+
+    Versions usually come from entity_cache snapshots. A change invalidates
+    them at once only in the worker that made it; other workers keep the
+    old version, and so keep answering 304 to the old ETag, for up to
+    ENTITY_CACHE_TTL seconds.
+    """
+    raw = "|".join(str(part) for part in parts)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def is_not_modified(etag: str) -> bool:
+    """
+    True if the client's If-None-Match already names this ETag.
+    """
+    return etag in request.if_none_match
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    is_not_modified for a raw If-None-Match header, outside a Flask request.
+    """
+    return etag in parse_etags(if_none_match)
+
+
+def not_modified(etag: str):
+    """
+    A bodiless 304 response carrying the current ETag.
+    """
+    response = make_response("", 304)
+    response.set_etag(etag)
+    return response
+
+
+def with_etag(response, etag: str):
+    """
+    Attaches the ETag to a normal (200) response.
+    """
+    response = make_response(response)
+    response.set_etag(etag)
+    return response
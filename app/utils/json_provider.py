@@ -0,0 +1,60 @@
+from datetime import date
+from enum import Enum
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+
+def _default(o):
+    if isinstance(o, Enum):
+        return o.value
+    if isinstance(o, date):
+        return o.isoformat()
+    return DefaultJSONProvider.default(o)
+
+
+class AppJSONProvider(DefaultJSONProvider):
+    """
+    stdlib JSON provider that writes enums by value and datetimes as ISO 8601,
+    matching the orjson provider's output.
+    """
+    default = staticmethod(_default)
+
+
+class OrjsonProvider(AppJSONProvider):
+    """
+    JSON provider backed by orjson, which encodes dicts, datetimes and enums
+    in C and returns bytes we can hand straight to the response.
+    """
+
+    def _options(self, pretty: bool = False) -> int:
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, default=_default, option=self._options()).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = (self.compact is None and self._app.debug) or self.compact is False
+        body = orjson.dumps(obj, default=_default, option=self._options(pretty))
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
+
+
+def init_json(app) -> None:
+    """
+    Installs the fastest available JSON provider on the app.
+    """
+    provider = OrjsonProvider if orjson is not None else AppJSONProvider
+    app.json = provider(app)
+    app.json.sort_keys = app.config.get("JSON_SORT_KEYS", True)
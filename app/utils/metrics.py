@@ -0,0 +1,380 @@
+import atexit
+import bisect
+import json
+import logging
+import os
+import tempfile
+import threading
+from time import monotonic, perf_counter
+from flask import Response, g, request
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+logger = logging.getLogger(__name__)
+
+
+class _Accumulator:
+    """
+    Counters owned by a single thread. Only that thread writes to it, so
+    recording takes no lock; scrapes read it and merge all threads together.
+    """
+    __slots__ = ("requests", "latency", "in_flight")
+
+    def __init__(self):
+        self.requests: dict[tuple, int] = {}
+        self.latency: dict[tuple, list] = {}  # key -> [bucket counts..., +Inf, sum, count]
+        self.in_flight = 0
+
+
+def _empty_snapshot() -> dict:
+    return {"requests": {}, "latency": {}, "in_flight": 0, "gauges": {}, "counters": {}}
+
+
+def _merge(into: dict, other: dict, include_gauges: bool = True) -> None:
+    for key, value in other["requests"].items():
+        into["requests"][key] = into["requests"].get(key, 0) + value
+    for key, value in other["latency"].items():
+        current = into["latency"].get(key)
+        into["latency"][key] = (
+            list(value) if current is None else [a + b for a, b in zip(current, value)])
+    for key, value in other["counters"].items():
+        into["counters"][key] = into["counters"].get(key, 0) + value
+    if include_gauges:
+        into["in_flight"] += other["in_flight"]
+        for key, value in other["gauges"].items():
+            into["gauges"][key] = into["gauges"].get(key, 0) + value
+
+
+def _label_str(labels: dict) -> str:
+    if not labels:
+        return ""
+    parts = (f'{name}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+             for name, value in labels.items())
+    return "{" + ",".join(parts) + "}"
+
+
+def _key(name: str, **labels) -> str:
+    # Snapshot keys must survive a JSON round trip (multi-process mode)
+    return name + _label_str(labels)
+
+
+def _collect_extensions(app) -> tuple[dict, dict]:
+    """
+    Gauges and counters from the stats-reporting extensions registered
+    on the app (DB pool, token cache, token denylist, entity cache, login
+    rate limiter).
+    """
+    gauges, counters = {}, {}
+
+    pool = app.extensions.get("pool_stats")
+    if pool is not None:
+        stats = pool.snapshot()
+        gauges[_key("db_pool_checked_out")] = stats["checked_out"]
+        gauges[_key("db_pool_overflow")] = stats["overflow"]
+        if stats["size"] is not None:
+            gauges[_key("db_pool_size")] = stats["size"]
+        counters[_key("db_pool_checkouts_total")] = stats["checkouts"]
+        counters[_key("db_pool_wait_seconds_total")] = stats["wait_total_ms"] / 1000
+
+    token_cache = app.extensions.get("token_cache")
+    if token_cache is not None:
+        stats = token_cache.stats()
+        counters[_key("token_cache_hits_total")] = stats["hits"]
+        counters[_key("token_cache_misses_total")] = stats["misses"]
+        gauges[_key("token_cache_size")] = stats["size"]
+
+    token_denylist = app.extensions.get("token_denylist")
+    if token_denylist is not None:
+        stats = token_denylist.stats()
+        gauges[_key("token_denylist_tokens")] = stats["tokens"]
+        gauges[_key("token_denylist_users")] = stats["users"]
+        counters[_key("token_denylist_syncs_total")] = stats["syncs"]
+        counters[_key("token_denylist_rejected_total")] = stats["rejected"]
+
+    entity_cache = app.extensions.get("entity_cache")
+    if entity_cache is not None:
+        for cache, stats in entity_cache.stats().items():
+            counters[_key("entity_cache_hits_total", cache=cache)] = stats["hits"]
+            counters[_key("entity_cache_misses_total", cache=cache)] = stats["misses"]
+            gauges[_key("entity_cache_size", cache=cache)] = stats["size"]
+
+    login_limiter = app.extensions.get("login_rate_limits")
+    if login_limiter is not None:
+        stats = login_limiter.stats()
+        counters[_key("login_attempts_total", outcome="allowed")] = stats["allowed"]
+        counters[_key("login_attempts_total", outcome="rate_limited")] = stats["rejected"]
+
+    return gauges, counters
+
+
+_HELP = {
+    "http_requests_total": ("counter", "HTTP requests by endpoint, method and status."),
+    "http_request_duration_seconds": ("histogram", "HTTP request latency by endpoint."),
+    "http_requests_in_flight": ("gauge", "HTTP requests currently being served."),
+    "db_pool_checked_out": ("gauge", "Connections currently checked out of the pool."),
+    "db_pool_overflow": ("gauge", "Overflow connections currently open."),
+    "db_pool_size": ("gauge", "Configured pool size."),
+    "db_pool_checkouts_total": ("counter", "Connection checkouts."),
+    "db_pool_wait_seconds_total": ("counter", "Time spent waiting for a pooled connection."),
+    "token_cache_hits_total": ("counter", "Verified-JWT cache hits."),
+    "token_cache_misses_total": ("counter", "Verified-JWT cache misses."),
+    "token_cache_size": ("gauge", "Entries in the verified-JWT cache."),
+    "token_denylist_tokens": ("gauge", "Revoked tokens held in the denylist."),
+    "token_denylist_users": ("gauge", "Users with a revoke-all cutoff in the denylist."),
+    "token_denylist_syncs_total": ("counter", "Denylist syncs from the database."),
+    "token_denylist_rejected_total": ("counter", "Requests rejected with a revoked token."),
+    "entity_cache_hits_total": ("counter", "Entity cache hits."),
+    "entity_cache_misses_total": ("counter", "Entity cache misses."),
+    "entity_cache_size": ("gauge", "Entries in the entity cache."),
+    "login_attempts_total": ("counter", "Login attempts by rate limiter outcome."),
+}
+
+
+class Metrics:
+    """
+    Prometheus-style request metrics served on GET /metrics.
+
+    Each thread records into its own accumulator without locking; a scrape
+    merges every thread's numbers. With METRICS_MULTIPROC_DIR set, each
+    worker process also flushes its merged numbers to a file in that
+    directory (at most every METRICS_FLUSH_INTERVAL seconds) and a scrape
+    on any worker aggregates all of them.
+    """
+
+    def __init__(self):
+        self.buckets = DEFAULT_BUCKETS
+        self.multiproc_dir = None
+        self.flush_interval = 5.0
+        self._app = None
+        self._local = threading.local()
+        self._accumulators: list[tuple[threading.Thread, _Accumulator]] = []
+        self._retired = _empty_snapshot()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._last_flush = 0.0
+        atexit.register(self._flush_at_exit)
+
+    def init_app(self, app):
+        if not app.config.get("METRICS_ENABLED", True):
+            return
+
+        self.buckets = tuple(app.config.get("METRICS_BUCKETS", DEFAULT_BUCKETS))
+        self.multiproc_dir = app.config.get("METRICS_MULTIPROC_DIR")
+        self.flush_interval = app.config.get("METRICS_FLUSH_INTERVAL", 5.0)
+        self._app = app
+        self.reset()
+
+        if self.multiproc_dir:
+            os.makedirs(self.multiproc_dir, exist_ok=True)
+
+        app.before_request(self._start_request)
+        app.after_request(self._record_request)
+        app.teardown_request(self._end_request)
+        app.add_url_rule("/metrics", "metrics", self._serve)
+        app.extensions["metrics"] = self
+
+    def reset(self) -> None:
+        with self._lock:
+            self._local = threading.local()
+            self._accumulators = []
+            self._retired = _empty_snapshot()
+
+    # -- recording (hot path, no locks after a thread's first request) --
+
+    def _accumulator(self) -> _Accumulator:
+        acc = getattr(self._local, "acc", None)
+        if acc is None:
+            acc = self._local.acc = _Accumulator()
+            with self._lock:
+                self._accumulators.append((threading.current_thread(), acc))
+        return acc
+
+    def _start_request(self):
+        self._accumulator().in_flight += 1
+        g._metrics_start = perf_counter()
+
+    def _record_request(self, response):
+        start = g.pop("_metrics_start", None)
+        if start is None:
+            return response
+
+        acc = self._accumulator()
+        endpoint = request.endpoint or "unmatched"
+        key = (endpoint, request.method, response.status_code)
+        acc.requests[key] = acc.requests.get(key, 0) + 1
+
+        elapsed = perf_counter() - start
+        series = acc.latency.get((endpoint, request.method))
+        if series is None:
+            # one slot per bucket, one for "+Inf only", then sum and count
+            series = acc.latency[(endpoint, request.method)] = [0] * (len(self.buckets) + 3)
+        series[bisect.bisect_left(self.buckets, elapsed)] += 1
+        series[-2] += elapsed
+        series[-1] += 1
+
+        if self.multiproc_dir and monotonic() - self._last_flush > self.flush_interval:
+            self.flush(self.flush_interval)
+        return response
+
+    def _end_request(self, exc):
+        self._accumulator().in_flight -= 1
+
+    # -- aggregation --
+
+    def snapshot(self) -> dict:
+        """
+        This process's merged numbers, keyed by Prometheus series strings.
+        """
+        merged = _empty_snapshot()
+        with self._lock:
+            live = []
+            for thread, acc in self._accumulators:
+                if thread.is_alive():
+                    live.append((thread, acc))
+                # Dead threads' counters are folded in once and then dropped
+                target = merged if thread.is_alive() else self._retired
+                _merge(target, self._thread_snapshot(acc))
+            self._accumulators = live
+            _merge(merged, self._retired)
+
+        if self._app is not None:
+            gauges, counters = _collect_extensions(self._app)
+            merged["gauges"].update(gauges)
+            merged["counters"].update(counters)
+        return merged
+
+    def _thread_snapshot(self, acc: _Accumulator) -> dict:
+        requests, latency = {}, {}
+        # dict(...) copies are atomic enough under the GIL for a scrape
+        for (endpoint, method, status), value in dict(acc.requests).items():
+            requests[_key("http_requests_total", endpoint=endpoint,
+                          method=method, status=status)] = value
+        for (endpoint, method), series in dict(acc.latency).items():
+            latency[_label_str({"endpoint": endpoint, "method": method})] = list(series)
+        return {"requests": requests, "latency": latency,
+                "in_flight": acc.in_flight, "gauges": {}, "counters": {}}
+
+    def flush(self, min_interval: float = 0.0) -> None:
+        """
+        Writes this process's snapshot to the shared directory, unless it
+        was already written less than `min_interval` seconds ago. A failed
+        write is logged, never raised: it must not fail the request that
+        happened to trigger it.
+        """
+        if not self.multiproc_dir:
+            return
+        with self._flush_lock:
+            # Several threads can find a flush due; only the first writes
+            if monotonic() - self._last_flush < min_interval:
+                return
+            self._last_flush = monotonic()
+            path = os.path.join(self.multiproc_dir, f"metrics_{os.getpid()}.json")
+            tmp_path = None
+            try:
+                # A unique temp file, renamed over the old one, so the
+                # aggregator never reads a half-written snapshot
+                fd, tmp_path = tempfile.mkstemp(
+                    prefix=f"metrics_{os.getpid()}.", suffix=".tmp", dir=self.multiproc_dir)
+                with os.fdopen(fd, "w") as fh:
+                    json.dump(self.snapshot(), fh)
+                os.replace(tmp_path, path)
+            except OSError:
+                logger.warning("Metrics flush failed", exc_info=True)
+                if tmp_path is not None and os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+
+    def _flush_at_exit(self) -> None:
+        self.flush()
+
+    def aggregate(self) -> dict:
+        """
+        This process's numbers plus, in multi-process mode, every other
+        worker's last flush. Gauges from exited workers are ignored.
+        """
+        merged = _empty_snapshot()
+        _merge(merged, self.snapshot())
+        if not self.multiproc_dir:
+            return merged
+
+        own = f"metrics_{os.getpid()}.json"
+        for name in os.listdir(self.multiproc_dir):
+            if not name.startswith("metrics_") or not name.endswith(".json") or name == own:
+                continue
+            try:
+                with open(os.path.join(self.multiproc_dir, name)) as fh:
+                    other = json.load(fh)
+            except (OSError, ValueError):
+                continue
+            pid = int(name[len("metrics_"):-len(".json")])
+            _merge(merged, other, include_gauges=_pid_alive(pid))
+        return merged
+
+    # -- exposition --
+
+    def render(self) -> str:
+        data = self.aggregate()
+        lines = []
+
+        def header(name):
+            kind, text = _HELP[name]
+            lines.append(f"# HELP {name} {text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        header("http_requests_total")
+        for series, value in sorted(data["requests"].items()):
+            lines.append(f"{series} {value}")
+
+        header("http_request_duration_seconds")
+        for labels, series in sorted(data["latency"].items()):
+            base = labels[1:-1] + ","
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f'http_request_duration_seconds_bucket{{{base}le="{bound}"}} {cumulative}')
+            lines.append(f'http_request_duration_seconds_bucket{{{base}le="+Inf"}} {series[-1]}')
+            lines.append(f"http_request_duration_seconds_sum{labels} {series[-2]}")
+            lines.append(f"http_request_duration_seconds_count{labels} {series[-1]}")
+
+        header("http_requests_in_flight")
+        lines.append(f"http_requests_in_flight {data['in_flight']}")
+
+        samples = {**data["gauges"], **data["counters"]}
+        seen = set()
+        for series in sorted(samples):
+            name = series.split("{", 1)[0]
+            if name not in seen:
+                seen.add(name)
+                header(name)
+            lines.append(f"{series} {samples[series]}")
+
+        return "\n".join(lines) + "\n"
+
+    def _serve(self):
+        return Response(self.render(), content_type=CONTENT_TYPE)
+
+
+def clear_multiproc_dir(path: str) -> None:
+    """
+    Removes every worker's flushed metrics. Run when the server starts
+    (gunicorn's on_starting, before any worker exists): a previous run's
+    files would otherwise be summed into this run's counters forever.
+    """
+    if not path or not os.path.isdir(path):
+        return
+    for name in os.listdir(path):
+        if name.startswith("metrics_"):
+            try:
+                os.unlink(os.path.join(path, name))
+            except FileNotFoundError:
+                pass
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
@@ -0,0 +1,27 @@
+import base64
+import binascii
+import json
+
+
+def encode_cursor(*values) -> str:
+    """
+    Packs the sort key of the last row on a page into an opaque, URL-safe
+    token. Values must be JSON-serializable.
+    """
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> list:
+    """
+    Reverses encode_cursor. Raises ValueError on anything it didn't produce.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Invalid cursor")
+
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
@@ -0,0 +1,199 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+
+class Bucket(NamedTuple):
+    key: str
+    capacity: float  # burst size
+    rate: float  # tokens refilled per second
+
+
+def _take(buckets: list[Bucket], states: dict, now: float) -> tuple[float, dict]:
+    """
+    Token-bucket step shared by every store. `states` maps each bucket key
+    to its stored (tokens, updated_at), or None for a bucket never seen
+    (which starts full). A token is taken from every bucket only if all of
+    them have one. Returns the seconds to wait (0 when allowed) and the new
+    states to store.
+    """
+    levels = {}
+    for bucket in buckets:
+        state = states.get(bucket.key)
+        if state is None:
+            levels[bucket.key] = bucket.capacity
+        else:
+            tokens, updated_at = state
+            elapsed = max(now - updated_at, 0.0)
+            levels[bucket.key] = min(bucket.capacity, tokens + elapsed * bucket.rate)
+
+    wait = max((1 - levels[b.key]) / b.rate for b in buckets)
+    if wait <= 0:
+        return 0.0, {b.key: (levels[b.key] - 1, now) for b in buckets}
+    return wait, {b.key: (levels[b.key], now) for b in buckets}
+
+
+class MemoryBucketStore:
+    """
+    Buckets in this process only. Bounded: past `max_keys` the least
+    recently used bucket (by now usually refilled anyway) is dropped.
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, buckets: list[Bucket], now: float) -> float:
+        with self._lock:
+            states = {b.key: self._buckets.get(b.key) for b in buckets}
+            wait, updated = _take(buckets, states, now)
+            for key, state in updated.items():
+                self._buckets[key] = state
+                self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+class SQLiteBucketStore:
+    """
+    Buckets in a SQLite file, so every worker process on the host shares
+    one set of limits. Each check is one short IMMEDIATE transaction.
+    Any store with the same `take(buckets, now)` method (e.g. one backed by
+    Redis) can stand in for this one.
+    """
+
+    PRUNE_EVERY = 1000  # checks between sweeps of long-refilled buckets
+
+    def __init__(self, path: str, timeout: float = 5.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._checks = 0
+        self._max_refill = 0.0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(path, timeout=timeout)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limit_buckets ("
+                "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread (and per process: opened lazily, so
+        # never inherited across a fork)
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def take(self, buckets: list[Bucket], now: float) -> float:
+        conn = self._connection()
+        keys = [b.key for b in buckets]
+        self._max_refill = max(self._max_refill, *(b.capacity / b.rate for b in buckets))
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute(
+                "SELECT key, tokens, updated_at FROM rate_limit_buckets "
+                f"WHERE key IN ({', '.join('?' * len(keys))})", keys
+            ).fetchall()
+            wait, updated = _take(buckets, {key: (tokens, at) for key, tokens, at in rows}, now)
+            conn.executemany(
+                "INSERT INTO rate_limit_buckets (key, tokens, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET "
+                "tokens = excluded.tokens, updated_at = excluded.updated_at",
+                [(key, tokens, at) for key, (tokens, at) in updated.items()]
+            )
+
+            self._checks += 1
+            if self._checks % self.PRUNE_EVERY == 0:
+                # Anything untouched for a full refill is indistinguishable
+                # from a bucket that was never stored
+                conn.execute("DELETE FROM rate_limit_buckets WHERE updated_at < ?",
+                             (now - self._max_refill,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
+
+
+class RateLimiter:
+    """
+    Token-bucket rate limiter over named limits read from `config_key`,
+    e.g. {"ip": (20, 10), "email": (5, 1)}: a burst of 20 attempts per IP
+    refilled at 10 per minute, and 5 per email refilled at 1 per minute.
+
+        retry_after = limiter.hit(ip=request.remote_addr, email=email)
+
+    The backend is chosen by RATE_LIMIT_BACKEND: "memory" (per process) or
+    "sqlite" (shared through the file at RATE_LIMIT_SQLITE_PATH).
+    """
+
+    def __init__(self, config_key: str, app=None):
+        self.config_key = config_key
+        self.enabled = False
+        self.limits: dict[str, tuple[float, float]] = {}
+        self.store = None
+        self.allowed = 0
+        self.rejected = 0
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get("RATE_LIMIT_ENABLED", True)
+        self.limits = {
+            name: (burst, per_minute / 60)
+            for name, (burst, per_minute) in app.config.get(self.config_key, {}).items()
+        }
+
+        backend = app.config.get("RATE_LIMIT_BACKEND", "memory")
+        if backend == "memory":
+            self.store = MemoryBucketStore(app.config.get("RATE_LIMIT_MAX_KEYS", 100_000))
+        elif backend == "sqlite":
+            self.store = SQLiteBucketStore(app.config["RATE_LIMIT_SQLITE_PATH"])
+        else:
+            raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {backend}")
+
+        self.allowed = 0
+        self.rejected = 0
+        app.extensions[self.config_key.lower()] = self
+
+    def hit(self, now: Optional[float] = None, **keys: str) -> float:
+        """
+        Counts one attempt against the bucket for each named key. Returns 0
+        if it's allowed, otherwise the seconds until it would be.
+        Keys without a configured limit are ignored.
+        """
+        buckets = [
+            Bucket(f"{self.config_key}:{name}:{value}", *self.limits[name])
+            for name, value in keys.items()
+            if name in self.limits and value is not None
+        ]
+        if not self.enabled or not buckets:
+            return 0.0
+
+        wait = self.store.take(buckets, time.time() if now is None else now)
+        if wait:
+            self.rejected += 1
+        else:
+            self.allowed += 1
+        return wait
+
+    def stats(self) -> dict:
+        return {"allowed": self.allowed, "rejected": self.rejected}
@@ -0,0 +1,97 @@
+import heapq
+from time import perf_counter
+from flask import g, has_app_context
+from sqlalchemy import event
+
+
+class _RequestStats:
+    __slots__ = ("start", "query_count", "db_time", "slowest")
+
+    def __init__(self):
+        self.start = perf_counter()
+        self.query_count = 0
+        self.db_time = 0.0
+        self.slowest: list[tuple[float, str]] = []  # min-heap of (seconds, sql)
+
+
+class RequestTiming:
+    """
+    Per-request SQL query count and timing.
+
+    Query times come from SQLAlchemy's before/after_cursor_execute events and
+    are reported back in a `Server-Timing` header. Requests slower than
+    SLOW_REQUEST_THRESHOLD_MS are logged with their slowest statements.
+    When REQUEST_TIMING_ENABLED is off, no hooks are installed at all.
+    """
+
+    def __init__(self):
+        self.threshold_ms = None
+        self.keep_slowest = 3
+        self.logger = None
+
+    def init_app(self, app, db):
+        if not app.config.get("REQUEST_TIMING_ENABLED"):
+            return
+
+        self.threshold_ms = app.config.get("SLOW_REQUEST_THRESHOLD_MS")
+        self.keep_slowest = app.config.get("SLOW_REQUEST_LOG_STATEMENTS", 3)
+        self.logger = app.logger
+
+        with app.app_context():
+            engine = db.engine
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        app.extensions["request_timing"] = self
+
+    @staticmethod
+    def _start_request():
+        g._request_stats = _RequestStats()
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._query_start = perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if context is None or not has_app_context():
+            return
+        stats = g.get("_request_stats")
+        start = getattr(context, "_query_start", None)
+        if stats is None or start is None:
+            return
+
+        elapsed = perf_counter() - start
+        stats.query_count += 1
+        stats.db_time += elapsed
+
+        if len(stats.slowest) < self.keep_slowest:
+            heapq.heappush(stats.slowest, (elapsed, statement))
+        elif stats.slowest and elapsed > stats.slowest[0][0]:
+            heapq.heapreplace(stats.slowest, (elapsed, statement))
+
+    def _finish_request(self, response):
+        stats = g.pop("_request_stats", None)
+        if stats is None:
+            return response
+
+        total_ms = (perf_counter() - stats.start) * 1000
+        db_ms = stats.db_time * 1000
+        response.headers["Server-Timing"] = (
+            f'db;dur={db_ms:.2f};desc="{stats.query_count} queries", '
+            f'app;dur={total_ms - db_ms:.2f}, '
+            f'total;dur={total_ms:.2f}'
+        )
+
+        if self.threshold_ms is not None and total_ms > self.threshold_ms:
+            slowest = "; ".join(
+                f"{seconds * 1000:.2f}ms {' '.join(sql.split())}"
+                for seconds, sql in sorted(stats.slowest, reverse=True)
+            )
+            self.logger.warning(
+                "Slow request: %.2fms total, %d queries, %.2fms in DB. Slowest: %s",
+                total_ms, stats.query_count, db_ms, slowest or "none"
+            )
+
+        return response
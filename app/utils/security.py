@@ -1,7 +1,9 @@
-from datetime import datetime, timedelta, timezone
+import time
+import uuid
+from datetime import timedelta
 from werkzeug.security import generate_password_hash, check_password_hash
 import jwt
-from os import getenv
+from flask import current_app
 
 
 def hash_password(password: str) -> str:
@@ -18,16 +20,24 @@ def verify_password(stored_hash: str, plain_password: str) -> bool:
     return check_password_hash(stored_hash, plain_password)
 
 
+TOKEN_LIFETIME = timedelta(hours=1)
+
+
 def generate_token(user_id: int, role: str) -> str:
     """
-    Generates a JWT token with user ID and role, valid for 1 hour.
+    Generates a JWT token with user ID and role, valid for TOKEN_LIFETIME.
+    `jti` identifies it for logout; `iat` (to the microsecond) places it
+    before or after a user-wide revocation.
     """
+    now = time.time()
     payload = {
         "sub": str(user_id),
         "role": role,
-        "exp": datetime.now(timezone.utc) + timedelta(hours=1)
+        "jti": uuid.uuid4().hex,
+        "iat": round(now, 6),
+        "exp": int(now + TOKEN_LIFETIME.total_seconds())
     }
-    secret = getenv("SECRET_KEY")
+    secret = current_app.config["SECRET_KEY"]
     token = jwt.encode(payload, secret, algorithm="HS256")
 
     # Ensure token is string (in case bytes are returned)
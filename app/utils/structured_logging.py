@@ -0,0 +1,169 @@
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import random
+import re
+import sys
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from time import perf_counter
+from flask import g, has_request_context, request
+
+REQUEST_ID_HEADER = "X-Request-ID"
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,128}$")
+
+# Attributes every LogRecord has; anything else was passed via `extra=`
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {
+    "message", "asctime", "sample"}
+
+# One listener thread per process, shared by every app instance
+_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_listener: QueueListener | None = None
+_listener_pid: int | None = None
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats a record as a single JSON line, including any `extra=` fields.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        elif record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class RequestIdFilter(logging.Filter):
+    """
+    Stamps each record with the current request's correlation ID.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "request_id"):
+            record.request_id = g.get("request_id") if has_request_context() else None
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps only a fraction of high-volume INFO/DEBUG events, i.e. those logged
+    with `extra={"sample": True}`. Warnings and errors always pass.
+    """
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not getattr(record, "sample", False):
+            return True
+        return self.rate >= 1 or random.random() < self.rate
+
+
+class _NonBlockingQueueHandler(QueueHandler):
+    """
+    Hands records to the listener thread without formatting them first,
+    so the JSON formatter still sees the structured fields.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _start_listener(*handlers: logging.Handler) -> None:
+    global _listener, _listener_pid
+    if _listener is not None and _listener_pid == os.getpid():
+        _listener.stop()
+    _listener = QueueListener(_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    _listener_pid = os.getpid()
+
+
+def restart_listener() -> None:
+    """
+    Starts a new listener thread on the current handlers in a process
+    forked after configure_logging, which inherits the queue but not the
+    thread draining it. Does nothing in the process that started it.
+    """
+    if _listener is not None and _listener_pid != os.getpid():
+        _start_listener(*_listener.handlers)
+
+
+def _stop_listener() -> None:
+    global _listener
+    if _listener is not None and _listener_pid == os.getpid():
+        _listener.stop()
+    _listener = None
+
+
+atexit.register(_stop_listener)
+
+
+def configure_logging(app) -> None:
+    """
+    Routes the `app` logger tree through a QueueHandler so request threads
+    never block on I/O; a background QueueListener writes JSON lines to stdout.
+    Also assigns every request a correlation ID (X-Request-ID).
+    """
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if app.config.get("LOG_FORMAT", "json") == "json":
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter(
+            "%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"))
+    _start_listener(stream_handler)
+
+    queue_handler = _NonBlockingQueueHandler(_queue)
+    queue_handler.addFilter(RequestIdFilter())
+    queue_handler.addFilter(SamplingFilter(app.config.get("LOG_SAMPLE_RATE", 1.0)))
+
+    # app.logger is the "app" logger, parent of every app.* module logger
+    logger = app.logger
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    logger.addHandler(queue_handler)
+    logger.setLevel(app.config.get("LOG_LEVEL", "INFO"))
+    logger.propagate = app.config.get("LOG_PROPAGATE", False)
+
+    @app.before_request
+    def assign_request_id():
+        incoming = request.headers.get(REQUEST_ID_HEADER, "")
+        g.request_id = incoming if _VALID_REQUEST_ID.match(incoming) else uuid.uuid4().hex
+        g.request_started = perf_counter()
+
+    @app.after_request
+    def log_request(response):
+        response.headers[REQUEST_ID_HEADER] = g.get("request_id", "")
+        started = g.get("request_started")
+        logger.info(
+            "%s %s %s", request.method, request.path, response.status_code,
+            extra={
+                "sample": True,
+                "method": request.method,
+                "path": request.path,
+                "status": response.status_code,
+                "duration_ms": round((perf_counter() - started) * 1000, 2) if started else None,
+            }
+        )
+        return response
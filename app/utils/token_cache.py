@@ -0,0 +1,83 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+import jwt
+
+
+class TokenCache:
+    """
+    Bounded LRU cache of verified JWT claims.
+
+    Entries are keyed by a SHA-256 digest of the raw token (so bearer tokens
+    are never kept as dict keys) and expire at the token's own `exp`.
+    Only successfully verified tokens are cached; anything else goes through
+    a full `jwt.decode` and raises the usual PyJWT errors.
+    """
+
+    def __init__(self, app=None):
+        self.secret: Optional[str] = None
+        self.maxsize = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[bytes, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        # Resolve the signing secret once instead of on every request
+        self.secret = app.config.get("SECRET_KEY")
+        self.maxsize = app.config.get("TOKEN_CACHE_SIZE", 4096)
+        self.clear()
+        app.extensions["token_cache"] = self
+
+    def decode(self, token: str) -> dict:
+        """
+        Returns the verified claims for `token`, from the cache when possible.
+        """
+        key = hashlib.sha256(token.encode("utf-8")).digest()
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, claims = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return claims
+                # Expired: drop it and let jwt.decode raise ExpiredSignatureError
+                del self._entries[key]
+            self.misses += 1
+
+        claims = jwt.decode(token, self.secret, algorithms=["HS256"])
+
+        expires_at = claims.get("exp")
+        if self.maxsize and expires_at is not None:
+            with self._lock:
+                self._entries[key] = (float(expires_at), claims)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+
+        return claims
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+            }
@@ -0,0 +1,108 @@
+import logging
+from time import perf_counter
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from app.extensions import db, async_db, metrics
+from app.models.user import RoleEnum
+from app.repositories.token_denylist import token_denylist
+from app.repositories.user_repository import UserRepository
+from app.services.guild_service import GuildService, GUILD_SORTS
+from app.services.user_service import UserService, USERS_BATCH_MAX
+from app.utils.structured_logging import restart_listener
+
+logger = logging.getLogger(__name__)
+
+
+def after_fork(app) -> None:
+    """
+    Makes a worker forked from a preloaded master safe to serve: pooled
+    connections opened in the master are dropped (without closing them,
+    which would close the master's sockets too) and per-process threads
+    and counters are started afresh.
+    """
+    with app.app_context():
+        db.engine.dispose(close=False)
+    if async_db.engine is not None:
+        async_db.engine.sync_engine.dispose(close=False)
+
+    # Threads don't survive a fork
+    restart_listener()
+    metrics.reset()
+
+
+def warm_up(app) -> dict:
+    """
+    Gets a new worker ready before it accepts traffic: opens its pool's
+    connections, runs each hot read path once so its statements are
+    compiled into the engine's query cache, loads the snapshots of the
+    WARMUP_GUILDS most populated guilds and their leaders into the entity
+    cache, and loads the token denylist. A failure is logged and otherwise
+    ignored; the worker just starts cold.
+    """
+    start = perf_counter()
+    stats = {"connections": 0, "guilds": 0}
+    with app.app_context():
+        try:
+            stats["connections"] = _prime_pool(app)
+            stats["guilds"] = _run_hot_paths(app.config.get("WARMUP_GUILDS", 100))
+        except SQLAlchemyError:
+            logger.warning("Worker warm-up failed", exc_info=True)
+        finally:
+            db.session.remove()
+
+    stats["duration_ms"] = round((perf_counter() - start) * 1000, 2)
+    logger.info("Worker warmed up", extra=stats)
+    return stats
+
+
+def _prime_pool(app) -> int:
+    # Hold the connections all at once so the pool really opens that many
+    size = app.config.get("WARMUP_CONNECTIONS")
+    if size is None:
+        size = app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {}).get("pool_size", 1)
+
+    connections = []
+    try:
+        for _ in range(size):
+            connection = db.engine.connect()
+            connections.append(connection)
+            connection.execute(text("SELECT 1"))
+    finally:
+        for connection in connections:
+            connection.close()
+    return len(connections)
+
+
+def _run_hot_paths(guild_count: int) -> int:
+    # The directory in every sort order, first and second page
+    for sort in GUILD_SORTS:
+        for order in (sort, f"-{sort}"):
+            _, cursor = GuildService.list_guilds(sort=order, limit=1)
+            if cursor:
+                GuildService.list_guilds(sort=order, limit=1, cursor=cursor)
+
+    guilds = []
+    if guild_count:
+        guilds, _ = GuildService.list_guilds(sort="-member_count", limit=guild_count)
+
+    # Looking up an id that can't exist compiles the single-row statements
+    # without caching anything
+    UserService.get_user_by_id(0)
+    GuildService.get_guild_by_id(0)
+
+    leaders = [guild.created_by for guild in guilds]
+    for i in range(0, len(leaders), USERS_BATCH_MAX):
+        UserService.get_users_by_ids(leaders[i:i + USERS_BATCH_MAX])
+    for guild in guilds:
+        GuildService.get_guild_by_id(guild.id)
+
+    if guilds:
+        guild_id = guilds[0].id
+        GuildService.get_guild_overview(guild_id, limit=1)
+        GuildService.get_guild_members(guild_id, limit=1, after=0)
+        GuildService.get_guild_members(guild_id, limit=1, role=RoleEnum.member)
+        GuildService.get_guild_members(guild_id, limit=1, after=0, role=RoleEnum.member)
+
+    UserRepository.get_by_email("")  # login lookup
+    token_denylist.sync()  # so the first request doesn't
+    return len(guilds)
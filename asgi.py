@@ -0,0 +1,8 @@
+from dotenv import load_dotenv
+
+load_dotenv(".env")
+
+from app.asgi import create_asgi_app  # noqa: E402
+
+# ASGI entry point:  uvicorn asgi:app
+app = create_asgi_app()
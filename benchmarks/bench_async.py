@@ -0,0 +1,192 @@
+"""
+Execute with:  python -m benchmarks.bench_async [--size 10000] [--connections 1000]
+                                                [--duration 10] [--save results.json]
+Purpose: Compares concurrent throughput and latency of the read endpoints
+served by the ASGI app's async views against the same Flask views on the
+sync path (a WSGI thread pool), both under uvicorn against one seeded
+SQLite dataset, from a keep-alive client holding open --connections
+connections.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import urllib.request
+from time import perf_counter
+from app import create_app
+from app.config import BenchmarkConfig
+from app.extensions import db
+from app.utils.security import generate_token
+from benchmarks import dataset
+
+HOST = "127.0.0.1"
+PORTS = {"sync": 8101, "async": 8102}
+# uvicorn factories for each path; both serve the same Flask app underneath
+APPS = {
+    "sync": "benchmarks.bench_async:create_sync_app",
+    "async": "app.asgi:create_asgi_app",
+}
+
+
+def create_sync_app():
+    """
+    The Flask app on the thread pool the ASGI app uses for its other routes,
+    so the two servers differ only in how the read views run.
+    """
+    from a2wsgi import WSGIMiddleware
+    app = create_app("benchmark")
+    return WSGIMiddleware(app, workers=app.config["ASGI_WSGI_WORKERS"])
+
+
+def _workload(size: int) -> list:
+    """
+    Request paths weighted roughly like a guild page: profiles, rosters,
+    the directory.
+    """
+    guilds = max(size // dataset.GUILD_SIZE, 1)
+    rng = random.Random(42)
+    paths = []
+    for _ in range(2000):
+        kind = rng.random()
+        if kind < 0.5:
+            paths.append(f"/api/v1/users/{rng.randint(1, size)}")
+        elif kind < 0.8:
+            paths.append(f"/api/v1/guilds/{rng.randint(1, guilds)}/members?limit=20")
+        elif kind < 0.9:
+            paths.append(f"/api/v1/guilds/{rng.randint(1, guilds)}/overview?limit=10")
+        else:
+            paths.append("/api/v1/guilds?sort=-member_count&limit=20")
+    return paths
+
+
+async def _connection(port: int, token: str, paths: list, deadline: float,
+                      latencies: list, errors: list) -> None:
+    try:
+        reader, writer = await asyncio.open_connection(HOST, port)
+    except OSError as error:
+        errors.append(repr(error))
+        return
+
+    rng = random.Random()
+    try:
+        while time.monotonic() < deadline:
+            path = rng.choice(paths)
+            start = perf_counter()
+            writer.write(
+                f"GET {path} HTTP/1.1\r\nHost: {HOST}\r\n"
+                f"Authorization: Bearer {token}\r\n\r\n".encode()
+            )
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in head.split(b"\r\n"):
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":", 1)[1])
+            await reader.readexactly(length)
+            latencies.append(perf_counter() - start)
+            if not head.startswith(b"HTTP/1.1 200"):
+                errors.append(head.split(b"\r\n", 1)[0].decode())
+    except (OSError, asyncio.IncompleteReadError) as error:
+        errors.append(repr(error))
+    finally:
+        writer.close()
+
+
+async def _load(port: int, token: str, paths: list, connections: int,
+                duration: float) -> dict:
+    latencies, errors = [], []
+    start = perf_counter()
+    deadline = time.monotonic() + duration
+    await asyncio.gather(*(
+        _connection(port, token, paths, deadline, latencies, errors)
+        for _ in range(connections)
+    ))
+    elapsed = perf_counter() - start
+
+    latencies.sort()
+
+    def percentile(p):
+        return round(latencies[min(int(len(latencies) * p), len(latencies) - 1)] * 1000, 2) \
+            if latencies else None
+
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "requests_per_sec": round(len(latencies) / elapsed, 1),
+        "p50_ms": percentile(0.50),
+        "p99_ms": percentile(0.99),
+    }
+
+
+def _wait_until_up(port: int, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f"http://{HOST}:{port}/ping", timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+def run(size: int, connections: int, duration: float) -> dict:
+    database_url = f"sqlite:///benchmark_{size}.db"
+    BenchmarkConfig.SQLALCHEMY_DATABASE_URI = database_url
+    app = create_app("benchmark")
+    with app.app_context():
+        if not dataset.is_seeded(size):
+            print(f"Seeding {size:,} users...", flush=True)
+            dataset.seed(size)
+        token = generate_token(dataset.leader_id(1), "guild_leader")
+        db.engine.dispose()
+
+    env = {**os.environ, "FLASK_ENV": "benchmark", "BENCHMARK_DATABASE_URL": database_url}
+    paths = _workload(size)
+    results = {}
+    for mode, factory in APPS.items():
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "--factory", factory,
+             "--host", HOST, "--port", str(PORTS[mode]),
+             "--backlog", str(connections * 2), "--log-level", "warning", "--no-access-log"],
+            env=env
+        )
+        try:
+            _wait_until_up(PORTS[mode])
+            print(f"{mode}: {connections} connections for {duration:g}s...", flush=True)
+            results[mode] = asyncio.run(_load(PORTS[mode], token, paths, connections, duration))
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("Purpose: ")[-1])
+    parser.add_argument("--size", type=int, default=10_000, help="users in the dataset")
+    parser.add_argument("--connections", type=int, default=1000,
+                        help="concurrent keep-alive connections")
+    parser.add_argument("--duration", type=float, default=10, help="seconds per server")
+    parser.add_argument("--save", help="write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    results = run(args.size, args.connections, args.duration)
+
+    print(f"\n{'path':<8}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for mode, result in results.items():
+        print(f"{mode:<8}{result['requests_per_sec']:>10}{result['p50_ms']:>10}"
+              f"{result['p99_ms']:>10}{result['errors']:>8}")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"size": args.size, "connections": args.connections,
+                       "duration": args.duration, "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
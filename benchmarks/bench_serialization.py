@@ -0,0 +1,56 @@
+"""
+Execute with:  python -m benchmarks.bench_serialization
+Purpose: Compares the cost of serializing a 5,000-member roster the old way
+(User.serialize + stdlib json) against app.serializers + the app's JSON provider.
+"""
+import json
+import timeit
+from datetime import datetime, timezone
+from app import create_app
+from app.models.user import User, RoleEnum
+from app.serializers import serialize_users
+
+ROSTER_SIZE = 5000
+ROUNDS = 20
+
+
+def build_roster(size: int = ROSTER_SIZE) -> list[User]:
+    now = datetime.now(timezone.utc)
+    return [
+        User(
+            id=i,
+            username=f"raider{i}",
+            email=f"raider{i}@example.com",
+            password="x",
+            role=RoleEnum.raider if i % 3 else RoleEnum.member,
+            guild_id=1,
+            created_at=now
+        )
+        for i in range(1, size + 1)
+    ]
+
+
+def run():
+    app = create_app("testing")
+    roster = build_roster()
+
+    cases = {
+        "User.serialize + stdlib json": (
+            lambda: [user.serialize() for user in roster], json.dumps),
+        f"serialize_users + {type(app.json).__name__}": (
+            lambda: serialize_users(roster), app.json.dumps),
+    }
+
+    with app.app_context():
+        print(f"Serializing a {ROSTER_SIZE}-member roster, best of {ROUNDS} runs")
+        print(f"  {'':<45} {'to dicts':>10} {'encode':>10} {'total':>10}")
+        for name, (to_dicts, encode) in cases.items():
+            rows = to_dicts()
+            build = min(timeit.repeat(to_dicts, number=1, repeat=ROUNDS))
+            dump = min(timeit.repeat(lambda: encode(rows), number=1, repeat=ROUNDS))
+            print(f"  {name:<45} {build * 1000:8.2f}ms {dump * 1000:8.2f}ms "
+                  f"{(build + dump) * 1000:8.2f}ms")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,85 @@
+"""
+Execute with:  python -m benchmarks.bench_startup [--env production] [--runs 5]
+Purpose: Measures a worker's cold start in fresh interpreters: importing the
+app package, then create_app, checked against STARTUP_BUDGET_MS. Also
+reports whether modules API workers shouldn't need (Flask-Admin, WTForms,
+dotenv) got imported.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# Slowest acceptable cold start, in ms (best of several runs). Override per
+# machine with STARTUP_BUDGET_IMPORT_MS / STARTUP_BUDGET_CREATE_APP_MS.
+STARTUP_BUDGET_MS = {
+    "import_ms": float(os.getenv("STARTUP_BUDGET_IMPORT_MS", 1500)),
+    "create_app_ms": float(os.getenv("STARTUP_BUDGET_CREATE_APP_MS", 250)),
+}
+# Only the admin panel and the entry points may load these
+UNWANTED_MODULES = ("flask_admin", "wtforms", "dotenv")
+
+_PROBE = """
+import json, sys
+from time import perf_counter
+start = perf_counter()
+import app
+imported = perf_counter()
+app.create_app({env!r})
+created = perf_counter()
+print(json.dumps({{
+    "import_ms": (imported - start) * 1000,
+    "create_app_ms": (created - imported) * 1000,
+    "unwanted_modules": [m for m in {unwanted!r} if m in sys.modules],
+}}))
+"""
+
+
+def measure_startup(env: str = "testing", runs: int = 3) -> dict:
+    """
+    Best-of-`runs` import and create_app times, each from a new interpreter.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    probe = _PROBE.format(env=env, unwanted=UNWANTED_MODULES)
+    results = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", probe], cwd=root, check=True,
+            capture_output=True, text=True
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    return {
+        "import_ms": round(min(r["import_ms"] for r in results), 1),
+        "create_app_ms": round(min(r["create_app_ms"] for r in results), 1),
+        "unwanted_modules": sorted({m for r in results for m in r["unwanted_modules"]}),
+    }
+
+
+def over_budget(timings: dict) -> list[str]:
+    return [
+        f"{name} {timings[name]}ms > {budget:g}ms"
+        for name, budget in STARTUP_BUDGET_MS.items()
+        if timings[name] > budget
+    ]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("Purpose: ")[-1])
+    parser.add_argument("--env", default="testing", help="config to build the app with")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters to try")
+    args = parser.parse_args(argv)
+
+    timings = measure_startup(args.env, args.runs)
+    print(json.dumps(timings, indent=2))
+
+    problems = over_budget(timings)
+    problems += [f"imported {module}" for module in timings["unwanted_modules"]]
+    for problem in problems:
+        print(f"FAIL: {problem}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
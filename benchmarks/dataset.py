@@ -0,0 +1,83 @@
+"""
+Seeds the benchmark database with a fixed-shape dataset:
+  - N users, all sharing one precomputed password hash ("benchpass")
+  - guilds of GUILD_SIZE members each; guild 1 is always full
+  - the first member of every guild is its leader
+"""
+from datetime import datetime, timezone
+from sqlalchemy import func, insert, inspect, select, update
+from app.extensions import db
+from app.models.guild import Guild
+from app.models.user import User, RoleEnum
+from app.utils.security import hash_password
+
+PASSWORD = "benchpass"
+GUILD_SIZE = 500
+BATCH_SIZE = 10_000
+
+
+def user_email(user_id: int) -> str:
+    return f"user{user_id}@bench.test"
+
+
+def is_seeded(user_count: int) -> bool:
+    if not inspect(db.engine).has_table(User.__tablename__):
+        return False
+    return db.session.scalar(select(func.count()).select_from(User)) >= user_count
+
+
+def seed(user_count: int) -> None:
+    db.drop_all()
+    db.create_all()
+
+    password = hash_password(PASSWORD)
+    now = datetime.now(timezone.utc)
+    guild_count = max(user_count // GUILD_SIZE, 1)
+
+    # Users first (guild_id filled in below, once the guilds exist)
+    for start in range(1, user_count + 1, BATCH_SIZE):
+        stop = min(start + BATCH_SIZE, user_count + 1)
+        db.session.execute(insert(User), [
+            {
+                "id": user_id,
+                "username": f"user{user_id}",
+                "email": user_email(user_id),
+                "password": password,
+                "is_active": True,
+                "role": RoleEnum.member,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for user_id in range(start, stop)
+        ])
+
+    db.session.execute(insert(Guild), [
+        {
+            "id": guild_id,
+            "name": f"Guild {guild_id}",
+            "description": "Benchmark guild",
+            "created_by": leader_id(guild_id),
+            "created_at": now,
+            "updated_at": now,
+            "roster_version": 0,
+            "member_count": min(GUILD_SIZE, user_count - (guild_id - 1) * GUILD_SIZE),
+        }
+        for guild_id in range(1, guild_count + 1)
+    ])
+
+    members = min(guild_count * GUILD_SIZE, user_count)
+    db.session.execute(
+        update(User)
+        .where(User.id <= members)
+        .values(guild_id=(User.id - 1) // GUILD_SIZE + 1)
+    )
+    db.session.execute(
+        update(User)
+        .where(User.id.in_(select(Guild.created_by)))
+        .values(role=RoleEnum.guild_leader)
+    )
+    db.session.commit()
+
+
+def leader_id(guild_id: int) -> int:
+    return (guild_id - 1) * GUILD_SIZE + 1
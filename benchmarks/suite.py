@@ -0,0 +1,218 @@
+"""
+Execute with:  python -m benchmarks.suite [--sizes 10000,100000,1000000]
+                                          [--save results.json]
+                                          [--compare baseline.json --threshold 0.10]
+Purpose: Times the hot service/repository/serializer paths against seeded
+datasets, stores the results as JSON and flags regressions against a baseline.
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import uuid
+from datetime import datetime, timezone
+from time import perf_counter
+from flask import jsonify
+from app import create_app
+from app.config import BenchmarkConfig
+from app.extensions import db, token_cache
+from app.models.guild import Guild
+from app.models.user import User
+from app.serializers import serialize_user
+from app.services.guild_service import GuildService
+from app.services.user_service import UserService
+from app.utils.auth import token_required
+from app.utils.security import generate_token
+from benchmarks import dataset
+
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+DEFAULT_THRESHOLD = 0.10
+
+
+def _measure(fn, iterations: int, batch: int = 1, warmup: int = 3) -> dict:
+    """
+    Times `fn` and returns per-call statistics in milliseconds.
+    Very cheap calls are timed in batches of `batch` to keep timer overhead
+    out; a case that loops internally reports its loop count as `fn.calls`.
+    """
+    calls = batch * getattr(fn, "calls", 1)
+    for _ in range(warmup):
+        fn()
+        db.session.remove()
+
+    samples = []
+    for _ in range(iterations):
+        start = perf_counter()
+        for _ in range(batch):
+            fn()
+        samples.append((perf_counter() - start) * 1000 / calls)
+        db.session.remove()
+
+    samples.sort()
+    return {
+        "median_ms": round(statistics.median(samples), 4),
+        "p95_ms": round(samples[min(int(len(samples) * 0.95), len(samples) - 1)], 4),
+        "ops_per_sec": round(1000 / statistics.mean(samples), 1),
+        "iterations": iterations * calls,
+    }
+
+
+def _cases(app) -> dict:
+    """
+    name -> (callable, iterations, batch)
+    """
+    big_guild = 1
+    leader = dataset.leader_id(big_guild)
+    # Leadership is swapped back and forth between these two by the transfer
+    # case; start from whoever holds it now (earlier runs may have moved it)
+    current = db.session.get(Guild, big_guild).created_by
+    members = [current, leader + 1 if current == leader else leader]
+    token = generate_token(members[1], "member")
+
+    @token_required
+    def protected():
+        return None
+
+    def register():
+        name = f"bench_{uuid.uuid4().hex[:12]}"
+        UserService.register_user(name, f"{name}@bench.test", dataset.PASSWORD)
+
+    def login():
+        UserService.login(dataset.user_email(members[1]), dataset.PASSWORD)
+
+    def members_first_page():
+        GuildService.get_guild_members(big_guild, limit=50)
+
+    def members_deep_page():
+        GuildService.get_guild_members(big_guild, limit=50, after=leader + dataset.GUILD_SIZE // 2)
+
+    def transfer():
+        GuildService.transfer_leadership(big_guild, members[0], members[1])
+        members.reverse()
+
+    # One request context per 100 calls, so we time the decorator, not Flask
+    def token_cached():
+        with app.test_request_context(headers={"Authorization": f"Bearer {token}"}):
+            for _ in range(100):
+                protected()
+
+    def token_uncached():
+        with app.test_request_context(headers={"Authorization": f"Bearer {token}"}):
+            for _ in range(100):
+                token_cache.clear()
+                protected()
+
+    token_cached.calls = token_uncached.calls = 100
+
+    user = db.session.get(User, members[1])
+    db.session.expunge(user)
+
+    def user_serialize():
+        user.serialize()
+
+    def user_serialize_fast():
+        serialize_user(user)
+
+    def user_jsonify():
+        with app.app_context():
+            jsonify(serialize_user(user))
+
+    return {
+        "UserService.register_user": (register, 20, 1),
+        "UserService.login": (login, 20, 1),
+        "GuildService.get_guild_members (first page)": (members_first_page, 200, 1),
+        "GuildService.get_guild_members (deep page)": (members_deep_page, 200, 1),
+        "GuildService.transfer_leadership": (transfer, 100, 1),
+        "token_required (cached)": (token_cached, 50, 1),
+        "token_required (uncached)": (token_uncached, 50, 1),
+        "User.serialize": (user_serialize, 50, 1000),
+        "serialize_user": (user_serialize_fast, 50, 1000),
+        "serialize_user + jsonify": (user_jsonify, 50, 100),
+    }
+
+
+def run_size(size: int, reseed: bool = False) -> dict:
+    BenchmarkConfig.SQLALCHEMY_DATABASE_URI = f"sqlite:///benchmark_{size}.db"
+    app = create_app("benchmark")
+
+    with app.app_context():
+        if reseed or not dataset.is_seeded(size):
+            print(f"Seeding {size:,} users...", flush=True)
+            start = perf_counter()
+            dataset.seed(size)
+            print(f"  seeded in {perf_counter() - start:.1f}s", flush=True)
+
+        results = {}
+        for name, (fn, iterations, batch) in _cases(app).items():
+            results[name] = _measure(fn, iterations, batch)
+            print(f"  {name:<48} median {results[name]['median_ms']:>10.4f} ms"
+                  f"   p95 {results[name]['p95_ms']:>10.4f} ms", flush=True)
+        db.session.remove()
+        db.engine.dispose()
+    return results
+
+
+def compare(current: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD) -> list[str]:
+    """
+    Returns a description of every case whose median got slower than the
+    baseline by more than `threshold` (0.10 = 10%).
+    """
+    regressions = []
+    for size, cases in current["results"].items():
+        for name, result in cases.items():
+            before = baseline.get("results", {}).get(size, {}).get(name)
+            if not before or not before["median_ms"]:
+                continue
+            change = result["median_ms"] / before["median_ms"] - 1
+            if change > threshold:
+                regressions.append(
+                    f"[{size} users] {name}: {before['median_ms']:.4f} ms -> "
+                    f"{result['median_ms']:.4f} ms (+{change:.0%})")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("Purpose: ")[-1])
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated user counts to seed and benchmark")
+    parser.add_argument("--reseed", action="store_true", help="rebuild datasets even if present")
+    parser.add_argument("--save", help="write results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown before a case counts as a regression")
+    args = parser.parse_args(argv)
+
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+        },
+        "results": {},
+    }
+    for size in (int(s) for s in args.sizes.split(",")):
+        print(f"== {size:,} users", flush=True)
+        report["results"][str(size)] = run_size(size, reseed=args.reseed)
+
+    if args.save:
+        with open(args.save, "w") as fh:
+            json.dump(report, fh, indent=2)
+        print(f"Saved results to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as fh:
+            baseline = json.load(fh)
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
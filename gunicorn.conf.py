@@ -0,0 +1,60 @@
+"""
+Gunicorn settings, read from the app config of FLASK_ENV (production by
+default):
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+    gunicorn -c gunicorn.conf.py -k uvicorn.workers.UvicornWorker asgi:app
+
+The app is built once in the master and forked into the workers. Each
+worker drops the inherited connection pool and warms up before it takes
+traffic.
+"""
+import os
+from multiprocessing import cpu_count
+from dotenv import load_dotenv
+
+load_dotenv(".env")
+os.environ.setdefault("FLASK_ENV", "production")
+
+from app.config import get_config  # noqa: E402
+
+app_config = get_config(os.environ["FLASK_ENV"])
+
+bind = os.getenv("GUNICORN_BIND", f"0.0.0.0:{os.getenv('PORT', '8000')}")
+preload_app = True
+workers = app_config.WEB_WORKERS or cpu_count() * 2 + 1
+threads = app_config.WEB_THREADS
+worker_class = "gthread"
+timeout = app_config.WEB_TIMEOUT
+graceful_timeout = app_config.WEB_TIMEOUT
+keepalive = 5
+max_requests = app_config.WEB_MAX_REQUESTS
+max_requests_jitter = app_config.WEB_MAX_REQUESTS // 10
+accesslog = None  # requests are logged by the app as JSON lines
+
+
+def _flask_app(worker):
+    # The app preloaded in the master (post_fork runs before the worker
+    # loads it); the ASGI app wraps the Flask app
+    app = worker.app.wsgi()
+    return getattr(app, "flask_app", None) or app
+
+
+def on_starting(server):
+    # Workers' metrics from the previous run would be summed with this one's
+    if app_config.METRICS_MULTIPROC_DIR:
+        from app.utils.metrics import clear_multiproc_dir
+        clear_multiproc_dir(app_config.METRICS_MULTIPROC_DIR)
+
+
+def post_fork(server, worker):
+    # Imported here so this file can be loaded without building the app
+    from app.utils.worker import after_fork
+    after_fork(_flask_app(worker))
+
+
+def post_worker_init(worker):
+    app = _flask_app(worker)
+    if app.config.get("WARMUP_ENABLED", True):
+        from app.utils.worker import warm_up
+        warm_up(app)
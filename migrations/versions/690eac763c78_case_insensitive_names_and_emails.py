@@ -0,0 +1,30 @@
+"""case-insensitive names and emails
+
+Revision ID: 690eac763c78
+Revises: a03abaf551b8
+Create Date: 2026-10-17 01:20:24.954972
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '690eac763c78'
+down_revision = 'a03abaf551b8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Emails are stored lowercased from now on, so the existing unique
+    # ix_users_email is already case-insensitive. Fails if two accounts
+    # differ only by case; merge those by hand first.
+    op.execute("UPDATE users SET email = lower(email)")
+
+    op.create_index(
+        'uq_guilds_name_lower', 'guilds', [sa.text('lower(name)')], unique=True)
+
+
+def downgrade():
+    op.drop_index('uq_guilds_name_lower', table_name='guilds')
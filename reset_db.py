@@ -1,5 +1,9 @@
-from app import create_app
-from app.extensions import db
+from dotenv import load_dotenv
+
+load_dotenv(".env")
+
+from app import create_app  # noqa: E402
+from app.extensions import db  # noqa: E402
 
 def reset_db():
     app = create_app('development')
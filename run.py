@@ -1,7 +1,15 @@
 import os
-from app import create_app
+import sys
+from dotenv import load_dotenv
 
 if __name__ == "__main__":
+    load_dotenv(".env")
     env = os.getenv("FLASK_ENV", "development")
+    if env == "production":
+        # Never the development server in production
+        config = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gunicorn.conf.py")
+        os.execv(sys.executable, [sys.executable, "-m", "gunicorn", "-c", config, "wsgi:app"])
+
+    from app import create_app
     app = create_app(env)
-    app.run(debug=(env == "development"))
\ No newline at end of file
+    app.run(debug=(env == "development"))
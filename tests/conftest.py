@@ -0,0 +1,114 @@
+from contextlib import contextmanager
+import pytest
+from sqlalchemy import event
+from app import create_app
+from app.config import TestConfig
+from app.extensions import db
+
+
+@pytest.fixture
+def app():
+    app = create_app("testing")
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+
+
+@pytest.fixture
+def file_app_options():
+    """
+    How file_app is built. Override it in a module, or parametrize it on a
+    test, with any of:
+      config: TestConfig attributes to set, e.g. SQLALCHEMY_ENGINE_OPTIONS
+      factory: called with the config name instead of create_app; it may
+               return a wrapper exposing the Flask app as .flask_app
+      create_tables: False leaves the database (and the pool) untouched
+    """
+    return {}
+
+
+@pytest.fixture
+def file_app(tmp_path, monkeypatch, file_app_options):
+    """
+    Like app, but on a file-backed SQLite database: it gets a real QueuePool,
+    and threads, forked workers and the async engine all see the same data.
+    """
+    monkeypatch.setattr(TestConfig, "SQLALCHEMY_DATABASE_URI",
+                        f"sqlite:///{tmp_path / 'app.db'}")
+    for name, value in file_app_options.get("config", {}).items():
+        monkeypatch.setattr(TestConfig, name, value, raising=False)
+
+    built = file_app_options.get("factory", create_app)("testing")
+    flask_app = getattr(built, "flask_app", built)
+    create_tables = file_app_options.get("create_tables", True)
+    with flask_app.app_context():
+        if create_tables:
+            db.create_all()
+        yield built
+        if create_tables:
+            db.drop_all()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def captured_statements():
+    """
+    Records the SQL sent through the current app's engine:
+
+        with captured_statements() as statements:
+            ...
+        assert len(statements) == 2
+
+    With parameters=True each entry is a (statement, parameters) pair and
+    executemany batches are left out.
+    """
+    @contextmanager
+    def capture(parameters=False):
+        statements = []
+
+        def record(conn, cursor, statement, params, context, executemany):
+            if not parameters:
+                statements.append(statement)
+            elif not executemany:
+                statements.append((statement, params))
+
+        engine = db.engine
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+    return capture
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def register_and_login(client):
+    """
+    Registers a user and logs them in.
+    Returns (user_id, headers) where headers carry the bearer token.
+    """
+    def _register_and_login(username, password="securepass"):
+        email = f"{username}@test.com"
+        res = client.post("/api/v1/register", json={
+            "username": username,
+            "email": email,
+            "password": password
+        })
+        user_id = res.get_json()["id"]
+
+        res = client.post("/api/v1/login", json={
+            "email": email,
+            "password": password
+        })
+        token = res.get_json()["token"]
+        return user_id, {"Authorization": f"Bearer {token}"}
+
+    return _register_and_login
@@ -0,0 +1,282 @@
+import re
+import pytest
+from sqlalchemy import select, text
+from app import create_app
+from app.admin import ScalableModelView, approximate_count
+from app.config import TestConfig
+from app.extensions import db
+from app.models.guild import Guild
+from app.models.user import User, RoleEnum
+from app.services.guild_service import GuildService
+from app.services.user_service import UserService
+from app.utils.security import generate_token
+
+
+ADMIN_LOGIN = ("admin@test.com", "adminpass")
+
+
+@pytest.fixture
+def admin_app(monkeypatch):
+    monkeypatch.setattr(TestConfig, "ADMIN_ENABLED", True)
+    monkeypatch.setattr(TestConfig, "ADMIN_EMAILS", frozenset({ADMIN_LOGIN[0]}))
+    app = create_app("testing")
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+
+
+@pytest.fixture
+def admin_client(admin_app):
+    """A client signed in to the admin panel; the session keeps it signed in."""
+    UserService.register_user("admin", *ADMIN_LOGIN)
+    client = admin_app.test_client()
+    assert client.get("/admin/", auth=ADMIN_LOGIN).status_code == 200
+    return client
+
+
+def _csrf_token(client, url):
+    body = client.get(url).get_data(as_text=True)
+    return re.search(r'name="csrf_token"[^>]*value="([^"]+)"', body).group(1)
+
+
+def _seed_guilds():
+    # Two guilds, each a leader plus three members, and one guildless user
+    for g in (1, 2):
+        leader = User(username=f"leader{g}", email=f"leader{g}@test.com", password="x",
+                      role=RoleEnum.guild_leader)
+        db.session.add(leader)
+        db.session.flush()
+        guild = Guild(name=f"Guild {g}", created_by=leader.id, member_count=4)
+        db.session.add(guild)
+        db.session.flush()
+        leader.guild_id = guild.id
+        db.session.add_all([
+            User(username=f"g{g}member{i}", email=f"g{g}member{i}@test.com", password="x",
+                 role=RoleEnum.member, guild_id=guild.id)
+            for i in range(3)
+        ])
+    db.session.add(User(username="loner", email="loner@test.com", password="x"))
+    db.session.commit()
+
+
+def _ids(**filters):
+    return db.session.scalars(select(User.id).filter_by(**filters).order_by(User.id)).all()
+
+
+def _members():
+    return db.session.scalars(
+        select(User.id).where(User.role == RoleEnum.member, User.guild_id.is_not(None))
+        .order_by(User.id)
+    ).all()
+
+
+def test_approximate_count_uses_statistics_then_falls_back_to_max_id(admin_app):
+    _seed_guilds()
+    assert approximate_count(db.session, User) == 9  # no statistics: max(id)
+
+    db.session.execute(text("ANALYZE"))
+    db.session.add(User(username="late", email="late@test.com", password="x"))
+    db.session.commit()
+    # The estimate is as of the last ANALYZE
+    assert approximate_count(db.session, User) == 9
+    assert approximate_count(db.session, Guild) == 2
+
+
+def test_list_views_never_count_the_table(admin_client, captured_statements):
+    _seed_guilds()
+    client = admin_client
+
+    with captured_statements() as statements:
+        for url in ("/admin/user/", "/admin/user/?sort=1&desc=1", "/admin/guild/",
+                    "/admin/user/?search=LONER@test.com"):
+            res = client.get(url)
+            assert res.status_code == 200
+
+    assert not [s for s in statements if "count(" in s.lower()]
+    assert not [s for s in statements if " like " in s.lower()]
+
+
+def test_search_matches_indexed_columns_exactly(admin_client):
+    _seed_guilds()
+    client = admin_client
+
+    body = client.get("/admin/user/?search=LONER@test.com").get_data(as_text=True)
+    assert "loner@test.com" in body
+    assert "leader1@test.com" not in body
+
+    # No substring matching
+    body = client.get("/admin/user/?search=oner").get_data(as_text=True)
+    assert "loner@test.com" not in body
+
+    body = client.get("/admin/guild/?search=guild 2").get_data(as_text=True)
+    assert "Guild 2" in body
+    assert "Guild 1" not in body
+
+
+def test_bulk_kick_is_one_update_per_table(admin_client, captured_statements):
+    _seed_guilds()
+    leaders = _ids(role=RoleEnum.guild_leader)
+    members = _members()
+    guildless = _ids(guild_id=None)  # the loner and the admin
+    GuildService.get_guild_by_id(1)
+    UserService.get_user_by_id(members[0])
+    csrf_token = _csrf_token(admin_client, "/admin/user/")
+
+    # Every member of guild 1, one of guild 2, plus a leader and a guildless user
+    kicked = members[:4]
+    with captured_statements() as statements:
+        res = admin_client.post("/admin/user/action/", data={
+            "action": "kick",
+            "rowid": [str(i) for i in kicked + leaders + _ids(username="loner")],
+            "csrf_token": csrf_token
+        })
+    assert res.status_code == 302
+
+    updates = [s for s in statements if s.lstrip().upper().startswith("UPDATE")]
+    assert len(updates) == 2
+    assert _ids(guild_id=None) == sorted(kicked + guildless)
+    counts = dict(db.session.execute(select(Guild.id, Guild.member_count)).all())
+    assert counts == {1: 1, 2: 3}
+    assert db.session.scalar(select(Guild.roster_version).where(Guild.id == 1)) == 1
+    assert GuildService.reconcile_member_counts() == []
+
+    # Both caches were invalidated
+    assert UserService.get_user_by_id(members[0]).guild_id is None
+    assert GuildService.get_guild_by_id(1).roster_version == 1
+
+
+def test_bulk_deactivate_and_activate(admin_client, captured_statements):
+    _seed_guilds()
+    client = admin_client
+    credentials = {"email": "idler@test.com", "password": "securepass"}
+    client.post("/api/v1/register", json={"username": "idler", **credentials})
+    token = client.post("/api/v1/login", json=credentials).get_json()["token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    assert client.get("/api/v1/protected", headers=headers).status_code == 200
+
+    targets = _members() + _ids(username="idler")
+    UserService.get_user_by_id(targets[0])
+    csrf_token = _csrf_token(client, "/admin/user/")
+
+    with captured_statements() as statements:
+        res = client.post("/admin/user/action/", data={
+            "action": "deactivate", "rowid": [str(i) for i in targets], "csrf_token": csrf_token
+        })
+    assert res.status_code == 302
+    # One UPDATE of the users and one INSERT of their revocations
+    assert len([s for s in statements if s.lstrip().upper().startswith("UPDATE")]) == 1
+    assert len([s for s in statements if s.lstrip().upper().startswith("INSERT")]) == 1
+    assert _ids(is_active=False) == targets
+    assert UserService.get_user_by_id(targets[0]).is_active is False
+
+    # Signed out everywhere and can't sign back in
+    assert client.get("/api/v1/protected", headers=headers).status_code == 401
+    res = client.post("/api/v1/login", json=credentials)
+    assert res.status_code == 401
+    assert res.get_json()["error"] == "Account is deactivated"
+
+    # Only the rows that change are counted
+    assert UserService.set_users_active(targets[:2] + _ids(username="loner"), True) == 2
+    UserService.set_users_active(targets, True)
+    assert client.post("/api/v1/login", json=credentials).status_code == 200
+
+
+def test_admin_edit_invalidates_the_cache(admin_client):
+    _seed_guilds()
+    assert GuildService.get_guild_by_id(1).name == "Guild 1"
+
+    res = admin_client.post("/admin/guild/edit/?id=1", data={
+        "name": "Renamed", "description": "",
+        "csrf_token": _csrf_token(admin_client, "/admin/guild/edit/?id=1")
+    })
+    assert res.status_code == 302
+    assert GuildService.get_guild_by_id(1).name == "Renamed"
+
+
+def test_admin_user_edit_lowercases_email_and_keeps_role(admin_client):
+    _seed_guilds()
+    [leader_id] = _ids(username="leader1")
+    url = f"/admin/user/edit/?id={leader_id}"
+
+    res = admin_client.post(url, data={
+        "username": "leader1", "email": " Chief@Test.com", "is_active": "y",
+        "role": "member", "csrf_token": _csrf_token(admin_client, url)
+    })
+    assert res.status_code == 302
+
+    leader = db.session.get(User, leader_id)
+    assert leader.email == "chief@test.com"
+    assert leader.role == RoleEnum.guild_leader
+    assert UserService.get_user_by_id(leader_id).email == "chief@test.com"
+
+
+def test_admin_profile_edit_changes_the_roster_etag(admin_client):
+    _seed_guilds()
+    [member_id] = _ids(username="g1member0")
+    headers = {"Authorization": f"Bearer {generate_token(member_id, 'member')}"}
+    etag = admin_client.get("/api/v1/guilds/1/members", headers=headers).headers["ETag"]
+    url = f"/admin/user/edit/?id={member_id}"
+
+    def save(username):
+        return admin_client.post(url, data={
+            "username": username, "email": "g1member0@test.com",
+            "csrf_token": _csrf_token(admin_client, url)
+        })
+
+    assert save("renamed").status_code == 302
+    res = admin_client.get("/api/v1/guilds/1/members",
+                           headers={**headers, "If-None-Match": etag})
+    assert res.status_code == 200
+    assert "renamed" in res.get_data(as_text=True)
+
+    # Saving without changes leaves the roster version alone
+    version = GuildService.get_guild_by_id(1).roster_version
+    assert save("renamed").status_code == 302
+    assert GuildService.get_guild_by_id(1).roster_version == version
+
+def test_admin_requires_an_admin_sign_in(admin_app):
+    UserService.register_user("admin", *ADMIN_LOGIN)
+    UserService.register_user("player", "player@test.com", "playerpass")
+    client = admin_app.test_client()
+
+    for auth in (None, (ADMIN_LOGIN[0], "wrong"), ("player@test.com", "playerpass")):
+        for url in ("/admin/", "/admin/user/", "/admin/guild/"):
+            res = client.get(url, auth=auth)
+            assert res.status_code == 401, (url, auth)
+            assert res.headers["WWW-Authenticate"] == 'Basic realm="Admin"'
+
+    # Signed in once, the session carries the admin from then on
+    assert client.get("/admin/user/", auth=ADMIN_LOGIN).status_code == 200
+    assert client.get("/admin/guild/").status_code == 200
+
+    # ...until the account stops being an admin
+    UserService.set_users_active(_ids(username="admin"), False)
+    assert client.get("/admin/guild/").status_code == 401
+
+
+def test_admin_actions_require_a_csrf_token(admin_client):
+    _seed_guilds()
+    members = _members()
+
+    res = admin_client.post("/admin/user/action/", data={
+        "action": "deactivate", "rowid": [str(i) for i in members]
+    })
+
+    assert res.status_code == 302
+    assert _ids(is_active=False) == []
+
+
+def test_admin_views_must_declare_cache_and_search_columns():
+    class Incomplete(ScalableModelView):
+        cache_name = "users"
+
+    with pytest.raises(TypeError, match="search_columns"):
+        Incomplete(User, db.session)
+
+    class WrongCache(ScalableModelView):
+        cache_name = "players"
+        search_columns = ()
+
+    with pytest.raises(TypeError, match="cache_name"):
+        WrongCache(User, db.session)
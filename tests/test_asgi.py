@@ -0,0 +1,156 @@
+import asyncio
+import threading
+import pytest
+from app.asgi import create_asgi_app
+from app.extensions import async_db
+from app.repositories.entity_cache import entity_cache
+from app.repositories.token_denylist import token_denylist
+from app.seed_db import bulk_seed
+from app.utils.async_db import async_database_uri
+from app.utils.security import generate_token
+
+
+@pytest.fixture
+def file_app_options():
+    # The sync and async engines share the file-backed database
+    return {"factory": create_asgi_app}
+
+
+@pytest.fixture
+def asgi_app(file_app):
+    bulk_seed(users=30, guilds=2, members_per_guild=10)
+    return file_app
+
+
+@pytest.fixture
+def headers():
+    return {"Authorization": f"Bearer {generate_token(1, 'guild_leader')}"}
+
+
+async def asgi_call(app, method, path, query="", headers=None):
+    """
+    Sends one bodiless request straight to the ASGI app.
+    Returns (status, headers, body).
+    """
+    scope = {
+        "type": "http", "http_version": "1.1", "method": method, "scheme": "http",
+        "path": path, "raw_path": path.encode(), "query_string": query.encode(),
+        "root_path": "", "server": ("testserver", 80), "client": ("127.0.0.1", 1234),
+        "headers": [(name.lower().encode(), value.encode())
+                    for name, value in (headers or {}).items()],
+    }
+    messages = [{"type": "http.request", "body": b"", "more_body": False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    await app(scope, receive, send)
+    start = sent[0]
+    body = b"".join(message.get("body", b"") for message in sent[1:])
+    return start["status"], {k.decode(): v.decode() for k, v in start["headers"]}, body
+
+
+def run(app, *calls):
+    """
+    Runs the calls on one event loop (pooled async connections are tied
+    to it) and disposes of the async engine afterwards.
+    """
+    async def main():
+        try:
+            return [await asgi_call(app, *call) for call in calls]
+        finally:
+            await async_db.dispose()
+    return asyncio.run(main())
+
+
+READ_ROUTES = [
+    ("/api/v1/users/1", ""),
+    ("/api/v1/users/999", ""),
+    ("/api/v1/users", "ids=3,1,999,1"),
+    ("/api/v1/users", "ids=1,x"),
+    ("/api/v1/guilds", "sort=-member_count&limit=1"),
+    ("/api/v1/guilds", "sort=height"),
+    ("/api/v1/guilds/1", ""),
+    ("/api/v1/guilds/9", ""),
+    ("/api/v1/guilds/1/members", "limit=3&after=2"),
+    ("/api/v1/guilds/1/members", "role=emperor"),
+    ("/api/v1/guilds/2/overview", "limit=2"),
+    ("/api/v1/guilds/2/overview", "limit=0"),
+]
+
+
+def test_async_routes_answer_like_flask(asgi_app, headers):
+    client = asgi_app.flask_app.test_client()
+    expected = []
+    for path, query in READ_ROUTES:
+        res = client.get(f"{path}?{query}", headers=headers)
+        expected.append((res.status_code, res.headers.get("ETag"), res.get_data()))
+    # The async path has to load for itself
+    entity_cache.users.clear()
+    entity_cache.guilds.clear()
+
+    responses = run(asgi_app, *(("GET", path, query, headers) for path, query in READ_ROUTES))
+
+    for (path, query), (status, res_headers, body), want in zip(READ_ROUTES, responses, expected):
+        assert (status, res_headers.get("etag"), body) == want, f"{path}?{query}"
+        assert res_headers["access-control-allow-origin"] == "*"
+
+
+def test_async_routes_require_a_token(asgi_app):
+    (status, _, body), = run(asgi_app, ("GET", "/api/v1/users/1"))
+    assert status == 401
+    assert body == b'{"error":"Token is missing!"}\n'
+
+
+def test_async_routes_answer_not_modified(asgi_app, headers):
+    (_, first, _), = run(asgi_app, ("GET", "/api/v1/guilds/1/members", "", headers))
+
+    (status, res_headers, body), = run(asgi_app, (
+        "GET", "/api/v1/guilds/1/members", "",
+        {**headers, "If-None-Match": first["etag"]}))
+
+    assert status == 304
+    assert res_headers["etag"] == first["etag"]
+    assert body == b""
+
+
+def test_denylist_syncs_off_the_event_loop(asgi_app, headers, monkeypatch):
+    sync = token_denylist.sync
+    threads = []
+
+    def recording_sync(*args):
+        threads.append(threading.get_ident())
+        sync(*args)
+
+    monkeypatch.setattr(token_denylist, "sync", recording_sync)
+    token_denylist.reset()  # due for a sync
+
+    (status, _, _), = run(asgi_app, ("GET", "/api/v1/users/1", "", headers))
+
+    assert status == 200
+    assert len(threads) == 1
+    assert threads[0] != threading.get_ident()  # asyncio.run's loop is on this thread
+
+
+def test_other_routes_fall_through_to_flask(asgi_app, headers):
+    (ping_status, _, ping_body), (patch_status, _, _) = run(
+        asgi_app,
+        ("GET", "/ping"),
+        ("PATCH", "/api/v1/guilds/1", "", headers),  # Flask rejects the missing JSON body
+    )
+    assert (ping_status, ping_body) == (200, b'{"status":"ok"}\n')
+    assert patch_status == 415
+
+
+def test_async_database_uri_picks_the_async_driver():
+    assert async_database_uri("sqlite:///app.db") == "sqlite+aiosqlite:///app.db"
+    assert (async_database_uri("postgresql://u:p@db/app")
+            == "postgresql+asyncpg://u:p@db/app")
+    assert (async_database_uri("postgresql+asyncpg://u:p@db/app")
+            == "postgresql+asyncpg://u:p@db/app")
+    with pytest.raises(ValueError):
+        async_database_uri("mysql://u:p@db/app")
@@ -0,0 +1,18 @@
+from benchmarks.suite import compare
+
+
+def _report(median_ms):
+    return {"results": {"10000": {"UserService.login": {"median_ms": median_ms}}}}
+
+
+def test_compare_flags_slowdowns_beyond_threshold():
+    regressions = compare(_report(12.0), _report(10.0), threshold=0.10)
+
+    assert len(regressions) == 1
+    assert "UserService.login" in regressions[0]
+    assert "+20%" in regressions[0]
+
+
+def test_compare_ignores_noise_and_new_cases():
+    assert compare(_report(10.5), _report(10.0), threshold=0.10) == []
+    assert compare(_report(10.0), {"results": {}}, threshold=0.10) == []
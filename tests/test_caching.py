@@ -0,0 +1,176 @@
+import pytest
+from app.extensions import db
+from app.models.guild import Guild
+from app.models.user import User
+from app.repositories.entity_cache import entity_cache, TTLCache
+
+
+@pytest.fixture
+def guild_with_member(client, register_and_login):
+    """
+    A guild (id 1) led by user 1 with user 2 as a plain member.
+    Returns (leader_headers, member_headers).
+    """
+    _, leader_headers = register_and_login("leader")
+    _, member_headers = register_and_login("member")
+    client.post("/api/v1/guilds", json={"name": "Cache Guild"}, headers=leader_headers)
+
+    db.session.get(User, 2).guild_id = 1
+    db.session.get(Guild, 1).member_count += 1
+    db.session.commit()
+    # The member was added behind the services' back
+    entity_cache.users.invalidate(2)
+
+    return leader_headers, member_headers
+
+
+def test_repeat_reads_are_served_from_cache(client, register_and_login):
+    _, headers = register_and_login("reader")
+
+    for _ in range(3):
+        assert client.get("/api/v1/users/1", headers=headers).status_code == 200
+
+    stats = entity_cache.stats()["users"]
+    assert stats["misses"] == 1
+    assert stats["hits"] == 2
+
+
+def test_create_user_is_visible_immediately(client, register_and_login):
+    _, headers = register_and_login("first")
+    assert client.get("/api/v1/users/2", headers=headers).status_code == 404
+
+    register_and_login("second")
+
+    res = client.get("/api/v1/users/2", headers=headers)
+    assert res.status_code == 200
+    assert res.get_json()["username"] == "second"
+
+
+def test_create_guild_invalidates_creator(client, register_and_login):
+    _, headers = register_and_login("founder")
+    assert client.get("/api/v1/users/1", headers=headers).get_json()["guild_id"] is None
+
+    client.post("/api/v1/guilds", json={"name": "Fresh Guild"}, headers=headers)
+
+    data = client.get("/api/v1/users/1", headers=headers).get_json()
+    assert data["guild_id"] == 1
+    assert data["role"] == "guild_leader"
+
+
+def test_update_guild_invalidates_guild(client, guild_with_member):
+    leader_headers, _ = guild_with_member
+    assert client.get("/api/v1/guilds/1", headers=leader_headers).get_json()["name"] == "Cache Guild"
+
+    client.patch("/api/v1/guilds/1", json={"name": "Renamed Guild"}, headers=leader_headers)
+
+    assert client.get("/api/v1/guilds/1", headers=leader_headers).get_json()["name"] == "Renamed Guild"
+
+
+def test_leave_guild_invalidates_member(client, guild_with_member):
+    _, member_headers = guild_with_member
+    assert client.get("/api/v1/users/2", headers=member_headers).get_json()["guild_id"] == 1
+
+    client.delete("/api/v1/guilds/1/leave", headers=member_headers)
+
+    assert client.get("/api/v1/users/2", headers=member_headers).get_json()["guild_id"] is None
+
+
+def test_kick_member_invalidates_member(client, guild_with_member):
+    leader_headers, _ = guild_with_member
+    assert client.get("/api/v1/users/2", headers=leader_headers).get_json()["guild_id"] == 1
+
+    client.delete("/api/v1/guilds/1/members/2", headers=leader_headers)
+
+    assert client.get("/api/v1/users/2", headers=leader_headers).get_json()["guild_id"] is None
+
+
+def test_transfer_leadership_invalidates_both_users_and_guild(client, guild_with_member):
+    leader_headers, member_headers = guild_with_member
+    client.get("/api/v1/users/1", headers=leader_headers)
+    client.get("/api/v1/users/2", headers=leader_headers)
+    assert client.get("/api/v1/guilds/1", headers=leader_headers).get_json()["created_by"] == 1
+
+    client.post("/api/v1/guilds/1/transfer-leadership",
+                json={"new_leader_id": 2}, headers=leader_headers)
+
+    # The demoted leader's token is revoked; read as the new leader
+    assert client.get("/api/v1/users/1", headers=member_headers).get_json()["role"] == "member"
+    assert client.get("/api/v1/users/2", headers=member_headers).get_json()["role"] == "guild_leader"
+    assert client.get("/api/v1/guilds/1", headers=member_headers).get_json()["created_by"] == 2
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+
+    for key in (1, 2, 3):
+        cache.get_or_load(key, lambda key=key: f"row{key}")
+
+    assert cache.stats()["size"] == 2
+    assert cache.get_or_load(1, lambda: "reloaded") == "reloaded"
+
+
+def test_batch_lookup_only_loads_misses(client, register_and_login, monkeypatch):
+    _, headers = register_and_login("one")
+    register_and_login("two")
+    register_and_login("three")
+    client.get("/api/v1/users/2", headers=headers)  # warm the cache for user 2
+
+    loaded = []
+    real_load = TTLCache.get_many_or_load
+
+    def spy(self, keys, loader):
+        return real_load(self, keys, lambda missing: loaded.append(missing) or loader(missing))
+
+    monkeypatch.setattr(TTLCache, "get_many_or_load", spy)
+    res = client.get("/api/v1/users?ids=1,2,3", headers=headers)
+
+    assert [user["id"] for user in res.get_json()["users"]] == [1, 2, 3]
+    assert loaded == [[1, 3]]
+
+
+def test_user_conditional_get_returns_304(client, register_and_login):
+    _, headers = register_and_login("poller")
+
+    res = client.get("/api/v1/users/1", headers=headers)
+    etag = res.headers["ETag"]
+
+    res = client.get("/api/v1/users/1", headers={**headers, "If-None-Match": etag})
+    assert res.status_code == 304
+    assert res.data == b""
+    assert res.headers["ETag"] == etag
+
+
+def test_guild_etag_changes_after_update(client, guild_with_member):
+    leader_headers, _ = guild_with_member
+    etag = client.get("/api/v1/guilds/1", headers=leader_headers).headers["ETag"]
+
+    client.patch("/api/v1/guilds/1", json={"description": "New"}, headers=leader_headers)
+
+    res = client.get("/api/v1/guilds/1", headers={**leader_headers, "If-None-Match": etag})
+    assert res.status_code == 200
+    assert res.headers["ETag"] != etag
+
+
+def test_member_list_304_skips_member_rows(app, client, guild_with_member,
+                                          captured_statements):
+    leader_headers, _ = guild_with_member
+    etag = client.get("/api/v1/guilds/1/members", headers=leader_headers).headers["ETag"]
+
+    with captured_statements() as statements:
+        res = client.get("/api/v1/guilds/1/members",
+                         headers={**leader_headers, "If-None-Match": etag})
+
+    assert res.status_code == 304
+    assert not any("FROM users" in statement for statement in statements)
+
+
+def test_member_list_etag_changes_when_roster_changes(client, guild_with_member):
+    leader_headers, _ = guild_with_member
+    etag = client.get("/api/v1/guilds/1/members", headers=leader_headers).headers["ETag"]
+
+    client.delete("/api/v1/guilds/1/members/2", headers=leader_headers)
+
+    res = client.get("/api/v1/guilds/1/members",
+                     headers={**leader_headers, "If-None-Match": etag})
+    assert res.status_code == 200
+    assert [m["id"] for m in res.get_json()["members"]] == [1]
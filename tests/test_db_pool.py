@@ -0,0 +1,53 @@
+import pytest
+from sqlalchemy import text
+from app.extensions import db, pool_stats
+from app.utils.db_pool import InstrumentedQueuePool
+
+
+@pytest.fixture
+def file_app_options():
+    # No tables, so the pool is untouched when a test starts
+    return {"config": {"SQLALCHEMY_ENGINE_OPTIONS":
+                       {"pool_size": 2, "max_overflow": 1, "pool_timeout": 5}},
+            "create_tables": False}
+
+
+def test_sized_pool_is_instrumented(file_app):
+    assert isinstance(db.engine.pool, InstrumentedQueuePool)
+
+    with db.engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        stats = pool_stats.snapshot()
+        assert stats["checked_out"] == 1
+        assert stats["size"] == 2
+
+    stats = pool_stats.snapshot()
+    assert stats["checked_out"] == 0
+    assert stats["checkouts"] == 1
+    assert stats["wait_count"] == 1
+
+
+def test_overflow_is_reported(file_app):
+    connections = [db.engine.connect() for _ in range(3)]
+    try:
+        assert pool_stats.snapshot()["overflow"] == 1
+    finally:
+        for conn in connections:
+            conn.close()
+
+
+def test_sqlite_pragmas_are_applied(file_app):
+    with db.engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        # NORMAL == 1
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1
+
+
+def test_pool_stats_are_exported_as_metrics(client):
+    client.get("/ping")
+    body = client.get("/metrics").get_data(as_text=True)
+
+    assert pool_stats.snapshot()["pool"] == "StaticPool"
+    assert "db_pool_checkouts_total " in body
+    # Internal counters are only exposed to the metrics scraper
+    assert client.get("/stats").status_code == 404
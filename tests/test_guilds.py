@@ -0,0 +1,390 @@
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from sqlalchemy import func, select, update
+from app.extensions import db
+from app.models.guild import Guild
+from app.models.user import User, RoleEnum
+from app.seed_db import bulk_seed
+from app.services.guild_service import GuildService
+
+
+def _seed_members(guild_id, count, role=RoleEnum.member, prefix="member"):
+    # Insert members straight into the guild (there is no join endpoint yet)
+    db.session.add_all([
+        User(
+            username=f"{prefix}{i}",
+            email=f"{prefix}{i}@test.com",
+            password="x",
+            role=role,
+            guild_id=guild_id
+        )
+        for i in range(count)
+    ])
+    db.session.execute(
+        update(Guild).where(Guild.id == guild_id)
+        .values(member_count=Guild.member_count + count)
+    )
+    db.session.commit()
+
+
+def test_guild_members_are_keyset_paginated(client, register_and_login):
+    _, headers = register_and_login("pager")
+    client.post("/api/v1/guilds", json={"name": "Big Guild"}, headers=headers)
+    _seed_members(1, 6)
+
+    seen = []
+    after = None
+    while True:
+        url = "/api/v1/guilds/1/members?limit=3"
+        if after is not None:
+            url += f"&after={after}"
+        res = client.get(url, headers=headers)
+        assert res.status_code == 200
+
+        page = res.get_json()
+        assert len(page["members"]) <= 3
+        seen.extend(member["id"] for member in page["members"])
+
+        after = page["next_cursor"]
+        if after is None:
+            break
+
+    # Leader plus 6 members, each exactly once and in id order
+    assert seen == sorted(seen)
+    assert len(seen) == len(set(seen)) == 7
+
+
+def test_guild_members_filter_by_role(client, register_and_login):
+    _, headers = register_and_login("raidlead")
+    client.post("/api/v1/guilds", json={"name": "Raid Guild"}, headers=headers)
+    _seed_members(1, 2, role=RoleEnum.raider, prefix="raider")
+    _seed_members(1, 3)
+
+    res = client.get("/api/v1/guilds/1/members?role=raider", headers=headers)
+
+    assert res.status_code == 200
+    page = res.get_json()
+    assert [m["username"] for m in page["members"]] == ["raider0", "raider1"]
+    assert page["next_cursor"] is None
+
+
+def test_guild_members_rejects_bad_pagination_params(client, register_and_login):
+    _, headers = register_and_login("badparams")
+    client.post("/api/v1/guilds", json={"name": "Param Guild"}, headers=headers)
+
+    assert client.get("/api/v1/guilds/1/members?limit=0", headers=headers).status_code == 400
+    assert client.get("/api/v1/guilds/1/members?limit=1000", headers=headers).status_code == 400
+    assert client.get("/api/v1/guilds/1/members?after=abc", headers=headers).status_code == 400
+    assert client.get("/api/v1/guilds/1/members?role=wizard", headers=headers).status_code == 400
+
+
+def test_guild_members_unknown_guild_returns_404(client, register_and_login):
+    _, headers = register_and_login("lost")
+
+    res = client.get("/api/v1/guilds/42/members", headers=headers)
+
+    assert res.status_code == 404
+    assert res.get_json()["error"] == "Guild not found"
+
+
+def _directory(client, headers, **params):
+    # Walks every page of the directory and returns the guilds in order
+    guilds, cursor = [], None
+    while True:
+        query = dict(params, limit=2, **({"cursor": cursor} if cursor else {}))
+        res = client.get("/api/v1/guilds", query_string=query, headers=headers)
+        assert res.status_code == 200
+        page = res.get_json()
+        guilds.extend(page["guilds"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return guilds
+
+
+def _three_guilds(client, register_and_login):
+    """
+    Guilds "Bravo" (id 1, 3 members), "Alpha" (id 2, 1 member) and
+    "Charlie" (id 3, 2 members). Returns the headers of Bravo's leader.
+    """
+    sizes = {"Bravo": 2, "Alpha": 0, "Charlie": 1}
+    for guild_id, (name, extra) in enumerate(sizes.items(), start=1):
+        _, headers = register_and_login(f"lead{name}")
+        client.post("/api/v1/guilds", json={"name": name}, headers=headers)
+        _seed_members(guild_id, extra, prefix=f"{name}member")
+        if guild_id == 1:
+            first_headers = headers
+    return first_headers
+
+
+def test_guild_directory_lists_counts_and_leaders(client, register_and_login):
+    headers = _three_guilds(client, register_and_login)
+
+    guilds = _directory(client, headers)
+    assert [g["name"] for g in guilds] == ["Alpha", "Bravo", "Charlie"]
+    assert [g["member_count"] for g in guilds] == [1, 3, 2]
+    assert guilds[1]["leader_username"] == "leadBravo"
+
+
+def test_guild_directory_sorts(client, register_and_login):
+    headers = _three_guilds(client, register_and_login)
+
+    by_count = _directory(client, headers, sort="-member_count")
+    assert [g["name"] for g in by_count] == ["Bravo", "Charlie", "Alpha"]
+
+    newest_first = _directory(client, headers, sort="-created_at")
+    assert [g["id"] for g in newest_first] == [3, 2, 1]
+
+
+def test_guild_directory_prefix_filter(client, register_and_login):
+    headers = _three_guilds(client, register_and_login)
+    client.post("/api/v1/guilds", json={"name": "Al%"}, headers=register_and_login("pct")[1])
+
+    guilds = _directory(client, headers, prefix="Al")
+    assert [g["name"] for g in guilds] == ["Al%", "Alpha"]
+
+    # LIKE wildcards in the prefix are matched literally
+    guilds = _directory(client, headers, prefix="Al%")
+    assert [g["name"] for g in guilds] == ["Al%"]
+
+
+def test_guild_directory_rejects_bad_params(client, register_and_login):
+    _, headers = register_and_login("browser")
+
+    for query in ({"sort": "members"}, {"limit": 0}, {"limit": "x"},
+                  {"cursor": "not-a-cursor"}):
+        res = client.get("/api/v1/guilds", query_string=query, headers=headers)
+        assert res.status_code == 400
+
+    # A cursor from one sort order can't be replayed against another
+    headers = _three_guilds(client, register_and_login)
+    cursor = client.get("/api/v1/guilds?limit=1", headers=headers).get_json()["next_cursor"]
+    res = client.get(f"/api/v1/guilds?sort=created_at&cursor={cursor}", headers=headers)
+    assert res.status_code == 400
+
+
+def test_guild_directory_is_one_query(client, register_and_login, captured_statements):
+    headers = _three_guilds(client, register_and_login)
+    with captured_statements() as statements:
+        res = client.get("/api/v1/guilds", headers=headers)
+
+    assert res.status_code == 200
+    assert len(statements) == 1
+
+
+def _member_count(guild_id):
+    db.session.expire_all()
+    return db.session.get(Guild, guild_id).member_count
+
+
+def test_member_count_tracks_membership(client, register_and_login):
+    _, leader_headers = register_and_login("counter")
+    member_id, member_headers = register_and_login("joiner")
+    client.post("/api/v1/guilds", json={"name": "Count Guild"}, headers=leader_headers)
+    assert _member_count(1) == 1
+
+    _seed_members(1, 2)
+    db.session.get(User, member_id).guild_id = 1
+    db.session.execute(update(Guild).where(Guild.id == 1)
+                       .values(member_count=Guild.member_count + 1))
+    db.session.commit()
+    assert _member_count(1) == 4
+
+    assert client.delete("/api/v1/guilds/1/leave", headers=member_headers).status_code == 200
+    assert _member_count(1) == 3
+
+    assert client.delete("/api/v1/guilds/1/members/3", headers=leader_headers).status_code == 200
+    assert _member_count(1) == 2
+
+    # Rejected mutations leave the count alone
+    assert client.delete("/api/v1/guilds/1/members/3", headers=leader_headers).status_code == 400
+    assert _member_count(1) == 2
+
+
+def test_reconcile_counts_fixes_drift(app, client, register_and_login):
+    _, headers = register_and_login("drifter")
+    client.post("/api/v1/guilds", json={"name": "Drift Guild"}, headers=headers)
+    client.post("/api/v1/guilds", json={"name": "Steady Guild"},
+                headers=register_and_login("steady")[1])
+    _seed_members(1, 3)
+
+    # Members added behind the counter's back
+    db.session.execute(update(User).where(User.id > 2).values(guild_id=2))
+    db.session.commit()
+
+    result = app.test_cli_runner().invoke(args=["guilds", "reconcile-counts", "--batch-size", "1"])
+    assert result.exit_code == 0
+    assert "guild 1: member_count 4 -> 1" in result.output
+    assert "guild 2: member_count 1 -> 4" in result.output
+    assert [_member_count(1), _member_count(2)] == [1, 4]
+
+    result = app.test_cli_runner().invoke(args=["guilds", "reconcile-counts"])
+    assert "0 guild(s) corrected" in result.output
+
+
+def test_guild_overview(client, register_and_login):
+    _, headers = register_and_login("overseer")
+    client.post("/api/v1/guilds", json={"name": "Overview Guild"}, headers=headers)
+    _seed_members(1, 4)
+
+    res = client.get("/api/v1/guilds/1/overview?limit=3", headers=headers)
+    assert res.status_code == 200
+
+    body = res.get_json()
+    assert body["guild"]["name"] == "Overview Guild"
+    assert body["member_count"] == 5
+    assert body["leader"]["username"] == "overseer"
+    assert [m["id"] for m in body["members"]] == [1, 2, 3]
+    assert body["next_cursor"] == 3
+
+    res = client.get("/api/v1/guilds/1/overview?limit=3", headers={
+        **headers, "If-None-Match": res.headers["ETag"]})
+    assert res.status_code == 304
+
+    assert client.get("/api/v1/guilds/9/overview", headers=headers).status_code == 404
+    assert client.get("/api/v1/guilds/1/overview?limit=0", headers=headers).status_code == 400
+
+
+def test_guild_overview_query_budget(client, register_and_login, captured_statements):
+    _, headers = register_and_login("budget")
+    client.post("/api/v1/guilds", json={"name": "Budget Guild"}, headers=headers)
+    _seed_members(1, 30)
+
+    with captured_statements() as statements:
+        # Cold: guild snapshot for the ETag, guild + leader, members page
+        assert client.get("/api/v1/guilds/1/overview", headers=headers).status_code == 200
+        assert len(statements) == 3
+
+        # Warm snapshot cache: the overview itself is two queries
+        statements.clear()
+        assert client.get("/api/v1/guilds/1/overview", headers=headers).status_code == 200
+        assert len(statements) == 2
+
+
+def test_membership_mutations_are_two_statements(client, register_and_login, captured_statements):
+    _, headers = register_and_login("twostep")
+    client.post("/api/v1/guilds", json={"name": "Two Step"}, headers=headers)
+    _seed_members(1, 3)
+
+    with captured_statements() as statements:
+        GuildService.leave_guild(2, 1)
+    assert len(statements) == 2
+
+    # Kicking and demoting also revoke the user's tokens: one INSERT more
+    with captured_statements() as statements:
+        GuildService.kick_member(1, "1", 3)
+    assert len(statements) == 3
+    with captured_statements() as statements:
+        GuildService.transfer_leadership(1, "1", 4)
+    assert len(statements) == 3
+
+    db.session.expire_all()
+    assert [db.session.get(User, i).role for i in (1, 4)] == [RoleEnum.member, RoleEnum.guild_leader]
+    assert db.session.get(Guild, 1).created_by == 4
+    assert _member_count(1) == 2
+
+
+def test_membership_mutation_errors(client, register_and_login):
+    _, headers = register_and_login("ruler")
+    client.post("/api/v1/guilds", json={"name": "Rule Guild"}, headers=headers)
+    _seed_members(1, 1)
+    register_and_login("outsider")
+
+    cases = [
+        (lambda: GuildService.leave_guild(1, 1), "must transfer leadership"),
+        (lambda: GuildService.leave_guild(3, 1), "not a member"),
+        (lambda: GuildService.kick_member(1, 2, 1), "Only guild leaders"),
+        (lambda: GuildService.kick_member(1, 1, 1), "cannot kick yourself"),
+        (lambda: GuildService.kick_member(1, 1, 3), "not a member of your guild"),
+        (lambda: GuildService.kick_member(9, 1, 2), "Guild not found"),
+        (lambda: GuildService.transfer_leadership(1, 2, 1), "Only the current guild leader"),
+        (lambda: GuildService.transfer_leadership(1, 1, 3), "must be a member"),
+    ]
+    for call, message in cases:
+        with pytest.raises(ValueError, match=message):
+            call()
+
+    # Nothing was half-applied
+    assert _member_count(1) == 2
+    assert db.session.get(Guild, 1).roster_version == 0
+
+
+def test_concurrent_leave_and_kick_stay_consistent(file_app):
+    bulk_seed(users=21, guilds=1, members_per_guild=21)
+
+    def attempt(call):
+        with file_app.app_context():
+            try:
+                call()
+                return True
+            except ValueError:
+                return False
+
+    calls = []
+    for member_id in range(2, 22):
+        calls.append(lambda m=member_id: GuildService.leave_guild(m, 1))
+        calls.append(lambda m=member_id: GuildService.kick_member(1, 1, m))
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(attempt, calls))
+
+    # Each member left exactly once, by whichever request got there first
+    assert sum(results) == 20
+    remaining = db.session.scalar(select(func.count()).where(User.guild_id == 1))
+    assert remaining == 1
+    assert _member_count(1) == 1
+    assert db.session.get(Guild, 1).roster_version == 20
+
+
+def test_guild_names_are_unique_ignoring_case(client, register_and_login):
+    _, first = register_and_login("firstlead")
+    _, second = register_and_login("secondlead")
+    client.post("/api/v1/guilds", json={"name": "Night Watch"}, headers=first)
+
+    res = client.post("/api/v1/guilds", json={"name": "NIGHT watch"}, headers=second)
+    assert res.status_code == 400
+    assert res.get_json()["error"] == "A guild with that name already exists."
+
+    # The failed insert left nothing behind; the user can still found a guild
+    res = client.post("/api/v1/guilds", json={"name": "Day Watch"}, headers=second)
+    assert res.status_code == 201
+
+    res = client.patch("/api/v1/guilds/2", json={"name": "night WATCH"}, headers=second)
+    assert res.status_code == 400
+    assert res.get_json()["error"] == "Another guild with that name already exists"
+
+    # Changing only the case of your own guild's name is fine
+    res = client.patch("/api/v1/guilds/1", json={"name": "NIGHT WATCH"}, headers=first)
+    assert res.status_code == 200
+
+
+def test_create_guild_is_insert_first(client, register_and_login, captured_statements):
+    _, headers = register_and_login("founder")
+
+    with captured_statements() as statements:
+        GuildService.create_guild("Swift", "", "1")
+    assert len(statements) == 2
+
+    with pytest.raises(ValueError, match="already in a guild"):
+        GuildService.create_guild("Second", "", "1")
+    with pytest.raises(ValueError, match="User not found"):
+        GuildService.create_guild("Third", "", "99")
+    assert db.session.scalar(select(func.count()).select_from(Guild)) == 1
+
+
+def test_concurrent_guild_creation_with_one_name(file_app):
+    bulk_seed(users=8)
+
+    def attempt(user_id):
+        with file_app.app_context():
+            try:
+                GuildService.create_guild("Contested", "", user_id)
+                return True
+            except ValueError:
+                return False
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(attempt, range(1, 9)))
+
+    assert sum(results) == 1
+    assert db.session.scalar(select(func.count()).select_from(Guild)) == 1
+    assert db.session.scalar(select(func.count()).where(User.guild_id.is_not(None))) == 1
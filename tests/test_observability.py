@@ -0,0 +1,206 @@
+import json
+import logging
+import re
+import threading
+from flask import g
+from app import create_app
+from app.config import TestConfig
+from app.extensions import metrics
+from app.utils.metrics import clear_multiproc_dir
+from app.utils.structured_logging import JsonFormatter, RequestIdFilter, SamplingFilter
+
+
+def _server_timing(response):
+    header = response.headers["Server-Timing"]
+    queries = int(re.search(r'desc="(\d+) queries"', header).group(1))
+    return header, queries
+
+
+def test_server_timing_reports_query_count(client, register_and_login):
+    _, headers = register_and_login("timed")
+    client.post("/api/v1/guilds", json={"name": "Timed Guild"}, headers=headers)
+
+    res = client.get("/api/v1/guilds/1/members", headers=headers)
+
+    header, queries = _server_timing(res)
+    # guild lookup + a single member page query
+    assert queries == 2
+    assert "db;dur=" in header and "total;dur=" in header
+
+
+def test_requests_without_queries_report_zero(client):
+    _, queries = _server_timing(client.get("/ping"))
+    assert queries == 0
+
+
+def test_slow_requests_are_logged_with_statements(app, client, register_and_login, caplog):
+    app.extensions["request_timing"].threshold_ms = 0
+    _, headers = register_and_login("slowpoke")
+
+    with caplog.at_level(logging.WARNING):
+        client.get("/api/v1/users/1", headers=headers)
+
+    messages = [r.getMessage() for r in caplog.records if "Slow request" in r.getMessage()]
+    assert messages
+    assert "FROM users" in messages[-1]
+
+
+def test_timing_can_be_disabled(monkeypatch):
+    monkeypatch.setattr(TestConfig, "REQUEST_TIMING_ENABLED", False)
+    app = create_app("testing")
+
+    res = app.test_client().get("/ping")
+
+    assert "Server-Timing" not in res.headers
+    assert "request_timing" not in app.extensions
+
+
+def test_request_id_is_generated_and_echoed(client):
+    generated = client.get("/ping").headers["X-Request-ID"]
+    assert len(generated) == 32
+
+    res = client.get("/ping", headers={"X-Request-ID": "raid-night-42"})
+    assert res.headers["X-Request-ID"] == "raid-night-42"
+
+    # Garbage is replaced rather than echoed back
+    res = client.get("/ping", headers={"X-Request-ID": "bad id; with spaces"})
+    assert res.headers["X-Request-ID"] != "bad id; with spaces"
+
+
+def test_app_logger_never_writes_on_request_thread(app):
+    assert [type(h).__name__ for h in app.logger.handlers] == ["_NonBlockingQueueHandler"]
+
+
+def test_json_formatter_includes_request_id_and_extras(app):
+    record = logging.LogRecord("app.test", logging.INFO, __file__, 1,
+                               "kicked %s", ("someone",), None)
+    record.guild_id = 7
+    record.sample = True
+    with app.test_request_context():
+        g.request_id = "abc123"
+        RequestIdFilter().filter(record)
+
+    entry = json.loads(JsonFormatter().format(record))
+
+    assert entry["message"] == "kicked someone"
+    assert entry["request_id"] == "abc123"
+    assert entry["guild_id"] == 7
+    assert entry["level"] == "INFO"
+    assert "sample" not in entry
+
+
+def test_sampling_only_drops_flagged_info_events():
+    sampler = SamplingFilter(rate=0)
+
+    def record(level, **extra):
+        rec = logging.LogRecord("app.test", level, __file__, 1, "msg", (), None)
+        rec.__dict__.update(extra)
+        return rec
+
+    assert not sampler.filter(record(logging.INFO, sample=True))
+    assert sampler.filter(record(logging.INFO))
+    assert sampler.filter(record(logging.WARNING, sample=True))
+
+
+def _sample(body, series):
+    for line in body.splitlines():
+        if line.startswith(series + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return None
+
+
+def test_metrics_count_requests_per_endpoint(client):
+    client.get("/ping")
+    client.get("/ping")
+    client.get("/api/v1/protected")  # 401
+
+    body = client.get("/metrics").get_data(as_text=True)
+
+    assert _sample(body, 'http_requests_total{endpoint="ping",method="GET",status="200"}') == 2
+    assert _sample(body, 'http_requests_total{endpoint="users_bp.protected_route",method="GET",status="401"}') == 1
+    assert _sample(body, 'http_request_duration_seconds_count{endpoint="ping",method="GET"}') == 2
+    assert _sample(body, 'http_request_duration_seconds_bucket{endpoint="ping",method="GET",le="+Inf"}') == 2
+    # The scrape itself is the only request in flight
+    assert _sample(body, "http_requests_in_flight") == 1
+    assert _sample(body, "token_cache_misses_total") == 0
+    assert _sample(body, "token_denylist_tokens") == 0
+    assert "# TYPE db_pool_checked_out gauge" in body
+
+
+def test_metrics_merge_requests_from_all_threads(app):
+    def hit_ping():
+        app.test_client().get("/ping")
+
+    threads = [threading.Thread(target=hit_ping) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    body = app.test_client().get("/metrics").get_data(as_text=True)
+    assert _sample(body, 'http_requests_total{endpoint="ping",method="GET",status="200"}') == 4
+
+
+def test_metrics_aggregate_across_processes(tmp_path, monkeypatch):
+    monkeypatch.setattr(TestConfig, "METRICS_MULTIPROC_DIR", str(tmp_path))
+    app = create_app("testing")
+    client = app.test_client()
+    client.get("/ping")
+
+    # Another worker that has since exited left its last flush behind
+    (tmp_path / "metrics_999999999.json").write_text(json.dumps({
+        "requests": {'http_requests_total{endpoint="ping",method="GET",status="200"}': 5},
+        "latency": {},
+        "in_flight": 3,
+        "gauges": {},
+        "counters": {"token_cache_hits_total": 7},
+    }))
+
+    body = client.get("/metrics").get_data(as_text=True)
+
+    assert _sample(body, 'http_requests_total{endpoint="ping",method="GET",status="200"}') == 6
+    assert _sample(body, "token_cache_hits_total") == 7
+    # Gauges from dead workers are dropped
+    assert _sample(body, "http_requests_in_flight") == 1
+
+
+def test_concurrent_metrics_flushes_never_fail_a_request(tmp_path, monkeypatch):
+    monkeypatch.setattr(TestConfig, "METRICS_MULTIPROC_DIR", str(tmp_path))
+    monkeypatch.setattr(TestConfig, "METRICS_FLUSH_INTERVAL", 0)
+    app = create_app("testing")
+    statuses = []
+
+    def hit_ping():
+        client = app.test_client()
+        statuses.extend(client.get("/ping").status_code for _ in range(25))
+
+    threads = [threading.Thread(target=hit_ping) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert set(statuses) == {200}
+    # One complete snapshot and no temp files left behind
+    [flushed] = tmp_path.iterdir()
+    assert json.loads(flushed.read_text())["requests"]
+
+
+def test_failed_metrics_flush_is_logged_not_raised(tmp_path, monkeypatch, caplog):
+    monkeypatch.setattr(TestConfig, "METRICS_MULTIPROC_DIR", str(tmp_path))
+    monkeypatch.setattr(TestConfig, "METRICS_FLUSH_INTERVAL", 0)
+    app = create_app("testing")
+    monkeypatch.setattr(metrics, "multiproc_dir", str(tmp_path / "gone"))
+
+    assert app.test_client().get("/ping").status_code == 200
+    assert "Metrics flush failed" in caplog.text
+
+
+def test_clear_multiproc_dir_drops_previous_runs(tmp_path):
+    (tmp_path / "metrics_123.json").write_text("{}")
+    (tmp_path / "metrics_123.abc.tmp").write_text("")
+    (tmp_path / "unrelated.txt").write_text("")
+
+    clear_multiproc_dir(str(tmp_path))
+
+    assert [path.name for path in tmp_path.iterdir()] == ["unrelated.txt"]
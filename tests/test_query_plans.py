@@ -0,0 +1,106 @@
+"""
+Plan regression tests: every statement a service issues is run through the
+database's EXPLAIN and must not fall back to a full table scan.
+PostgreSQL plans (and statements SQLite is lenient about) are checked too
+when TEST_POSTGRES_URL is set.
+"""
+import os
+import re
+import pytest
+from app import create_app
+from app.config import TestConfig
+from app.extensions import db
+from app.models.user import User, RoleEnum
+from app.repositories.user_repository import UserRepository
+from app.seed_db import bulk_seed
+from app.services.guild_service import GuildService
+from app.services.user_service import UserService
+
+POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+
+# "SCAN users" is a full scan; "SCAN users USING INDEX ..." is not
+SQLITE_FULL_SCAN = re.compile(r"^SCAN \w+$")
+
+# Seeded layout: users 1-60; guilds 1-3 hold users 1-10, 11-20 and 21-30,
+# each led by its first member. Users 31-60 are guildless.
+SERVICE_CALLS = {
+    "user_by_id": lambda: UserRepository.get_by_id(5),
+    "users_by_ids": lambda: UserRepository.get_many([9, 3, 27]),
+    "user_by_email": lambda: UserRepository.get_by_email("nobody@example.com"),
+    "register": lambda: UserService.register_user("newbie", "newbie@example.com", "pw"),
+    "create_guild": lambda: GuildService.create_guild("Fresh Guild", "", 45),
+    "guild_by_id": lambda: GuildService.get_guild_by_id(1),
+    "directory_by_name": lambda: GuildService.list_guilds(prefix="Gr", limit=2),
+    "directory_by_created_at": lambda: GuildService.list_guilds(sort="-created_at", limit=2),
+    "directory_by_size": lambda: GuildService.list_guilds(sort="-member_count", limit=2),
+    "members": lambda: GuildService.get_guild_members(1, limit=5),
+    "members_next_page": lambda: GuildService.get_guild_members(1, limit=5, after=5),
+    "members_by_role": lambda: GuildService.get_guild_members(1, role=RoleEnum.raider),
+    "overview": lambda: GuildService.get_guild_overview(2, limit=5),
+    "update_guild": lambda: GuildService.update_guild(1, 1, "Renamed", "New"),
+    "leave_guild": lambda: GuildService.leave_guild(5, 1),
+    "transfer_leadership": lambda: GuildService.transfer_leadership(1, 1, 2),
+    "kick_member": lambda: GuildService.kick_member(1, 1, 3),
+}
+
+
+@pytest.fixture(params=["sqlite", "postgresql"])
+def plan_app(request, monkeypatch):
+    if request.param == "postgresql":
+        if not POSTGRES_URL:
+            pytest.skip("set TEST_POSTGRES_URL to check PostgreSQL plans")
+        monkeypatch.setattr(TestConfig, "SQLALCHEMY_DATABASE_URI", POSTGRES_URL)
+
+    app = create_app("testing")
+    with app.app_context():
+        db.create_all()
+        bulk_seed(users=60, guilds=3, members_per_guild=10)
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def explainable(statements):
+    return [(statement, parameters) for statement, parameters in statements
+            if statement.lstrip().upper().startswith(("SELECT", "INSERT", "UPDATE", "DELETE"))]
+
+
+def full_scans(statement, parameters) -> list[str]:
+    conn = db.session.connection()
+    if conn.dialect.name == "sqlite":
+        plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+        return [row.detail for row in plan if SQLITE_FULL_SCAN.match(row.detail)]
+
+    # Tiny test tables make a seq scan the cheapest plan; only report the
+    # ones the planner can't avoid
+    conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+    plan = conn.exec_driver_sql(f"EXPLAIN {statement}", parameters).scalars().all()
+    return [line.strip() for line in plan if "Seq Scan" in line]
+
+
+@pytest.mark.parametrize("call", SERVICE_CALLS.values(), ids=SERVICE_CALLS.keys())
+def test_service_queries_use_indexes(plan_app, captured_statements, call):
+    with captured_statements(parameters=True) as statements:
+        call()
+    statements = explainable(statements)
+    assert statements
+
+    for statement, parameters in statements:
+        assert full_scans(statement, parameters) == [], statement
+
+
+def test_harness_detects_full_scans(plan_app, captured_statements):
+    # Sanity check: a filter on an unindexed column must be flagged
+    with captured_statements(parameters=True) as statements:
+        db.session.execute(db.text("SELECT id FROM users WHERE password = :p"), {"p": "x"})
+
+    assert full_scans(*statements[0])
+
+
+def test_transfer_leadership_swaps_roles(plan_app):
+    # The role CASE must be typed as the enum column on every dialect
+    GuildService.transfer_leadership(1, 1, 2)
+
+    roles = dict(db.session.execute(
+        db.select(User.id, User.role).where(User.id.in_([1, 2]))).all())
+    assert roles == {1: RoleEnum.member, 2: RoleEnum.guild_leader}
@@ -0,0 +1,349 @@
+import time
+import uuid
+import jwt
+import pytest
+from sqlalchemy import event, text
+from app import create_app
+from app.config import TestConfig
+from app.extensions import db, login_limiter, password_hasher, token_cache
+from app.models.token_revocation import TokenRevocation
+from app.repositories.token_denylist import BloomFilter, TokenDenylist, naive_utc, token_denylist
+from app.utils.hashing import HashingUnavailable, PasswordHasher
+from app.utils.rate_limit import RateLimiter
+
+
+def test_password_hasher_runs_on_process_pool(app):
+    app.config["PASSWORD_HASH_POOL_SIZE"] = 1
+    hasher = PasswordHasher(app)
+
+    try:
+        stored = hasher.hash("raidnight")
+        assert hasher.verify(stored, "raidnight")
+        assert not hasher.verify(stored, "wrong")
+    finally:
+        hasher.shutdown()
+
+
+def test_password_hasher_rejects_when_queue_is_full(app):
+    app.config["PASSWORD_HASH_MAX_PENDING"] = 1
+    hasher = PasswordHasher(app)
+
+    # Occupy the only slot, as a long-running hash would
+    hasher._slots.acquire()
+    with pytest.raises(HashingUnavailable):
+        hasher.hash("anything")
+
+    hasher._slots.release()
+    assert hasher.hash("anything")
+
+
+def test_timed_out_hash_keeps_its_slot_until_it_finishes(app):
+    app.config.update(PASSWORD_HASH_POOL_SIZE=1, PASSWORD_HASH_MAX_PENDING=1,
+                      PASSWORD_HASH_TIMEOUT=0.2)
+    hasher = PasswordHasher(app)
+
+    try:
+        assert hasher._run(abs, -1) == 1  # start the worker process
+        with pytest.raises(HashingUnavailable, match="timed out"):
+            hasher._run(time.sleep, 1)
+
+        # Still running in the pool, so still counted as pending
+        with pytest.raises(HashingUnavailable, match="Too many"):
+            hasher._run(abs, -1)
+
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            try:
+                assert hasher._run(abs, -1) == 1
+                break
+            except HashingUnavailable:
+                time.sleep(0.05)
+        else:
+            pytest.fail("slot was never released")
+    finally:
+        hasher.shutdown()
+
+
+def test_login_returns_503_when_hashing_is_saturated(app, client):
+    client.post("/api/v1/register", json={
+        "username": "stormer",
+        "email": "stormer@test.com",
+        "password": "securepass"
+    })
+
+    app.config["PASSWORD_HASH_MAX_PENDING"] = 1
+    password_hasher.init_app(app)
+    password_hasher._slots.acquire()
+
+    res = client.post("/api/v1/login", json={
+        "email": "stormer@test.com",
+        "password": "securepass"
+    })
+
+    assert res.status_code == 503
+    assert res.headers["Retry-After"] == "1"
+
+
+def test_repeat_requests_reuse_verified_token(client, register_and_login):
+    _, headers = register_and_login("cached")
+    before = token_cache.stats()
+
+    for _ in range(3):
+        res = client.get("/api/v1/protected", headers=headers)
+        assert res.status_code == 200
+
+    after = token_cache.stats()
+    assert after["misses"] - before["misses"] == 1
+    assert after["hits"] - before["hits"] == 2
+    assert after["size"] == 1
+
+
+def test_expired_token_is_not_served_from_cache(app):
+    # exp is whole seconds; leave at least one full second before it passes
+    exp = int(time.time()) + 2
+    token = jwt.encode({"sub": "1", "role": "member", "exp": exp},
+                       app.config["SECRET_KEY"], algorithm="HS256")
+    assert token_cache.decode(token)["sub"] == "1"
+
+    time.sleep(exp - time.time() + 0.1)
+
+    with pytest.raises(jwt.ExpiredSignatureError):
+        token_cache.decode(token)
+    assert token_cache.stats()["size"] == 0
+
+
+def test_token_cache_evicts_least_recently_used(app):
+    app.config["TOKEN_CACHE_SIZE"] = 2
+    token_cache.init_app(app)
+    tokens = [
+        jwt.encode({"sub": str(i), "exp": time.time() + 60},
+                   app.config["SECRET_KEY"], algorithm="HS256")
+        for i in range(3)
+    ]
+
+    for token in tokens:
+        token_cache.decode(token)
+
+    assert token_cache.stats()["size"] == 2
+    token_cache.decode(tokens[0])  # evicted, so this is a miss
+    assert token_cache.stats()["hits"] == 0
+
+
+def test_tampered_token_is_rejected(client, register_and_login):
+    _, headers = register_and_login("tamper")
+    client.get("/api/v1/protected", headers=headers)
+
+    headers = {"Authorization": headers["Authorization"][:-2] + "xx"}
+    res = client.get("/api/v1/protected", headers=headers)
+
+    assert res.status_code == 401
+    assert res.get_json()["error"] == "Invalid token"
+
+
+def test_logout_revokes_the_token_even_when_cached(client, register_and_login):
+    _, headers = register_and_login("leaver")
+    assert client.get("/api/v1/protected", headers=headers).status_code == 200
+
+    assert client.post("/api/v1/logout", headers=headers).status_code == 200
+
+    res = client.get("/api/v1/protected", headers=headers)
+    assert res.status_code == 401
+    assert res.get_json()["error"] == "Token has been revoked"
+    assert token_cache.stats()["size"] == 1  # still cached, still refused
+
+    # Other sessions are unaffected
+    res = client.post("/api/v1/login", json={"email": "leaver@test.com",
+                                             "password": "securepass"})
+    fresh = {"Authorization": f"Bearer {res.get_json()['token']}"}
+    assert client.get("/api/v1/protected", headers=fresh).status_code == 200
+
+
+def test_logout_records_naive_utc_times(client, register_and_login):
+    # The columns are naive UTC; PostgreSQL would shift an aware value
+    _, headers = register_and_login("timely")
+    inserted = []
+
+    def record(state):
+        if state.is_insert:
+            inserted.extend(state.parameters)
+
+    event.listen(db.session, "do_orm_execute", record)
+    try:
+        before = naive_utc(time.time())
+        assert client.post("/api/v1/logout", headers=headers).status_code == 200
+    finally:
+        event.remove(db.session, "do_orm_execute", record)
+
+    [row] = inserted
+    assert row["revoked_at"].tzinfo is None
+    assert before <= row["revoked_at"] <= naive_utc(time.time())
+
+
+def test_unrevoked_tokens_are_checked_without_the_database(client, register_and_login,
+                                                           captured_statements):
+    _, headers = register_and_login("quiet")
+    client.get("/api/v1/protected", headers=headers)  # first check syncs
+
+    with captured_statements() as statements:
+        for _ in range(3):
+            assert client.get("/api/v1/protected", headers=headers).status_code == 200
+    assert statements == []
+
+
+def test_kicked_member_is_signed_out_but_can_log_in_again(client, register_and_login):
+    _, leader_headers = register_and_login("boss")
+    _, member_headers = register_and_login("grunt")
+    client.post("/api/v1/guilds", json={"name": "Kick Guild"}, headers=leader_headers)
+    db.session.execute(text("UPDATE users SET guild_id = 1 WHERE id = 2"))
+    db.session.execute(text("UPDATE guilds SET member_count = 2 WHERE id = 1"))
+    db.session.commit()
+
+    assert client.delete("/api/v1/guilds/1/members/2", headers=leader_headers).status_code == 200
+
+    assert client.get("/api/v1/protected", headers=member_headers).status_code == 401
+    # Tokens issued after the kick are fine, even within the same second
+    res = client.post("/api/v1/login", json={"email": "grunt@test.com",
+                                             "password": "securepass"})
+    fresh = {"Authorization": f"Bearer {res.get_json()['token']}"}
+    assert client.get("/api/v1/protected", headers=fresh).status_code == 200
+    assert client.get("/api/v1/protected", headers=leader_headers).status_code == 200
+
+
+def test_other_workers_pick_up_revocations_incrementally(app):
+    other = TokenDenylist(app)  # another worker's copy
+    now = time.time()
+    revoked, kept = uuid.uuid4().hex, uuid.uuid4().hex
+    assert not other.is_revoked({"sub": "1", "jti": revoked})  # full sync, empty
+
+    db.session.add_all([
+        TokenRevocation(jti=revoked, user_id=1, expires_at=naive_utc(now + 60)),
+        TokenRevocation(user_id=2, revoked_at=naive_utc(now), expires_at=naive_utc(now + 60)),
+    ])
+    db.session.commit()
+    assert not other.is_revoked({"sub": "1", "jti": revoked})  # not due yet
+
+    other.sync()
+    assert other.is_revoked({"sub": "1", "jti": revoked})
+    assert not other.is_revoked({"sub": "1", "jti": kept})
+    assert other.is_revoked({"sub": "2", "jti": kept, "iat": now - 1})
+    assert not other.is_revoked({"sub": "2", "jti": kept, "iat": now + 1})
+    assert other.stats()["syncs"] == 2
+
+
+def test_denylist_evicts_entries_once_their_tokens_expire(app):
+    now = time.time()
+    token_denylist.sync(now)
+    token_denylist.add_token("gone", now + 1)
+    token_denylist.add_token("live", now + 60)
+    token_denylist.add_cutoff(7, now, now + 1)
+
+    token_denylist.sync(now + 2)
+
+    stats = token_denylist.stats()
+    assert (stats["tokens"], stats["users"]) == (1, 0)
+    assert "gone" not in token_denylist._bloom  # rebuilt without it
+    assert token_denylist.is_revoked({"sub": "1", "jti": "live"})
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(1000, error_rate=0.01)
+    added = [uuid.uuid4().hex for _ in range(1000)]
+    for item in added:
+        bloom.add(item)
+
+    assert all(item in bloom for item in added)
+    false_positives = sum(uuid.uuid4().hex in bloom for _ in range(10_000))
+    assert false_positives < 300  # ~1% expected
+
+
+def test_rate_limiter_refills_over_time(app):
+    app.config["LOGIN_RATE_LIMITS"] = {"email": (2, 6)}  # refills one per 10s
+    limiter = RateLimiter("LOGIN_RATE_LIMITS", app)
+
+    assert limiter.hit(email="a", now=100) == 0
+    assert limiter.hit(email="a", now=100) == 0
+    assert limiter.hit(email="a", now=100) == pytest.approx(10)
+    assert limiter.hit(email="b", now=100) == 0  # separate bucket
+
+    assert limiter.hit(email="a", now=105) == pytest.approx(5)
+    assert limiter.hit(email="a", now=110) == 0
+    assert limiter.stats() == {"allowed": 4, "rejected": 2}
+
+
+def test_rate_limiter_only_spends_when_every_bucket_allows(app):
+    app.config["LOGIN_RATE_LIMITS"] = {"ip": (3, 1), "email": (1, 1)}
+    limiter = RateLimiter("LOGIN_RATE_LIMITS", app)
+
+    assert limiter.hit(ip="1.2.3.4", email="a", now=0) == 0
+    # Rejected by the email bucket, so the IP bucket keeps its tokens
+    for _ in range(5):
+        assert limiter.hit(ip="1.2.3.4", email="a", now=0) > 0
+    assert limiter.hit(ip="1.2.3.4", email="b", now=0) == 0
+    assert limiter.hit(ip="1.2.3.4", email="c", now=0) == 0
+    assert limiter.hit(ip="1.2.3.4", email="d", now=0) > 0
+
+
+def test_sqlite_rate_limits_are_shared(app, tmp_path):
+    app.config.update(
+        RATE_LIMIT_BACKEND="sqlite",
+        RATE_LIMIT_SQLITE_PATH=str(tmp_path / "limits.db"),
+        LOGIN_RATE_LIMITS={"email": (2, 1)},
+    )
+    # Two limiters on one file stand in for two worker processes
+    first = RateLimiter("LOGIN_RATE_LIMITS", app)
+    second = RateLimiter("LOGIN_RATE_LIMITS", app)
+
+    assert first.hit(email="a", now=0) == 0
+    assert second.hit(email="a", now=0) == 0
+    assert first.hit(email="a", now=0) > 0
+    assert second.hit(email="a", now=0) > 0
+
+
+def test_login_is_rate_limited_before_any_work(app, client, monkeypatch):
+    client.post("/api/v1/register", json={
+        "username": "flooded",
+        "email": "flooded@test.com",
+        "password": "securepass"
+    })
+    app.config["LOGIN_RATE_LIMITS"] = {"ip": (100, 60), "email": (2, 1)}
+    login_limiter.init_app(app)
+
+    for _ in range(2):
+        res = client.post("/api/v1/login", json={
+            "email": "flooded@test.com", "password": "wrong"})
+        assert res.status_code == 401
+
+    def no_work(*args, **kwargs):
+        raise AssertionError("rate-limited login did work")
+
+    monkeypatch.setattr(password_hasher, "verify", no_work)
+    monkeypatch.setattr(db.session, "execute", no_work)
+
+    # Email case doesn't get around the per-email bucket
+    res = client.post("/api/v1/login", json={
+        "email": "FLOODED@test.com", "password": "securepass"})
+    assert res.status_code == 429
+    assert res.headers["Retry-After"] == "60"
+
+
+def test_login_ip_buckets_use_the_forwarded_client(monkeypatch):
+    monkeypatch.setattr(TestConfig, "PROXY_FIX_X_FOR", 1)
+    app = create_app("testing")
+    app.config["LOGIN_RATE_LIMITS"] = {"ip": (1, 1)}
+    login_limiter.init_app(app)
+    client = app.test_client()
+
+    def login(forwarded_for):
+        return client.post("/api/v1/login", json={
+            "email": "nobody@test.com", "password": "wrong"
+        }, headers={"X-Forwarded-For": forwarded_for}).status_code
+
+    with app.app_context():
+        db.create_all()
+        assert login("203.0.113.1") == 401
+        assert login("203.0.113.1") == 429
+        # Another client behind the same proxy has its own bucket
+        assert login("203.0.113.2") == 401
+        # Only the hop our proxy appended counts, not what the client sent
+        assert login("198.51.100.7, 203.0.113.1") == 429
+        db.drop_all()
@@ -0,0 +1,62 @@
+import pytest
+from sqlalchemy import func, select
+from app.extensions import db
+from app.models.guild import Guild
+from app.models.user import User, RoleEnum
+from app.seed_db import bulk_seed
+
+
+def _dump():
+    users = db.session.execute(
+        select(User.id, User.username, User.role, User.guild_id).order_by(User.id)
+    ).all()
+    guilds = db.session.execute(select(Guild.id, Guild.name, Guild.created_by)).all()
+    return users, guilds
+
+
+def test_bulk_seed_builds_guilds_with_leaders(app):
+    bulk_seed(users=25, guilds=3, members_per_guild=5, chunk_size=4)
+
+    assert db.session.scalar(select(func.count()).select_from(User)) == 25
+    for guild in db.session.scalars(select(Guild)):
+        members = db.session.scalars(select(User).where(User.guild_id == guild.id)).all()
+        assert len(members) == 5
+        leader = db.session.get(User, guild.created_by)
+        assert leader.guild_id == guild.id
+        assert leader.role == RoleEnum.guild_leader
+
+    unassigned = db.session.scalar(select(func.count()).where(User.guild_id.is_(None)))
+    assert unassigned == 10
+
+
+def test_bulk_seed_is_reproducible(app):
+    bulk_seed(users=20, guilds=2, members_per_guild=4, seed=7)
+    first = _dump()
+
+    db.drop_all()
+    db.create_all()
+    bulk_seed(users=20, guilds=2, members_per_guild=4, seed=7)
+    assert _dump() == first
+
+
+def test_seeded_users_can_log_in(client):
+    bulk_seed(users=2, password="seedpass")
+    email = db.session.scalar(select(User.email).where(User.id == 1))
+
+    res = client.post("/api/v1/login", json={"email": email, "password": "seedpass"})
+    assert res.status_code == 200
+
+
+def test_bulk_seed_appends_after_existing_rows(app):
+    bulk_seed(users=6, guilds=1, members_per_guild=3)
+    written = bulk_seed(users=6, guilds=1, members_per_guild=3)
+
+    assert written == {"users": (7, 12), "guilds": (2, 2)}
+    assert db.session.get(Guild, 2).created_by == 7
+
+
+def test_bulk_seed_rejects_guilds_without_members(app):
+    with pytest.raises(ValueError, match="at least one member"):
+        bulk_seed(users=10, guilds=3, members_per_guild=0)
+
+    assert db.session.scalar(select(func.count()).select_from(User)) == 0
@@ -0,0 +1,31 @@
+import json
+from datetime import datetime, timezone
+from app.models.user import User, RoleEnum
+from app.serializers import serialize_user, serialize_users
+from app.utils.json_provider import AppJSONProvider
+
+
+def _user(i=1):
+    return User(
+        id=i,
+        username=f"user{i}",
+        email=f"user{i}@test.com",
+        password="x",
+        role=RoleEnum.raider,
+        guild_id=7,
+        created_at=datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+    )
+
+
+def test_serialized_user_matches_model_serialize(app):
+    user = _user()
+
+    # Both the orjson provider and the stdlib fallback give the old shape
+    for provider in (app.json, AppJSONProvider(app)):
+        assert json.loads(provider.dumps(serialize_user(user))) == user.serialize()
+
+
+def test_serialize_users_keeps_order(app):
+    users = [_user(i) for i in (3, 1, 2)]
+
+    assert [row["id"] for row in serialize_users(users)] == [3, 1, 2]
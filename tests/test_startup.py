@@ -0,0 +1,33 @@
+import os
+import pytest
+from app import create_app
+from app.config import TestConfig
+from benchmarks.bench_startup import measure_startup, over_budget
+
+# Wall-clock budgets depend on the machine, so they're only checked on request
+CHECK_BUDGET = os.getenv("TEST_STARTUP_BUDGET")
+
+
+def test_cold_start_skips_admin_only_modules():
+    timings = measure_startup(runs=1)
+
+    assert timings["unwanted_modules"] == []
+
+
+@pytest.mark.skipif(not CHECK_BUDGET, reason="set TEST_STARTUP_BUDGET to check cold start times")
+def test_cold_start_is_within_budget():
+    timings = measure_startup(runs=3)
+
+    assert over_budget(timings) == []
+
+
+def test_admin_is_registered_only_when_enabled(monkeypatch):
+    def rules(app):
+        return {rule.rule for rule in app.url_map.iter_rules()}
+
+    assert "/admin/" not in rules(create_app("testing"))
+
+    monkeypatch.setattr(TestConfig, "ADMIN_ENABLED", True)
+    app = create_app("testing")
+    assert "/admin/" in rules(app)
+    assert app.test_client().get("/admin/").status_code == 401  # admins only
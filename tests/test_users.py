@@ -108,6 +108,14 @@ def test_login_missing_fields(client):
     assert res.get_json()["error"] == "Missing email or password"
 
 
+def test_login_rejects_non_string_email(client):
+    for email in (123, ["a@test.com"], {"email": "a@test.com"}):
+        res = client.post("/api/v1/login", json={"email": email, "password": "pw"})
+
+        assert res.status_code == 400
+        assert res.get_json()["error"] == "Email must be a string"
+
+
 def test_guild_leader_can_access(client):
     # Register as a guild leader
     client.post("/api/v1/register", json={
@@ -371,6 +379,18 @@ def test_registration_missing_fields(client):
     assert res3.get_json()["error"] == "Missing fields"
 
 
+def test_registration_rejects_non_string_email(client):
+    for email in (123, ["list@test.com"]):
+        res = client.post("/api/v1/register", json={
+            "username": "typed",
+            "email": email,
+            "password": "pass123"
+        })
+
+        assert res.status_code == 400
+        assert res.get_json()["error"] == "Email must be a string"
+
+
 def test_guild_creation_requires_auth(client):
     res = client.post("/api/v1/guilds", json={
         "name": "Unauthorized Guild",
@@ -406,7 +426,7 @@ def test_list_guild_members(client):
     })
 
     assert res.status_code == 200
-    members = res.get_json()
+    members = res.get_json()["members"]
     assert isinstance(members, list)
     assert len(members) == 1
     assert members[0]["username"] == "creator"
@@ -619,6 +639,32 @@ def test_cannot_transfer_leadership_to_non_member(client):
     assert "must be a member of the same guild" in res.get_json()["error"]
 
 
+def test_transferring_leadership_to_yourself_is_a_no_op(client, register_and_login):
+    leader_id, headers = register_and_login("selfmade")
+    client.post("/api/v1/guilds", json={"name": "Self Guild"}, headers=headers)
+    members_etag = client.get("/api/v1/guilds/1/members", headers=headers).headers["ETag"]
+
+    res = client.post("/api/v1/guilds/1/transfer-leadership", json={
+        "new_leader_id": leader_id
+    }, headers=headers)
+
+    assert res.status_code == 200
+    # Still the leader, still signed in, and the roster didn't change
+    res = client.get("/api/v1/guilds/1/members", headers=headers)
+    assert res.status_code == 200
+    assert res.headers["ETag"] == members_etag
+    with client.application.app_context():
+        assert db.session.get(User, leader_id).role == RoleEnum.guild_leader
+
+    # Only the guild's leader gets the no-op
+    _, other_headers = register_and_login("bystander")
+    res = client.post("/api/v1/guilds/1/transfer-leadership", json={
+        "new_leader_id": 2
+    }, headers=other_headers)
+    assert res.status_code == 400
+    assert res.get_json()["error"] == "Only the current guild leader can transfer leadership"
+
+
 def test_guild_leader_can_kick_member(client):
     # Step 1: Register and login as guild leader
     client.post("/api/v1/register", json={
@@ -671,3 +717,54 @@ def test_guild_leader_can_kick_member(client):
     with client.application.app_context():
         kicked = db.session.get(User, 2)
         assert kicked.guild_id is None
+
+
+def test_batch_user_lookup(client, register_and_login):
+    _, headers = register_and_login("alpha")
+    register_and_login("bravo")
+    register_and_login("charlie")
+
+    res = client.get("/api/v1/users?ids=3,99,1,3", headers=headers)
+    assert res.status_code == 200
+
+    body = res.get_json()
+    assert [user["username"] for user in body["users"]] == ["charlie", "alpha"]
+    assert body["missing"] == [99]
+
+
+def test_batch_user_lookup_rejects_bad_ids(client, register_and_login):
+    _, headers = register_and_login("alpha")
+
+    for query in ("", "?ids=", "?ids=1,x", "?ids=" + ",".join(map(str, range(101)))):
+        res = client.get(f"/api/v1/users{query}", headers=headers)
+        assert res.status_code == 400
+
+    assert client.get("/api/v1/users?ids=1").status_code == 401
+
+
+def test_registration_conflicts_are_reported(client):
+    payload = {"username": "dup", "email": "Dup@Test.com", "password": "securepass"}
+    assert client.post("/api/v1/register", json=payload).status_code == 201
+
+    res = client.post("/api/v1/register", json={**payload, "username": "other",
+                                                "email": "dup@test.COM"})
+    assert res.status_code == 400
+    assert res.get_json()["error"] == "Email is already registered."
+
+    res = client.post("/api/v1/register", json={**payload, "email": "new@test.com"})
+    assert res.status_code == 400
+    assert res.get_json()["error"] == "Username is already taken."
+
+    # The session is usable again after the failed inserts
+    res = client.post("/api/v1/login", json={"email": "DUP@test.com", "password": "securepass"})
+    assert res.status_code == 200
+    assert res.get_json()["user"]["email"] == "dup@test.com"
+
+
+def test_registration_is_a_single_insert(app, captured_statements):
+    from app.services.user_service import UserService
+
+    with captured_statements() as statements:
+        UserService.register_user("solo", "solo@test.com", "securepass")
+
+    assert [s.split()[0] for s in statements] == ["INSERT"]
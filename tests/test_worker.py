@@ -0,0 +1,64 @@
+import logging
+import os
+import pytest
+from app.extensions import db, pool_stats
+from app.repositories.entity_cache import entity_cache
+from app.seed_db import bulk_seed
+from app.utils import structured_logging
+from app.utils.worker import after_fork, warm_up
+
+
+@pytest.fixture
+def file_app_options():
+    return {"config": {"SQLALCHEMY_ENGINE_OPTIONS":
+                       {"pool_size": 3, "max_overflow": 1, "pool_timeout": 5},
+                       "WARMUP_GUILDS": 2}}
+
+
+def test_warm_up_primes_pool_and_caches(file_app):
+    bulk_seed(users=30, guilds=3, members_per_guild=5)
+
+    stats = warm_up(file_app)
+
+    assert stats["connections"] == 3
+    assert stats["guilds"] == 2
+    assert pool_stats.snapshot()["connects"] == 3
+    assert entity_cache.guilds.stats()["size"] == 2
+    assert entity_cache.users.stats()["size"] == 2  # the two leaders
+
+
+def test_warm_up_failure_leaves_worker_cold(file_app, caplog):
+    db.drop_all()
+
+    with caplog.at_level(logging.WARNING, logger="app.utils.worker"):
+        stats = warm_up(file_app)
+
+    assert stats["guilds"] == 0
+    assert "Worker warm-up failed" in caplog.text
+
+
+def test_after_fork_replaces_pool_and_log_listener(file_app):
+    warm_up(file_app)
+    pool = db.engine.pool
+    read_end, write_end = os.pipe()
+
+    pid = os.fork()
+    if pid == 0:  # child: report through the pipe, never return into pytest
+        ok = False
+        try:
+            after_fork(file_app)
+            ok = (db.engine.pool is not pool
+                  and db.engine.pool.checkedin() == 0
+                  and structured_logging._listener_pid == os.getpid())
+        finally:
+            os.write(write_end, b"1" if ok else b"0")
+            os._exit(0)
+
+    os.close(write_end)
+    os.waitpid(pid, 0)
+    assert os.read(read_end, 1) == b"1"
+    os.close(read_end)
+
+    # The parent's pool and listener are untouched
+    assert db.engine.pool is pool
+    assert pool.checkedin() == 3
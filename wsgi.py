@@ -0,0 +1,8 @@
+from dotenv import load_dotenv
+
+load_dotenv(".env")
+
+from app import create_app  # noqa: E402
+
+# WSGI entry point:  gunicorn -c gunicorn.conf.py wsgi:app
+app = create_app()